@@ -1,3 +1,4 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
 
@@ -59,6 +60,35 @@ class PlaceList(Resource):
         places = facade.get_all_places()
         return [place.to_dict() for place in places], 200
 
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.doc(params={
+        'lat': 'Latitude of the search centre',
+        'lon': 'Longitude of the search centre',
+        'radius_km': 'Search radius in kilometres'
+    })
+    @api.response(200, 'Nearby places retrieved successfully')
+    @api.response(400, 'Invalid location parameters')
+    def get(self):
+        try:
+            latitude = float(request.args['lat'])
+            longitude = float(request.args['lon'])
+            radius_km = float(request.args['radius_km'])
+        except (KeyError, ValueError):
+            return {'error': 'lat, lon and radius_km must be numbers'}, 400
+
+        try:
+            results = facade.get_places_nearby(latitude, longitude, radius_km)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        places = []
+        for place, distance in results:
+            data = place.to_dict()
+            data['distance_km'] = round(distance, 3)
+            places.append(data)
+        return places, 200
+
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     @api.response(200, 'Place details retrieved successfully')
@@ -0,0 +1,96 @@
+"""
+Geographic helpers for "places near me" queries
+
+Places are bucketed into a fixed lat/lon grid. A radius query first
+collects the cells that cover the search circle, then refines the
+candidates with an exact haversine distance.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+# Cell size in degrees (~11 km of latitude)
+CELL_SIZE_DEG = 0.1
+LON_CELLS = int(round(360 / CELL_SIZE_DEG))
+
+# Above this many cells a plain bounding-box scan is cheaper
+MAX_QUERY_CELLS = 400
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+    a = (math.sin(d_phi / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _lat_index(lat):
+    return math.floor(lat / CELL_SIZE_DEG)
+
+
+def _wrap_lon_index(index):
+    """Wrap a longitude cell index into [-LON_CELLS / 2, LON_CELLS / 2)"""
+    return (index + LON_CELLS // 2) % LON_CELLS - LON_CELLS // 2
+
+
+def _lon_index(lon):
+    return _wrap_lon_index(math.floor(lon / CELL_SIZE_DEG))
+
+
+def cell_key(lat_index, lon_index):
+    return f"{lat_index}:{lon_index}"
+
+
+def cell_for(lat, lon):
+    """Return the grid cell key for a point, or None without coordinates"""
+    if lat is None or lon is None:
+        return None
+    return cell_key(_lat_index(lat), _lon_index(lon))
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    Return (min_lat, min_lon, max_lat, max_lon) enclosing the circle
+    min_lon > max_lon means the box crosses the antimeridian
+    """
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    min_lat = max(-90.0, lat - d_lat)
+    max_lat = min(90.0, lat + d_lat)
+
+    cos_lat = min(math.cos(math.radians(min_lat)), math.cos(math.radians(max_lat)))
+    if cos_lat <= 1e-9 or radius_km / (KM_PER_DEGREE_LAT * cos_lat) >= 180:
+        return min_lat, -180.0, max_lat, 180.0
+
+    d_lon = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    min_lon = lon - d_lon
+    max_lon = lon + d_lon
+    if min_lon < -180:
+        min_lon += 360
+    if max_lon > 180:
+        max_lon -= 360
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def cells_covering(lat, lon, radius_km):
+    """
+    Return the cell keys covering the search circle
+    Returns None when the circle spans more than MAX_QUERY_CELLS cells
+    """
+    min_lat, min_lon, max_lat, max_lon = bounding_box(lat, lon, radius_km)
+
+    lat_indexes = range(_lat_index(min_lat), _lat_index(max_lat) + 1)
+    first = math.floor(min_lon / CELL_SIZE_DEG)
+    last = math.floor(max_lon / CELL_SIZE_DEG)
+    if min_lon > max_lon:
+        last += LON_CELLS
+    lon_count = min(last - first + 1, LON_CELLS)
+
+    if len(lat_indexes) * lon_count > MAX_QUERY_CELLS:
+        return None
+    lon_indexes = {_wrap_lon_index(first + i) for i in range(lon_count)}
+    return [cell_key(i, j) for i in lat_indexes for j in lon_indexes]
@@ -17,6 +17,16 @@ class Review(BaseModel):
         self.place = place
         self.user = user
     
+    @property
+    def place_id(self):
+        """ID of the reviewed place"""
+        return self.place.id
+    
+    @property
+    def user_id(self):
+        """ID of the reviewing user"""
+        return self.user.id
+    
     def _validate_text(self, text):
         """Validate review text"""
         if not text or not isinstance(text, str):
@@ -3,6 +3,8 @@ In-memory repository for storing objects temporarily
 This will be replaced with a database in Part 3
 """
 from abc import ABC, abstractmethod
+from collections import defaultdict
+from app.geo import bounding_box, cell_for, cells_covering, haversine_km
 
 class Repository(ABC):
     @abstractmethod
@@ -30,13 +32,59 @@ class Repository(ABC):
         pass
 
 class InMemoryRepository:
-    """Repository for storing objects in memory"""
+    """
+    Repository for storing objects in memory
+    unique_indexes/indexes name attributes to keep secondary indexes on,
+    so get_by_attribute on them is a dict lookup instead of a scan
+    """
     
-    def __init__(self):
+    def __init__(self, unique_indexes=(), indexes=()):
         self._storage = {}
+        self._unique = {attr: {} for attr in unique_indexes}
+        self._indexes = {attr: {} for attr in indexes}
+        # Indexed values per object id, so updates can find the old keys
+        self._indexed_values = {}
+    
+    def _check_unique(self, obj_id, values):
+        """Raise ValueError if a unique value already belongs to another object"""
+        for attr, index in self._unique.items():
+            value = values.get(attr)
+            owner_id = index.get(value)
+            if value is not None and owner_id is not None and owner_id != obj_id:
+                raise ValueError(f"Duplicate value for unique attribute '{attr}'")
+    
+    def _index(self, obj):
+        """Add an object to every secondary index"""
+        values = {}
+        for attr, index in self._unique.items():
+            value = getattr(obj, attr, None)
+            if value is not None:
+                index[value] = obj.id
+            values[attr] = value
+        for attr, index in self._indexes.items():
+            value = getattr(obj, attr, None)
+            index.setdefault(value, set()).add(obj.id)
+            values[attr] = value
+        self._indexed_values[obj.id] = values
+    
+    def _unindex(self, obj_id):
+        """Remove an object from every secondary index"""
+        values = self._indexed_values.pop(obj_id, {})
+        for attr, index in self._unique.items():
+            if attr in values and index.get(values[attr]) == obj_id:
+                del index[values[attr]]
+        for attr, index in self._indexes.items():
+            ids = index.get(values.get(attr))
+            if ids is not None:
+                ids.discard(obj_id)
+                if not ids:
+                    del index[values[attr]]
     
     def add(self, obj):
         """Add an object to the repository"""
+        self._check_unique(obj.id, {attr: getattr(obj, attr, None)
+                                    for attr in self._unique})
+        self._index(obj)
         self._storage[obj.id] = obj
     
     def get(self, obj_id):
@@ -51,21 +99,95 @@ class InMemoryRepository:
         """Update an object"""
         obj = self.get(obj_id)
         if obj:
+            self._check_unique(obj_id, data)
+            self._unindex(obj_id)
             for key, value in data.items():
                 setattr(obj, key, value)
+            self._index(obj)
         return obj
     
     def delete(self, obj_id):
         """Delete an object"""
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
             return True
         return False
     
     def get_by_attribute(self, attr_name, attr_value):
         """Get an object by a specific attribute"""
+        if attr_name == 'id':
+            return self.get(attr_value)
+        if attr_name in self._unique:
+            return self.get(self._unique[attr_name].get(attr_value))
+        if attr_name in self._indexes:
+            ids = self._indexes[attr_name].get(attr_value)
+            return self._storage[next(iter(ids))] if ids else None
         return next(
             (obj for obj in self._storage.values() 
              if getattr(obj, attr_name, None) == attr_value),
             None
         )
+    
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Get every object whose attribute equals the given value"""
+        if attr_name in self._unique:
+            obj = self.get_by_attribute(attr_name, attr_value)
+            return [obj] if obj else []
+        if attr_name in self._indexes:
+            ids = self._indexes[attr_name].get(attr_value, ())
+            return [self._storage[obj_id] for obj_id in ids]
+        return [obj for obj in self._storage.values()
+                if getattr(obj, attr_name, None) == attr_value]
+
+
+class PlaceRepository(InMemoryRepository):
+    """Place repository with an in-process spatial grid index"""
+
+    def __init__(self):
+        super().__init__()
+        self._grid = defaultdict(set)
+        self._cells = {}
+
+    def _grid_add(self, place):
+        """Put a place in the grid cell matching its coordinates"""
+        cell = cell_for(place.latitude, place.longitude)
+        if cell is not None:
+            self._grid[cell].add(place.id)
+            self._cells[place.id] = cell
+
+    def _grid_remove(self, place_id):
+        cell = self._cells.pop(place_id, None)
+        if cell is not None:
+            self._grid[cell].discard(place_id)
+            if not self._grid[cell]:
+                del self._grid[cell]
+
+    def _index(self, obj):
+        super()._index(obj)
+        self._grid_add(obj)
+
+    def _unindex(self, obj_id):
+        super()._unindex(obj_id)
+        self._grid_remove(obj_id)
+
+    def get_nearby(self, latitude, longitude, radius_km):
+        """Get (place, distance_km) pairs within radius_km, nearest first"""
+        min_lat, _, max_lat, _ = bounding_box(latitude, longitude, radius_km)
+        cells = cells_covering(latitude, longitude, radius_km)
+        if cells is None:
+            candidates = self._storage.values()
+        else:
+            candidates = (self._storage[place_id]
+                          for cell in cells
+                          for place_id in self._grid.get(cell, ()))
+
+        results = []
+        for place in candidates:
+            if not min_lat <= place.latitude <= max_lat:
+                continue
+            distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+            if distance <= radius_km:
+                results.append((place, distance))
+        results.sort(key=lambda pair: pair[1])
+        return results
@@ -2,7 +2,7 @@
 """
 HBnB Facade
 """
-from app.persistence.repository import InMemoryRepository
+from app.persistence.repository import InMemoryRepository, PlaceRepository
 from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
@@ -13,10 +13,10 @@ class HBnBFacade:
     """Facade Pattern"""
 
     def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+        self.user_repo = InMemoryRepository(unique_indexes=('email',))
+        self.place_repo = PlaceRepository()
+        self.review_repo = InMemoryRepository(indexes=('place_id', 'user_id'))
+        self.amenity_repo = InMemoryRepository(indexes=('name',))
 
     # =====================
     # User methods (Part 2)
@@ -114,6 +114,18 @@ class HBnBFacade:
     def get_all_places(self):
         return self.place_repo.get_all()
 
+    def get_places_nearby(self, latitude, longitude, radius_km, limit=None):
+        """Get (place, distance_km) pairs within radius_km of a point"""
+        if not -90 <= latitude <= 90:
+            raise ValueError("Latitude must be between -90 and 90")
+        if not -180 <= longitude <= 180:
+            raise ValueError("Longitude must be between -180 and 180")
+        if radius_km <= 0:
+            raise ValueError("radius_km must be positive")
+
+        results = self.place_repo.get_nearby(latitude, longitude, radius_km)
+        return results[:limit] if limit else results
+
     def update_place(self, place_id, data):
         place = self.place_repo.get(place_id)
         if not place:
@@ -212,7 +224,9 @@ class HBnBFacade:
             if new_rating is None or not isinstance(new_rating, int) or not (1 <= new_rating <= 5):
                 raise ValueError("rating must be an integer between 1 and 5")
 
-        return self.review_repo.update(review_id, review_data)
+        # A review cannot move to another place or user
+        changes = {key: review_data[key] for key in ("text", "rating") if key in review_data}
+        return self.review_repo.update(review_id, changes)
 
     def delete_review(self, review_id):
         review = self.review_repo.get(review_id)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Tests for the in-memory repository indexes and the place grid"""
+
+import pytest
+
+from app.models.user import User
+from app.persistence.repository import InMemoryRepository
+from app.services.facade import HBnBFacade
+
+
+def make_user(facade, email, first_name="Test"):
+    return facade.create_user({'first_name': first_name, 'last_name': "User", 'email': email})
+
+
+def make_place(facade, owner, latitude, longitude):
+    return facade.create_place({'title': "Flat", 'price': 100, 'latitude': latitude,
+                                'longitude': longitude, 'owner_id': owner.id})
+
+
+def nearby_ids(facade, latitude, longitude):
+    return [place.id for place, _ in facade.get_places_nearby(latitude, longitude, 5)]
+
+
+def test_email_lookup_follows_create_update_delete():
+    facade = HBnBFacade()
+    user = make_user(facade, "Alice@Example.com")
+    assert facade.get_user_by_email("alice@example.com") is user
+
+    facade.update_user(user.id, {'email': "alice.new@example.com"})
+    assert facade.get_user_by_email("alice@example.com") is None
+    assert facade.get_user_by_email("alice.new@example.com") is user
+
+    assert facade.user_repo.delete(user.id)
+    assert facade.get_user_by_email("alice.new@example.com") is None
+    # The freed email can be registered again
+    assert make_user(facade, "alice.new@example.com").id != user.id
+
+
+def test_duplicate_email_is_rejected():
+    facade = HBnBFacade()
+    alice = make_user(facade, "alice@example.com")
+    bob = make_user(facade, "bob@example.com")
+
+    with pytest.raises(ValueError):
+        make_user(facade, " ALICE@example.com ")
+    with pytest.raises(ValueError):
+        facade.update_user(bob.id, {'email': "alice@example.com"})
+    assert facade.get_user_by_email("alice@example.com") is alice
+    assert facade.get_user_by_email("bob@example.com") is bob
+
+    # The repository's own unique index, without the facade's check
+    repo = InMemoryRepository(unique_indexes=('email',))
+    repo.add(User(first_name="A", last_name="B", email="a@example.com"))
+    with pytest.raises(ValueError):
+        repo.add(User(first_name="C", last_name="D", email="a@example.com"))
+
+
+def test_nearby_follows_create_update_delete():
+    facade = HBnBFacade()
+    owner = make_user(facade, "owner@example.com")
+    riyadh = make_place(facade, owner, 24.7136, 46.6753)
+    jeddah = make_place(facade, owner, 21.4858, 39.1925)
+    assert nearby_ids(facade, 24.7136, 46.6753) == [riyadh.id]
+
+    facade.update_place(riyadh.id, {'latitude': 21.4860, 'longitude': 39.1930})
+    assert nearby_ids(facade, 24.7136, 46.6753) == []
+    assert nearby_ids(facade, 21.4858, 39.1925) == [jeddah.id, riyadh.id]
+
+    assert facade.place_repo.delete(jeddah.id)
+    assert nearby_ids(facade, 21.4858, 39.1925) == [riyadh.id]
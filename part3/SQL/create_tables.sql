@@ -18,6 +18,9 @@ CREATE TABLE IF NOT EXISTS places (
     price DECIMAL(10, 2),
     latitude FLOAT,
     longitude FLOAT,
+    geo_cell VARCHAR(16),
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
     owner_id CHAR(36),
     CONSTRAINT fk_place_owner
         FOREIGN KEY (owner_id)
@@ -61,3 +64,30 @@ CREATE TABLE IF NOT EXISTS place_amenity (
         REFERENCES amenities(id)
         ON DELETE CASCADE
 );
+
+-- Response cache version per table, bumped by every write transaction
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL,
+    written_at FLOAT NOT NULL
+);
+
+-- =========================
+-- Search indexes
+-- =========================
+
+CREATE INDEX IF NOT EXISTS ix_places_price ON places (price);
+CREATE INDEX IF NOT EXISTS ix_places_lat_lon ON places (latitude, longitude);
+CREATE INDEX IF NOT EXISTS ix_place_amenity_amenity_place ON place_amenity (amenity_id, place_id);
+CREATE INDEX IF NOT EXISTS ix_places_geo_cell ON places (geo_cell);
+-- Keyset pages of GET /places/, newest-first search and the export order
+CREATE INDEX IF NOT EXISTS ix_places_created_at_id ON places (created_at, id);
+
+-- =========================
+-- Foreign key indexes
+-- =========================
+-- reviews.user_id is served by unique_user_place_review and
+-- place_amenity.place_id by its primary key
+
+CREATE INDEX IF NOT EXISTS ix_places_owner_id ON places (owner_id);
+CREATE INDEX IF NOT EXISTS ix_reviews_place_id ON reviews (place_id);
@@ -7,16 +7,30 @@ from flask_jwt_extended import JWTManager
 from config import DevelopmentConfig
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+from app.passwords import PasswordHasher
+from app.throttle import LoginThrottle
+from app.cache import EntityCache, ResponseCache
+from app.metrics import QueryMetrics
+from app.persistence.routing import RoutingSession
 
 bcrypt = Bcrypt()
 jwt = JWTManager()
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+password_hasher = PasswordHasher()
+login_throttle = LoginThrottle()
+response_cache = ResponseCache()
+entity_cache = EntityCache()
+query_metrics = QueryMetrics()
 
 def create_app(config_class=DevelopmentConfig): 
     """Create and configure the Flask application"""
     
     app = Flask(__name__)
     app.config.from_object(config_class)
+    config_class.init_app(app)
+    if app.config.get('PROXY_FIX_X_FOR'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
     
     CORS(app, resources={
         r"/*": {
@@ -28,13 +42,44 @@ def create_app(config_class=DevelopmentConfig):
     })
     
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
+    login_throttle.init_app(app)
+    response_cache.init_app(app)
+    entity_cache.init_app(app)
+    query_metrics.init_app(app)
     jwt.init_app(app)
     db.init_app(app)
     
-    with app.app_context():
-        db.create_all()
-    
     from app.api.v1 import api_v1_bp
     app.register_blueprint(api_v1_bp)
     
+    # The API import above registers every model on db.metadata
+    from app.persistence.engine import tune_engine
+    from app.persistence.migrations import check_schema, upgrade
+    with app.app_context():
+        for engine in db.engines.values():
+            tune_engine(engine, app.config)
+            query_metrics.instrument(engine)
+        if app.config.get('DATABASE_AUTO_MIGRATE'):
+            upgrade(db.engine)
+        if app.config.get('DATABASE_SCHEMA_CHECK', True):
+            check_schema(db.engine, db.metadata)
+    
+    from app.commands import register_commands
+    register_commands(app)
+    
     return app
+
+
+def reset_after_fork(app):
+    """
+    Per-process reset for a worker forked from a preloaded parent
+    Pooled connections and the bcrypt thread pool belong to the parent;
+    the child drops them (without closing the parent's sockets) and
+    opens its own on first use
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    password_hasher.after_fork()
+    login_throttle.after_fork()
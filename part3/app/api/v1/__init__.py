@@ -7,10 +7,13 @@ from app.api.v1.protected import api as protected_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
 from app.api.v1.amenities import api as amenities_ns  # تاسك 4: إضافة amenities
+from app.api.v1.export import api as export_ns
+from app.api.v1.representations import output_json
 
 api_v1_bp = Blueprint('api_v1', __name__, url_prefix='/api/v1')
 
 api = Api(api_v1_bp, title='HBnB API', version='1.0')
+api.representation('application/json')(output_json)
 
 api.add_namespace(users_ns, path='/users')
 api.add_namespace(auth_ns, path='/auth')
@@ -18,3 +21,4 @@ api.add_namespace(protected_ns, path='/protected')
 api.add_namespace(places_ns, path='/places')
 api.add_namespace(reviews_ns, path='/reviews')
 api.add_namespace(amenities_ns, path='/amenities')  # تاسك 4: تسجيل amenities namespace
+api.add_namespace(export_ns, path='/export')
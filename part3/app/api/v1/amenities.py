@@ -1,6 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt  # تاسك 4: استيراد JWT للتحقق من Admin
+from app import response_cache
 from app.services import facade
+from app.api.v1.bulk import read_bulk_rows
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -36,15 +38,34 @@ class AmenityList(Resource):
             return {'error': str(e)}, 400
 
     @api.response(200, 'List of amenities retrieved successfully')
+    @response_cache.cached('amenities')
     def get(self):  # تاسك 4: endpoint عام - لا يحتاج تسجيل دخول
         """Retrieve a list of all amenities (public)"""
         amenities = facade.get_all_amenities()
         return [amenity.to_dict() for amenity in amenities], 200
 
+@api.route('/bulk')
+class AmenityBulk(Resource):
+    @api.doc(description='JSON array or NDJSON (Content-Type: application/x-ndjson) of amenities')
+    @api.response(200, 'Import report with per-row errors')
+    @api.response(400, 'Invalid body')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Bulk import amenities (Admin only)"""
+        if not get_jwt().get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        try:
+            rows = read_bulk_rows()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return facade.bulk_create_amenities(rows), 200
+
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     @api.response(200, 'Amenity details retrieved successfully')
     @api.response(404, 'Amenity not found')
+    @response_cache.cached('amenities')
     def get(self, amenity_id):  # تاسك 4: endpoint عام - لا يحتاج تسجيل دخول
         """Get amenity details by ID (public)"""
         amenity = facade.get_amenity(amenity_id)
@@ -1,6 +1,10 @@
+import math
+from flask import request
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt
+from app import login_throttle
 from app.services.facade import facade
+from app.services.validation import check_credentials
 
 api = Namespace('auth', description='Authentication operations')
 
@@ -12,13 +16,26 @@ login_model = api.model('Login', {
 @api.route('/login')
 class Login(Resource):
     @api.expect(login_model)
+    @api.response(400, 'Email or password missing or not a string')
+    @api.response(429, 'Too many login attempts')
     def post(self):
         """User login"""
-        credentials = api.payload
-        user = facade.get_user_by_email(credentials['email'])
+        try:
+            email, password = check_credentials(api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         
-        if not user or not user.verify_password(credentials['password']):
+        # Throttle before any bcrypt work is done
+        retry_after = login_throttle.check(email, request.remote_addr)
+        if retry_after:
+            return {'error': 'Too many login attempts'}, 429, \
+                {'Retry-After': str(math.ceil(retry_after))}
+        
+        user = facade.authenticate_user(email, password)
+        
+        if not user:
             return {'error': 'Invalid credentials'}, 401
+        login_throttle.succeeded(email, request.remote_addr)
         
         access_token = create_access_token(
             identity=str(user.id),
@@ -26,3 +43,14 @@ class Login(Resource):
         )
         
         return {'access_token': access_token}, 200
+
+@api.route('/throttle-stats')
+class ThrottleStats(Resource):
+    @api.response(200, 'Login throttle counters')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Login throttle counters (Admin only)"""
+        if not get_jwt().get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        return login_throttle.stats(), 200
@@ -0,0 +1,32 @@
+"""
+Request parsing shared by the admin /bulk import endpoints
+"""
+import json
+from flask import request
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+def _ndjson_rows(stream):
+    """Yield one parsed object per non-empty line; bad lines yield ValueError"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+
+
+def read_bulk_rows():
+    """
+    Rows of a bulk upload
+    NDJSON bodies are streamed line by line; anything else must be a JSON array
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        return _ndjson_rows(request.stream)
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        raise ValueError("Body must be a JSON array or NDJSON")
+    return rows
@@ -0,0 +1,43 @@
+"""
+Streaming catalog export (Admin only)
+"""
+from flask import Response, request, stream_with_context
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from app.export import EXPORT_TYPES, export_chunks, parse_export_types
+from app.services import facade
+
+api = Namespace('export', description='Catalog export')
+
+
+@api.route('/')
+class CatalogExport(Resource):
+    @api.doc(params={
+        'types': f"Comma-separated subset of {', '.join(EXPORT_TYPES)} (default: all)",
+        'cursor': 'Resume after the line carrying this cursor'
+    }, description='NDJSON, one {"type", "cursor", "data"} object per line; '
+                   'gzip-compressed when the client sends Accept-Encoding: gzip')
+    @api.response(200, 'NDJSON stream')
+    @api.response(400, 'Invalid types or cursor')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Stream users, amenities, places and reviews as NDJSON"""
+        if not get_jwt().get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        try:
+            types = parse_export_types(request.args.get('types'))
+            records = facade.export_catalog(types, cursor=request.args.get('cursor'))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        compress = 'gzip' in request.accept_encodings
+        headers = {'Content-Disposition': 'attachment; filename="hbnb-export.ndjson"'}
+        if compress:
+            headers['Content-Encoding'] = 'gzip'
+            headers['Vary'] = 'Accept-Encoding'
+        return Response(
+            stream_with_context(export_chunks(records, compress=compress)),
+            mimetype='application/x-ndjson',
+            headers=headers
+        )
@@ -0,0 +1,79 @@
+"""
+Query-string and payload parsing shared by the WSGI and ASGI place endpoints
+
+Each *_args function takes the request's query arguments as a mapping
+(Flask's request.args or Starlette's request.query_params). All of them
+raise ValueError with the message the endpoint returns as a 400.
+"""
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+BBOX_ARGS = ('min_lat', 'min_lon', 'max_lat', 'max_lon')
+
+
+def float_arg(args, name):
+    """Read an optional float query parameter"""
+    value = args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
+
+def limit_arg(args):
+    """Read and bound the limit query parameter"""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1 or limit > MAX_PAGE_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    return limit
+
+
+def search_args(args):
+    """Keyword arguments for search_places from /places/search parameters"""
+    bbox = [float_arg(args, name) for name in BBOX_ARGS]
+    if all(value is None for value in bbox):
+        bbox = None
+    elif any(value is None for value in bbox):
+        raise ValueError("min_lat, min_lon, max_lat and max_lon must be given together")
+
+    amenities = args.get('amenities', '')
+    amenity_ids = [a.strip() for a in amenities.split(',') if a.strip()]
+
+    try:
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        raise ValueError("offset must be an integer")
+
+    return {
+        'min_price': float_arg(args, 'min_price'),
+        'max_price': float_arg(args, 'max_price'),
+        'bbox': bbox,
+        'amenity_ids': amenity_ids,
+        'min_rating': float_arg(args, 'min_rating'),
+        'sort': args.get('sort', 'newest'),
+        'limit': limit_arg(args),
+        'offset': offset
+    }
+
+
+def nearby_args(args):
+    """(latitude, longitude, radius_km, limit) from /places/nearby parameters"""
+    latitude = float_arg(args, 'lat')
+    longitude = float_arg(args, 'lon')
+    radius_km = float_arg(args, 'radius_km')
+    if latitude is None or longitude is None or radius_km is None:
+        raise ValueError("lat, lon and radius_km are required")
+    return latitude, longitude, radius_km, limit_arg(args)
+
+
+def amenity_ids_payload(payload):
+    """Amenity IDs from a [{"id": ...}, ...] request body"""
+    if not payload or not isinstance(payload, list) \
+            or not all(isinstance(item, dict) for item in payload):
+        raise ValueError("Invalid input data")
+    return [item.get('id') for item in payload]
@@ -1,6 +1,12 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app import response_cache
 from app.services import facade
+from app.api.v1.bulk import read_bulk_rows
+from app.api.v1.params import (DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, amenity_ids_payload,
+                               limit_arg, nearby_args, search_args)
+from app.api.v1.serializers import place_serializer, review_serializer
 
 api = Namespace('places', description='Place operations')
 
@@ -32,6 +38,11 @@ place_model = api.model('Place', {
     'amenities': fields.List(fields.String, description="List of amenities ID's")
 })
 
+PROJECTION_PARAMS = {
+    'fields': f"Comma-separated subset of: {', '.join(place_serializer.fields)}",
+    'expand': f"Comma-separated related rows to embed: {', '.join(place_serializer.expansions)}"
+}
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_model)
@@ -49,24 +60,123 @@ class PlaceList(Resource):
         except Exception as e:
             return {'error': str(e)}, 400
 
+    @api.doc(params={
+        'limit': f'Page size (default {DEFAULT_PAGE_LIMIT}, max {MAX_PAGE_LIMIT})',
+        'cursor': 'Cursor returned as next_cursor by the previous page',
+        **PROJECTION_PARAMS
+    })
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
+    @response_cache.cached('places', 'reviews', 'amenities')
     def get(self):
-        """Get all places (public endpoint)"""
-        places = facade.get_all_places()
-        return [place.to_dict() for place in places], 200
+        """Get a page of places (public endpoint)"""
+        try:
+            projection = place_serializer.from_request()
+            places, next_cursor = facade.get_places_page(
+                limit_arg(request.args), request.args.get('cursor'),
+                options=place_serializer.options(projection))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return {
+            'places': place_serializer.dump_many(places, projection),
+            'next_cursor': next_cursor
+        }, 200
+
+@api.route('/bulk')
+class PlaceBulk(Resource):
+    @api.doc(description='JSON array or NDJSON (Content-Type: application/x-ndjson) of places')
+    @api.response(200, 'Import report with per-row errors')
+    @api.response(400, 'Invalid body')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Bulk import places (Admin only)"""
+        if not get_jwt().get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        try:
+            rows = read_bulk_rows()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return facade.bulk_create_places(rows, default_owner_id=get_jwt_identity()), 200
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.doc(params={
+        'min_price': 'Minimum price per night',
+        'max_price': 'Maximum price per night',
+        'min_lat': 'Bounding box south edge',
+        'min_lon': 'Bounding box west edge',
+        'max_lat': 'Bounding box north edge',
+        'max_lon': 'Bounding box east edge',
+        'amenities': 'Comma-separated amenity IDs the place must all have',
+        'min_rating': 'Minimum average review rating (1-5)',
+        'sort': 'newest (default), price_asc, price_desc or rating',
+        'limit': f'Page size (default {DEFAULT_PAGE_LIMIT}, max {MAX_PAGE_LIMIT})',
+        'offset': 'Number of matching places to skip',
+        **PROJECTION_PARAMS
+    })
+    @api.response(200, 'Matching places retrieved successfully')
+    @api.response(400, 'Invalid search parameters')
+    @response_cache.cached('places', 'reviews', 'amenities')
+    def get(self):
+        """Search places by price, location, amenities and rating (public endpoint)"""
+        try:
+            projection = place_serializer.from_request()
+            places = facade.search_places(
+                **search_args(request.args),
+                options=place_serializer.options(projection)
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return place_serializer.dump_many(places, projection), 200
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.doc(params={
+        'lat': 'Latitude of the search centre',
+        'lon': 'Longitude of the search centre',
+        'radius_km': 'Search radius in kilometres',
+        'limit': f'Maximum number of places (default {DEFAULT_PAGE_LIMIT}, max {MAX_PAGE_LIMIT})',
+        **PROJECTION_PARAMS
+    })
+    @api.response(200, 'Nearby places retrieved successfully')
+    @api.response(400, 'Invalid location parameters')
+    @response_cache.cached('places', 'reviews', 'amenities')
+    def get(self):
+        """Get places within a radius, nearest first (public endpoint)"""
+        try:
+            latitude, longitude, radius_km, limit = nearby_args(request.args)
+            projection = place_serializer.from_request()
+            results = facade.get_places_nearby(
+                latitude, longitude, radius_km, limit=limit,
+                options=place_serializer.options(projection))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        places = []
+        for place, distance in results:
+            data = place_serializer.dump(place, projection)
+            data['distance_km'] = round(distance, 3)
+            places.append(data)
+        return places, 200
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
+    @api.doc(params=PROJECTION_PARAMS)
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(400, 'Invalid fields or expand')
     @api.response(404, 'Place not found')
+    @response_cache.cached('places', 'reviews', 'amenities')
     def get(self, place_id):
         """Get place details (public endpoint)"""
+        try:
+            projection = place_serializer.from_request()
+        except ValueError as e:
+            return {'error': str(e)}, 400
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
-        if hasattr(place, 'to_dict_list'):
-            return place.to_dict_list(), 200
-        return place.to_dict(), 200
+        return place_serializer.dump(place, projection), 200
 
     @api.expect(place_model)
     @api.response(200, 'Place updated successfully')
@@ -104,30 +214,55 @@ class PlaceAmenities(Resource):
     @api.response(404, 'Place not found')
     @api.response(400, 'Invalid input data')
     def post(self, place_id):
-        amenities_data = api.payload
-        if not amenities_data or len(amenities_data) == 0:
-            return {'error': 'Invalid input data'}, 400
+        """Attach amenities to a place"""
+        try:
+            amenity_ids = amenity_ids_payload(api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
-        for amenity in amenities_data:
-            a = facade.get_amenity(amenity['id'])
-            if not a:
-                return {'error': 'Invalid input data'}, 400
-        for amenity in amenities_data:
-            a = facade.get_amenity(amenity['id'])
-            if a:
-                place.add_amenity(a)
-        from app import db
-        db.session.commit()
+        try:
+            facade.attach_amenities(place_id, amenity_ids)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         return {'message': 'Amenities added successfully'}, 200
 
+    @api.expect(amenity_model)
+    @api.response(200, 'Amenities removed successfully')
+    @api.response(404, 'Place not found')
+    @api.response(403, 'Unauthorized action')
+    @api.response(400, 'Invalid input data')
+    @jwt_required()
+    def delete(self, place_id):
+        """Detach amenities from a place (owner or admin)"""
+        try:
+            amenity_ids = amenity_ids_payload(api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        place = facade.get_place(place_id)
+        if not place:
+            return {'error': 'Place not found'}, 404
+        if not get_jwt().get('is_admin', False) and place.owner_id != get_jwt_identity():
+            return {'error': 'Unauthorized action'}, 403
+        facade.detach_amenities(place_id, amenity_ids)
+        return {'message': 'Amenities removed successfully'}, 200
+
 @api.route('/<place_id>/reviews')
 class PlaceReviewList(Resource):
+    @api.doc(params={'fields': f"Comma-separated subset of: {', '.join(review_serializer.fields)}"})
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(400, 'Invalid fields')
     @api.response(404, 'Place not found')
+    @response_cache.cached('places', 'reviews')
     def get(self, place_id):
+        try:
+            projection = review_serializer.from_request()
+        except ValueError as e:
+            return {'error': str(e)}, 400
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
-        return [review.to_dict() for review in place.reviews], 200
\ No newline at end of file
+        reviews = facade.get_reviews_by_place(
+            place_id, options=review_serializer.options(projection))
+        return review_serializer.dump_many(reviews, projection), 200
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+JSON response representation for the v1 Api
+
+Bodies are encoded with orjson when it is installed and with the
+stdlib json module otherwise. Both encode datetimes natively as
+ISO 8601, so serializers can hand over column values untouched.
+RESTX_JSON_ENCODER picks the encoder: 'auto' (default), 'orjson' or
+'stdlib'.
+
+A resource can return a JSONArrayStream instead of a list; its items are
+encoded and sent in chunks while they are being produced, so a large
+listing is never held in memory as one list or one string.
+"""
+from datetime import date, datetime
+import json
+from flask import Response, current_app, make_response, stream_with_context
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Bytes buffered before a streamed chunk is sent
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _default(value):
+    """stdlib fallback for the types orjson encodes natively"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(data, indent=None):
+    separators = None if indent else (',', ':')
+    return json.dumps(data, default=_default, indent=indent,
+                      separators=separators).encode('utf-8')
+
+
+def _orjson_dumps(data, indent=None):
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, option=option)
+
+
+ENCODERS = {'stdlib': _stdlib_dumps}
+if orjson is not None:
+    ENCODERS['orjson'] = _orjson_dumps
+
+
+def get_encoder(name='auto'):
+    """Return a dumps(data, indent=None) -> bytes function by name"""
+    if name == 'auto':
+        return ENCODERS.get('orjson', _stdlib_dumps)
+    try:
+        return ENCODERS[name]
+    except KeyError:
+        raise ValueError(f"JSON encoder '{name}' is not available")
+
+
+class _ArrayBuffer:
+    """Accumulates encoded array items and hands out chunk_bytes-sized pieces"""
+
+    def __init__(self, dumps, chunk_bytes):
+        self.dumps = dumps
+        self.chunk_bytes = chunk_bytes
+        self.buffer = [b'[']
+        self.size = 1
+        self.first = True
+
+    def add(self, item):
+        """Buffer one item; returns a chunk to send once enough is buffered"""
+        encoded = self.dumps(item)
+        if not self.first:
+            self.buffer.append(b',')
+        self.buffer.append(encoded)
+        self.first = False
+        self.size += len(encoded) + 1
+        if self.size >= self.chunk_bytes:
+            chunk = b''.join(self.buffer)
+            self.buffer = []
+            self.size = 0
+            return chunk
+        return None
+
+    def close(self):
+        self.buffer.append(b']\n')
+        return b''.join(self.buffer)
+
+
+class JSONArrayStream:
+    """
+    An iterable of JSON-encodable items sent as one streamed array
+    items may also be an async iterable, consumed with async_chunks()
+    """
+
+    def __init__(self, items):
+        self.items = items
+
+    def chunks(self, dumps, chunk_bytes=STREAM_CHUNK_BYTES):
+        array = _ArrayBuffer(dumps, chunk_bytes)
+        for item in self.items:
+            chunk = array.add(item)
+            if chunk:
+                yield chunk
+        yield array.close()
+
+    async def async_chunks(self, dumps, chunk_bytes=STREAM_CHUNK_BYTES):
+        array = _ArrayBuffer(dumps, chunk_bytes)
+        async for item in self.items:
+            chunk = array.add(item)
+            if chunk:
+                yield chunk
+        yield array.close()
+
+
+def output_json(data, code, headers=None):
+    """Make a JSON response with the configured encoder"""
+    dumps = get_encoder(current_app.config.get('RESTX_JSON_ENCODER', 'auto'))
+
+    if isinstance(data, JSONArrayStream):
+        resp = Response(stream_with_context(data.chunks(dumps)), code,
+                        mimetype='application/json')
+    else:
+        # Indent in debug mode like the Flask-RESTX default representation
+        indent = current_app.config.get('RESTX_JSON', {}).get(
+            'indent', 4 if current_app.debug else None)
+        resp = make_response(dumps(data, indent=indent) + b'\n', code)
+        resp.mimetype = 'application/json'
+    resp.headers.extend(headers or {})
+    return resp
@@ -2,7 +2,11 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app import response_cache
 from app.services import facade
+from app.api.v1.bulk import read_bulk_rows
+from app.api.v1.representations import JSONArrayStream
+from app.api.v1.serializers import review_serializer
 
 api = Namespace('reviews', description='Review operations')
 
@@ -35,27 +39,47 @@ class ReviewList(Resource):
         if not place:
             return {'error': 'Place not found'}, 404
         
-        existing_reviews = facade.get_reviews_by_place(data['place_id'])
-        for review in existing_reviews:
-            if review.user.id == current_user:
-                return {'error': 'You have already reviewed this place'}, 400
-        
         try:
             review = facade.create_review(data)
             return review.to_dict(), 201
         except Exception as e:
             return {'error': str(e)}, 400
 
+    @api.doc(params={'fields': f"Comma-separated subset of: {', '.join(review_serializer.fields)}"})
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid fields')
+    @response_cache.cached('reviews')
     def get(self):
         """Get all reviews (public endpoint)"""
-        reviews = facade.get_all_reviews()
-        return [r.to_dict() for r in reviews], 200
+        try:
+            projection = review_serializer.from_request()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        reviews = facade.iter_all_reviews(options=review_serializer.options(projection))
+        return JSONArrayStream(review_serializer.dump_iter(reviews, projection)), 200
+
+@api.route('/bulk')
+class ReviewBulk(Resource):
+    @api.doc(description='JSON array or NDJSON (Content-Type: application/x-ndjson) of reviews')
+    @api.response(200, 'Import report with per-row errors')
+    @api.response(400, 'Invalid body')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Bulk import reviews (Admin only)"""
+        if not get_jwt().get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        try:
+            rows = read_bulk_rows()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return facade.bulk_create_reviews(rows), 200
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
     @api.response(200, 'Review details retrieved successfully')
     @api.response(404, 'Review not found')
+    @response_cache.cached('reviews')
     def get(self, review_id):
         """Get review details (public endpoint)"""
         review = facade.get_review(review_id)
@@ -0,0 +1,123 @@
+"""
+Column projections for list and detail responses
+
+A Serializer knows which columns each output field reads, so a request
+with ?fields=id,title loads only those columns, and related rows are
+only loaded (with one extra SELECT each) when asked for with ?expand=.
+Datetimes are left as they are; the JSON representation encodes them.
+"""
+from collections import namedtuple
+from flask import request
+from sqlalchemy.orm import load_only, selectinload
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+
+Projection = namedtuple('Projection', ['fields', 'expand'])
+
+
+def column(name):
+    """A field that is the column of the same name"""
+    return (lambda obj: getattr(obj, name), (name,))
+
+
+class Serializer:
+    """
+    Render instances of one model as dicts
+    fields maps each output field to (getter, columns read); expansions
+    maps each ?expand= name to (relationship, related fields)
+    """
+
+    def __init__(self, model, fields, expansions=None):
+        self.model = model
+        self.fields = fields
+        self.expansions = expansions or {}
+
+    def projection(self, fields=None, expand=None):
+        """Validate comma-separated fields/expand values; all fields by default"""
+        selected = tuple(self.fields)
+        if fields:
+            selected = tuple(f.strip() for f in fields.split(',') if f.strip())
+            unknown = [f for f in selected if f not in self.fields]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        expanded = ()
+        if expand:
+            expanded = tuple(e.strip() for e in expand.split(',') if e.strip())
+            unknown = [e for e in expanded if e not in self.expansions]
+            if unknown:
+                raise ValueError(f"Unknown expand: {', '.join(unknown)}")
+        return Projection(selected, expanded)
+
+    def from_args(self, args):
+        """Projection for ?fields= and ?expand= in a query-argument mapping"""
+        return self.projection(args.get('fields'), args.get('expand'))
+
+    def from_request(self):
+        """Projection for the current Flask request's ?fields= and ?expand="""
+        return self.from_args(request.args)
+
+    def options(self, projection):
+        """Loader options that read only the projected columns"""
+        columns = {'id'}
+        for name in projection.fields:
+            columns.update(self.fields[name][1])
+        options = [load_only(*[getattr(self.model, c) for c in sorted(columns)])]
+        for name in projection.expand:
+            relationship, serializer = self.expansions[name]
+            related = serializer.projection()
+            options.append(selectinload(relationship).options(*serializer.options(related)))
+        return options
+
+    def dump(self, obj, projection):
+        data = {name: self.fields[name][0](obj) for name in projection.fields}
+        for name in projection.expand:
+            relationship, serializer = self.expansions[name]
+            related = serializer.projection()
+            data[name] = [serializer.dump(item, related)
+                          for item in getattr(obj, relationship.key)]
+        return data
+
+    def dump_many(self, objs, projection):
+        return [self.dump(obj, projection) for obj in objs]
+
+    def dump_iter(self, objs, projection):
+        """Lazily render objs, for streamed responses"""
+        return (self.dump(obj, projection) for obj in objs)
+
+
+_place_amenity = Serializer(Amenity, {
+    'id': column('id'),
+    'name': column('name')
+})
+_place_review = Serializer(Review, {
+    'id': column('id'),
+    'text': column('text'),
+    'rating': column('rating'),
+    'user_id': column('user_id')
+})
+place_serializer = Serializer(Place, {
+    'id': column('id'),
+    'created_at': column('created_at'),
+    'updated_at': column('updated_at'),
+    'title': column('title'),
+    'description': column('description'),
+    'price': column('price'),
+    'latitude': column('latitude'),
+    'longitude': column('longitude'),
+    'owner_id': column('owner_id'),
+    'review_count': (lambda obj: obj.review_count or 0, ('review_count',)),
+    'avg_rating': (lambda obj: obj.avg_rating, ('review_count', 'rating_sum'))
+}, expansions={
+    'amenities': (Place.amenities, _place_amenity),
+    'reviews': (Place.reviews, _place_review)
+})
+review_serializer = Serializer(Review, {
+    'id': column('id'),
+    'created_at': column('created_at'),
+    'updated_at': column('updated_at'),
+    'text': column('text'),
+    'rating': column('rating'),
+    'place_id': column('place_id'),
+    'user_id': column('user_id')
+})
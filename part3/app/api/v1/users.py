@@ -5,6 +5,7 @@ User API endpoints
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt  # تاسك 4: إضافة get_jwt
 from app.services.facade import facade
+from app.api.v1.representations import JSONArrayStream
 
 api = Namespace('users', description='User operations')
 
@@ -34,8 +35,8 @@ class UserList(Resource):
     @api.response(200, 'List of users retrieved successfully')
     def get(self):
         """Get all users"""
-        users = facade.get_all_users()
-        return [user.to_dict() for user in users], 200
+        users = facade.iter_all_users()
+        return JSONArrayStream(user.to_dict() for user in users), 200
     
     @api.expect(user_model)
     @api.response(201, 'User successfully created')
@@ -113,9 +114,6 @@ class UserResource(Resource):
         
         try:
             # تاسك 4: Admin يقدر يعدل password أيضاً
-            if is_admin and 'password' in user_data:
-                user.hash_password(user_data['password'])
-        
             facade.update_user(user_id, user_data)
             return {'message': 'User updated successfully'}, 200
         except Exception as e:
@@ -0,0 +1,146 @@
+"""
+ASGI application serving the /api/v1 surface on asyncio
+
+create_asgi_app() builds the Flask app first, so configuration,
+extension setup, migrations and the startup schema check are exactly
+those of the WSGI app; the Starlette app then serves the same routes
+through AsyncHBnBFacade on an async engine (aiosqlite for SQLite).
+Database round trips and bcrypt are awaited, so one worker keeps many
+requests in flight.
+
+Per-request SQL metrics (Server-Timing, the 'app.sql' log line and
+query budgets) are those of the Flask app; budgets apply under the
+Flask endpoint names of the mirrored resources.
+
+Not served here: the admin bulk imports and the catalog export (batch
+jobs that stay on WSGI), the Swagger UI, and the response cache.
+"""
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount
+from config import DevelopmentConfig
+from app import create_app, db, query_metrics
+from app.api.v1.representations import get_encoder
+from app.persistence.async_db import async_db
+
+
+class SessionScopeMiddleware:
+    """Give each HTTP request its own AsyncSession, closed when it is done"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        async with async_db.session_scope():
+            await self.app(scope, receive, send)
+
+
+class ForwardedForMiddleware:
+    """
+    Take the client address from X-Forwarded-For as set by the last
+    `trusted` proxies, like werkzeug's ProxyFix(x_for=trusted) does for
+    the Flask app
+    """
+
+    def __init__(self, app, trusted=1):
+        self.app = app
+        self.trusted = trusted
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            header = Headers(scope=scope).get('x-forwarded-for')
+            values = [v.strip() for v in header.split(',')] if header else []
+            if len(values) >= self.trusted and values[-self.trusted]:
+                port = scope['client'][1] if scope.get('client') else 0
+                scope = dict(scope, client=(values[-self.trusted], port))
+        await self.app(scope, receive, send)
+
+
+class QueryMetricsMiddleware:
+    """Count each HTTP request's SQL like QueryMetrics does for Flask requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        stats = query_metrics.start(f"{scope['method']} {scope['path']}")
+        if stats is None:
+            return await self.app(scope, receive, send)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if query_metrics.enabled:
+                    MutableHeaders(scope=message).append('Server-Timing',
+                                                         stats.server_timing())
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+        # Routing put the matched Resource in the scope
+        endpoint = scope.get('endpoint')
+        query_metrics.finish(stats, scope['method'], scope['path'],
+                             getattr(endpoint, 'endpoint_name', lambda: None)(), status)
+
+
+async def _http_error(request, exc):
+    """Errors raised by routing (404, 405) as JSON, like Flask-RESTX"""
+    body = request.app.state.dumps({'message': exc.detail}) + b'\n'
+    return Response(body, status_code=exc.status_code, headers=exc.headers,
+                    media_type='application/json')
+
+
+def create_asgi_app(config_class=DevelopmentConfig):
+    """Create the Starlette application for a Flask config class"""
+    flask_app = create_app(config_class)
+    async_db.init_app(flask_app)
+
+    from app.asgi import amenities, auth, places, reviews, users
+
+    @asynccontextmanager
+    async def lifespan(app):
+        url = async_db.engine.url
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            # A private in-memory database: the migrations ran on the
+            # Flask engine's copy, so build the schema here too
+            async with async_db.engine.begin() as conn:
+                await conn.run_sync(db.metadata.create_all)
+        yield
+        await async_db.dispose()
+
+    app = Starlette(
+        routes=[Mount('/api/v1', routes=[
+            Mount('/users', routes=users.routes),
+            Mount('/auth', routes=auth.routes),
+            Mount('/protected', routes=auth.protected_routes),
+            Mount('/places', routes=places.routes),
+            Mount('/reviews', routes=reviews.routes),
+            Mount('/amenities', routes=amenities.routes)
+        ])],
+        middleware=[
+            *([Middleware(ForwardedForMiddleware, trusted=flask_app.config['PROXY_FIX_X_FOR'])]
+              if flask_app.config.get('PROXY_FIX_X_FOR') else []),
+            Middleware(QueryMetricsMiddleware),
+            Middleware(CORSMiddleware,
+                       allow_origins=['*'],
+                       allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+                       allow_headers=['Content-Type', 'Authorization'],
+                       expose_headers=['Content-Type', 'Authorization']),
+            Middleware(SessionScopeMiddleware)
+        ],
+        exception_handlers={HTTPException: _http_error},
+        lifespan=lifespan
+    )
+    app.state.flask_app = flask_app
+    app.state.dumps = get_encoder(flask_app.config.get('RESTX_JSON_ENCODER', 'auto'))
+    return app
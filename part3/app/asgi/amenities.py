@@ -0,0 +1,62 @@
+"""
+Amenity endpoints (ASGI)
+"""
+from starlette.routing import Route
+from app.asgi.resource import Resource, read_payload
+from app.asgi.tokens import get_jwt, jwt_required
+from app.services.async_facade import async_facade as facade
+
+
+class AmenityList(Resource):
+    @jwt_required
+    async def post(self, request):
+        """Register a new amenity (Admin only)"""
+        if not get_jwt(request).get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        amenity_data = await read_payload(request)
+        if await facade.get_amenity_by_name(amenity_data.get('name')):
+            return {'error': 'Amenity already exists'}, 400
+
+        try:
+            new_amenity = await facade.create_amenity(amenity_data)
+            return new_amenity.to_dict(), 201
+        except Exception as e:
+            return {'error': str(e)}, 400
+
+    async def get(self, request):
+        """Retrieve a list of all amenities (public)"""
+        amenities = await facade.get_all_amenities()
+        return [amenity.to_dict() for amenity in amenities], 200
+
+
+class AmenityResource(Resource):
+    async def get(self, request, amenity_id):
+        """Get amenity details by ID (public)"""
+        amenity = await facade.get_amenity(amenity_id)
+        if not amenity:
+            return {'error': 'Amenity not found'}, 404
+        return amenity.to_dict(), 200
+
+    @jwt_required
+    async def put(self, request, amenity_id):
+        """Update an amenity's information (Admin only)"""
+        if not get_jwt(request).get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        amenity_data = await read_payload(request)
+        amenity = await facade.get_amenity(amenity_id)
+        if not amenity:
+            return {'error': 'Amenity not found'}, 404
+
+        try:
+            await facade.update_amenity(amenity_id, amenity_data)
+            return {'message': 'Amenity updated successfully'}, 200
+        except Exception as e:
+            return {'error': str(e)}, 400
+
+
+routes = [
+    Route('/', AmenityList),
+    Route('/{amenity_id}', AmenityResource)
+]
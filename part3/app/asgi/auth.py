@@ -0,0 +1,63 @@
+"""
+Authentication endpoints (ASGI)
+"""
+import math
+from starlette.routing import Route
+from app import login_throttle
+from app.asgi.resource import Resource, read_payload
+from app.asgi.tokens import get_jwt, get_jwt_identity, issue_access_token, jwt_required
+from app.services.async_facade import async_facade as facade
+from app.services.validation import check_credentials
+
+
+class Login(Resource):
+    async def post(self, request):
+        """User login"""
+        try:
+            email, password = check_credentials(await read_payload(request))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        # Throttle before any bcrypt work is done
+        client = request.client.host if request.client else None
+        retry_after = login_throttle.check(email, client)
+        if retry_after:
+            return {'error': 'Too many login attempts'}, 429, \
+                {'Retry-After': str(math.ceil(retry_after))}
+
+        user = await facade.authenticate_user(email, password)
+        if not user:
+            return {'error': 'Invalid credentials'}, 401
+        login_throttle.succeeded(email, client)
+
+        return {'access_token': issue_access_token(request, user)}, 200
+
+
+class ThrottleStats(Resource):
+    @jwt_required
+    async def get(self, request):
+        """Login throttle counters (Admin only)"""
+        if not get_jwt(request).get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        return login_throttle.stats(), 200
+
+
+class Protected(Resource):
+    namespace = 'protected'
+
+    @jwt_required
+    async def get(self, request):
+        """Access a protected endpoint"""
+        return {
+            'message': f'Hello, user {get_jwt_identity(request)}'
+        }, 200
+
+
+routes = [
+    Route('/login', Login),
+    Route('/throttle-stats', ThrottleStats)
+]
+
+protected_routes = [
+    Route('/', Protected)
+]
@@ -0,0 +1,160 @@
+"""
+Place endpoints (ASGI)
+"""
+from starlette.routing import Route
+from app.api.v1.params import amenity_ids_payload, limit_arg, nearby_args, search_args
+from app.api.v1.serializers import place_serializer, review_serializer
+from app.asgi.resource import Resource, read_payload
+from app.asgi.tokens import get_jwt, get_jwt_identity, jwt_required
+from app.services.async_facade import async_facade as facade
+
+
+class PlaceList(Resource):
+    @jwt_required
+    async def post(self, request):
+        """Create a new place"""
+        place_data = await read_payload(request)
+        place_data['owner_id'] = get_jwt_identity(request)
+        try:
+            new_place = await facade.create_place(place_data)
+            return new_place.to_dict(), 201
+        except Exception as e:
+            return {'error': str(e)}, 400
+
+    async def get(self, request):
+        """Get a page of places (public endpoint)"""
+        args = request.query_params
+        try:
+            projection = place_serializer.from_args(args)
+            places, next_cursor = await facade.get_places_page(
+                limit_arg(args), args.get('cursor'),
+                options=place_serializer.options(projection))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return {
+            'places': place_serializer.dump_many(places, projection),
+            'next_cursor': next_cursor
+        }, 200
+
+
+class PlaceSearch(Resource):
+    async def get(self, request):
+        """Search places by price, location, amenities and rating (public endpoint)"""
+        args = request.query_params
+        try:
+            projection = place_serializer.from_args(args)
+            places = await facade.search_places(
+                **search_args(args),
+                options=place_serializer.options(projection)
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return place_serializer.dump_many(places, projection), 200
+
+
+class PlaceNearby(Resource):
+    async def get(self, request):
+        """Get places within a radius, nearest first (public endpoint)"""
+        args = request.query_params
+        try:
+            latitude, longitude, radius_km, limit = nearby_args(args)
+            projection = place_serializer.from_args(args)
+            results = await facade.get_places_nearby(
+                latitude, longitude, radius_km, limit=limit,
+                options=place_serializer.options(projection))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        places = []
+        for place, distance in results:
+            data = place_serializer.dump(place, projection)
+            data['distance_km'] = round(distance, 3)
+            places.append(data)
+        return places, 200
+
+
+class PlaceResource(Resource):
+    async def get(self, request, place_id):
+        """Get place details (public endpoint)"""
+        try:
+            projection = place_serializer.from_args(request.query_params)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        place = await facade.get_place(place_id, options=place_serializer.options(projection))
+        if not place:
+            return {'error': 'Place not found'}, 404
+        return place_serializer.dump(place, projection), 200
+
+    @jwt_required
+    async def put(self, request, place_id):
+        """Update a place"""
+        place = await facade.get_place(place_id)
+        if not place:
+            return {'error': 'Place not found'}, 404
+        if not get_jwt(request).get('is_admin', False) \
+                and place.owner_id != get_jwt_identity(request):
+            return {'error': 'Unauthorized action'}, 403
+        place_data = await read_payload(request)
+        try:
+            await facade.update_place(place_id, place_data)
+            return {'message': 'Place updated successfully'}, 200
+        except Exception as e:
+            return {'error': str(e)}, 400
+
+
+class PlaceAmenities(Resource):
+    async def post(self, request, place_id):
+        """Attach amenities to a place"""
+        try:
+            amenity_ids = amenity_ids_payload(await read_payload(request))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        place = await facade.get_place(place_id)
+        if not place:
+            return {'error': 'Place not found'}, 404
+        try:
+            await facade.attach_amenities(place_id, amenity_ids)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return {'message': 'Amenities added successfully'}, 200
+
+    @jwt_required
+    async def delete(self, request, place_id):
+        """Detach amenities from a place (owner or admin)"""
+        try:
+            amenity_ids = amenity_ids_payload(await read_payload(request))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        place = await facade.get_place(place_id)
+        if not place:
+            return {'error': 'Place not found'}, 404
+        if not get_jwt(request).get('is_admin', False) \
+                and place.owner_id != get_jwt_identity(request):
+            return {'error': 'Unauthorized action'}, 403
+        await facade.detach_amenities(place_id, amenity_ids)
+        return {'message': 'Amenities removed successfully'}, 200
+
+
+class PlaceReviewList(Resource):
+    async def get(self, request, place_id):
+        """Get the reviews of a place (public endpoint)"""
+        try:
+            projection = review_serializer.from_args(request.query_params)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        place = await facade.get_place(place_id)
+        if not place:
+            return {'error': 'Place not found'}, 404
+        reviews = await facade.get_reviews_by_place(
+            place_id, options=review_serializer.options(projection))
+        return review_serializer.dump_many(reviews, projection), 200
+
+
+routes = [
+    Route('/', PlaceList),
+    Route('/search', PlaceSearch),
+    Route('/nearby', PlaceNearby),
+    Route('/{place_id}', PlaceResource),
+    Route('/{place_id}/amenities', PlaceAmenities),
+    Route('/{place_id}/reviews', PlaceReviewList)
+]
@@ -0,0 +1,68 @@
+"""
+Flask-RESTX style resources on Starlette
+
+Handlers receive the request plus the path parameters as keyword
+arguments and return (body, status) or (body, status, headers) like
+Flask-RESTX resources do. Bodies are encoded with the same encoder as
+the v1 Api representation; a JSONArrayStream over an async iterable is
+sent as a streamed array.
+"""
+import re
+from starlette.endpoints import HTTPEndpoint
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from app.api.v1.representations import JSONArrayStream
+
+
+def make_response(request, result):
+    """Turn a handler's return value into a Response"""
+    if isinstance(result, Response):
+        return result
+    data, status, headers = result if len(result) == 3 else (*result, None)
+    dumps = request.app.state.dumps
+    if isinstance(data, JSONArrayStream):
+        return StreamingResponse(data.async_chunks(dumps), status_code=status,
+                                 headers=headers, media_type='application/json')
+    return Response(dumps(data) + b'\n', status_code=status, headers=headers,
+                    media_type='application/json')
+
+
+class InvalidPayload(Exception):
+    """The request body is not valid JSON"""
+
+
+async def read_payload(request):
+    """The request's JSON body"""
+    try:
+        return await request.json()
+    except ValueError as e:
+        raise InvalidPayload(f"Failed to decode JSON object: {e}")
+
+
+class Resource(HTTPEndpoint):
+    """An HTTPEndpoint whose handlers return Flask-RESTX style tuples"""
+
+    # Flask-RESTX namespace of the mirrored resource; defaults to the module name
+    namespace = None
+
+    @classmethod
+    def endpoint_name(cls):
+        """The Flask endpoint name of the mirrored resource, e.g. api_v1.places_place_list"""
+        namespace = cls.namespace or cls.__module__.rsplit('.', 1)[-1]
+        return f"api_v1.{namespace}_{re.sub(r'(?<!^)(?=[A-Z])', '_', cls.__name__).lower()}"
+
+    async def dispatch(self):
+        request = Request(self.scope, receive=self.receive)
+        method = 'GET' if request.method == 'HEAD' else request.method
+        if method not in self._allowed_methods:
+            raise HTTPException(status_code=405,
+                                headers={'Allow': ', '.join(self._allowed_methods)})
+        handler = getattr(self, method.lower())
+        try:
+            result = await handler(request, **request.path_params)
+        except InvalidPayload as e:
+            # Answered like Flask-RESTX answers an unparseable api.payload
+            result = {'message': str(e)}, 400
+        response = make_response(request, result)
+        await response(self.scope, self.receive, self.send)
@@ -0,0 +1,93 @@
+"""
+Review endpoints (ASGI)
+"""
+from starlette.routing import Route
+from app.api.v1.representations import JSONArrayStream
+from app.api.v1.serializers import review_serializer
+from app.asgi.resource import Resource, read_payload
+from app.asgi.tokens import get_jwt, get_jwt_identity, jwt_required
+from app.services.async_facade import async_facade as facade
+
+
+async def _dump_reviews(reviews, projection):
+    async for review in reviews:
+        yield review_serializer.dump(review, projection)
+
+
+class ReviewList(Resource):
+    @jwt_required
+    async def post(self, request):
+        """Create a new review"""
+        # Admins cannot review places
+        if get_jwt(request).get('is_admin', False):
+            return {'error': 'Admins cannot review places'}, 403
+
+        data = await read_payload(request)
+        data['user_id'] = get_jwt_identity(request)
+
+        place = await facade.get_place(data.get('place_id'))
+        if not place:
+            return {'error': 'Place not found'}, 404
+
+        try:
+            review = await facade.create_review(data)
+            return review.to_dict(), 201
+        except Exception as e:
+            return {'error': str(e)}, 400
+
+    async def get(self, request):
+        """Get all reviews (public endpoint)"""
+        try:
+            projection = review_serializer.from_args(request.query_params)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        reviews = await facade.iter_all_reviews(options=review_serializer.options(projection))
+        return JSONArrayStream(_dump_reviews(reviews, projection)), 200
+
+
+class ReviewResource(Resource):
+    async def get(self, request, review_id):
+        """Get review details (public endpoint)"""
+        review = await facade.get_review(review_id)
+        if not review:
+            return {'error': 'Review not found'}, 404
+        return review.to_dict(), 200
+
+    async def _owned_review(self, request, review_id):
+        """(review, error response) for a review the caller may change"""
+        review = await facade.get_review(review_id)
+        if not review:
+            return None, ({'error': 'Review not found'}, 404)
+        if not get_jwt(request).get('is_admin', False) \
+                and review.user_id != get_jwt_identity(request):
+            return None, ({'error': 'Unauthorized action'}, 403)
+        return review, None
+
+    @jwt_required
+    async def put(self, request, review_id):
+        """Update a review"""
+        review, error = await self._owned_review(request, review_id)
+        if error:
+            return error
+        data = await read_payload(request)
+        try:
+            await facade.update_review(review_id, data)
+            return {'message': 'Review updated successfully'}, 200
+        except Exception as e:
+            return {'error': str(e)}, 400
+
+    @jwt_required
+    async def delete(self, request, review_id):
+        """Delete a review"""
+        review, error = await self._owned_review(request, review_id)
+        if error:
+            return error
+        if not await facade.delete_review(review_id):
+            return {'error': 'Review not found'}, 404
+        return {'message': 'Review deleted successfully'}, 200
+
+
+routes = [
+    Route('/', ReviewList),
+    Route('/{review_id}', ReviewResource)
+]
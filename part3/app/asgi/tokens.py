@@ -0,0 +1,70 @@
+"""
+JWT handling for the ASGI endpoints
+
+Tokens are issued and decoded by flask_jwt_extended inside an app
+context of the Flask app the ASGI app was built from, so both serving
+modes accept each other's tokens and use the same JWT_* settings.
+Signing and verifying are CPU-only, so this never blocks on I/O.
+"""
+from functools import wraps
+from flask_jwt_extended import create_access_token, decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
+
+
+class _AuthError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def _bearer_token(request):
+    header = request.headers.get('Authorization')
+    if not header:
+        raise _AuthError("Missing Authorization Header", 401)
+    parts = header.split()
+    if len(parts) != 2 or parts[0] != 'Bearer':
+        raise _AuthError("Bad Authorization header. Expected 'Authorization: Bearer <JWT>'", 422)
+    return parts[1]
+
+
+def issue_access_token(request, user):
+    """Access token carrying the user's ID and is_admin claim"""
+    with request.app.state.flask_app.app_context():
+        return create_access_token(
+            identity=str(user.id),
+            additional_claims={'is_admin': user.is_admin}
+        )
+
+
+def jwt_required(handler):
+    """
+    Reject requests without a valid access token, like
+    flask_jwt_extended.jwt_required(); the claims go on request.state.jwt
+    """
+    @wraps(handler)
+    async def wrapper(self, request, **kwargs):
+        try:
+            token = _bearer_token(request)
+            with request.app.state.flask_app.app_context():
+                claims = decode_token(token)
+            if claims.get('type') != 'access':
+                raise _AuthError("Only non-refresh tokens are allowed", 422)
+        except _AuthError as e:
+            return {'msg': str(e)}, e.status
+        except ExpiredSignatureError:
+            return {'msg': 'Token has expired'}, 401
+        except (InvalidTokenError, JWTExtendedException) as e:
+            return {'msg': str(e)}, 422
+        request.state.jwt = claims
+        return await handler(self, request, **kwargs)
+    return wrapper
+
+
+def get_jwt(request):
+    """Claims of the request's access token"""
+    return request.state.jwt
+
+
+def get_jwt_identity(request):
+    return request.state.jwt['sub']
@@ -0,0 +1,80 @@
+"""
+User endpoints (ASGI)
+"""
+from starlette.routing import Route
+from app.api.v1.representations import JSONArrayStream
+from app.asgi.resource import Resource, read_payload
+from app.asgi.tokens import get_jwt, get_jwt_identity, jwt_required
+from app.services.async_facade import async_facade as facade
+
+
+async def _dump_users(users):
+    async for user in users:
+        yield user.to_dict()
+
+
+class UserList(Resource):
+    async def get(self, request):
+        """Get all users"""
+        users = await facade.iter_all_users()
+        return JSONArrayStream(_dump_users(users)), 200
+
+    @jwt_required
+    async def post(self, request):
+        """Register a new user (Admin only)"""
+        if not get_jwt(request).get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        user_data = await read_payload(request)
+        if await facade.get_user_by_email(user_data['email']):
+            return {'error': 'Email already registered'}, 400
+        try:
+            new_user = await facade.create_user(user_data)
+            return {
+                'id': new_user.id,
+                'message': 'User successfully created'
+            }, 201
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+
+class UserResource(Resource):
+    async def get(self, request, user_id):
+        """Get user details by ID"""
+        user = await facade.get_user_by_id(user_id)
+        if not user:
+            return {'error': 'User not found'}, 404
+        return user.to_dict(), 200
+
+    @jwt_required
+    async def put(self, request, user_id):
+        """Update user information"""
+        current_user_id = get_jwt_identity(request)
+        is_admin = get_jwt(request).get('is_admin', False)
+
+        user = await facade.get_user_by_id(user_id)
+        if not user:
+            return {'error': 'User not found'}, 404
+        if not is_admin and user_id != current_user_id:
+            return {'error': 'Unauthorized action'}, 403
+
+        user_data = await read_payload(request)
+        if not is_admin:
+            if 'email' in user_data or 'password' in user_data:
+                return {'error': 'You cannot modify email or password'}, 400
+        elif 'email' in user_data:
+            existing_user = await facade.get_user_by_email(user_data['email'])
+            if existing_user and existing_user.id != user_id:
+                return {'error': 'Email already in use'}, 400
+
+        try:
+            await facade.update_user(user_id, user_data)
+            return {'message': 'User updated successfully'}, 200
+        except Exception as e:
+            return {'error': str(e)}, 400
+
+
+routes = [
+    Route('/', UserList),
+    Route('/{user_id}', UserResource)
+]
@@ -0,0 +1,323 @@
+"""
+Caches for hot read paths
+
+ResponseCache caches public GET endpoints. Cached bodies live in a bounded LRU keyed on path and query string.
+Each endpoint declares the tables it reads; the ETag is derived from the
+route key plus a version counter per table, and facade writes bump the
+versions of the tables they touch. A write to amenities therefore only
+invalidates responses that read amenities.
+
+Version counters live in the cache_versions table and are bumped in the
+same transaction as the write (a before_commit hook on the app's
+sessions, sync and async, runs the bump for every commit made inside an
+invalidates() call), so every worker process, and the next boot, sees
+them. A table's counter starts at a random value, so a rebuilt database
+does not hand out ETags a client may still hold from the old one.
+
+Each process remembers the counters it read for version_ttl seconds,
+so hits and 304s within that window make no query. The process's own
+commits forget the counters of the tables they wrote, so it always sees
+its own writes; another worker's write is seen within version_ttl.
+Entries also expire after ttl seconds, which bounds how long a write
+made outside the facade goes unseen.
+
+With a read replica, a GET right after a write may still read the old
+rows. For replica_lag seconds after a table is written (by any process),
+responses that read it bypass the cache and carry no ETag, so a stale
+body is never stored or revalidated.
+
+EntityCache keeps column values of hot, rarely-changing rows (users,
+amenities) by primary key for a short TTL, in front of
+SQLAlchemyRepository.get.
+"""
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+import hashlib
+import inspect
+import random
+import threading
+import time
+from urllib.parse import urlencode
+import sqlalchemy as sa
+from flask import request
+
+# The ON CONFLICT upsert is understood by SQLite and PostgreSQL
+BUMP_VERSION = sa.text(
+    'INSERT INTO cache_versions (name, version, written_at) VALUES (:name, :start, :now) '
+    'ON CONFLICT (name) DO UPDATE SET version = cache_versions.version + 1, '
+    'written_at = excluded.written_at')
+
+
+class ResponseCache:
+    """Bounded LRU of GET response bodies with per-table versioning"""
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.max_entries = 512
+        self.ttl = 300
+        self.version_ttl = 1.0
+        self.replica_lag = 0
+        self._entries = OrderedDict()
+        # table -> (version, written_at, monotonic expiry) as last read
+        self._known = {}
+        # Bumped whenever _known is forgotten, so a read that raced a
+        # commit does not store what it read
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure from RESPONSE_CACHE_* settings and start empty"""
+        # Registers the table on db.metadata before the startup schema check
+        from app.models import cache_version  # noqa: F401
+
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.max_entries = app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 512)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 300)
+        self.version_ttl = app.config.get('RESPONSE_CACHE_VERSION_TTL', 1.0)
+        self.replica_lag = 0
+        if 'replica' in (app.config.get('SQLALCHEMY_BINDS') or {}):
+            self.replica_lag = app.config.get('REPLICA_MAX_LAG_SECONDS', 5)
+        from app import db
+        self.watch(db.session.session_factory)
+        self.clear()
+
+    def watch(self, target):
+        """Bump versions on commits of the sessions of target (a sessionmaker or Session class)"""
+        for name, listener in (('before_commit', self._before_commit),
+                               ('after_commit', self._after_commit),
+                               ('after_rollback', self._after_rollback)):
+            if not sa.event.contains(target, name, listener):
+                sa.event.listen(target, name, listener)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._known.clear()
+            self._generation += 1
+            self.hits = self.misses = self.not_modified = 0
+
+    def invalidate(self, session, *tables):
+        """Bump the version of each table within session's transaction"""
+        now = time.time()
+        session.execute(BUMP_VERSION, [
+            {'name': table, 'start': random.getrandbits(48), 'now': now}
+            for table in sorted(set(tables))
+        ])
+
+    def _before_commit(self, session):
+        pending = session.info.get('cache_writes')
+        if pending:
+            tables = [table for table, depth in pending.items() if depth > 0]
+            if tables:
+                self.invalidate(session, *tables)
+                session.info.setdefault('cache_bumped', set()).update(tables)
+
+    def _after_commit(self, session):
+        tables = session.info.pop('cache_bumped', None)
+        if tables:
+            with self._lock:
+                for table in tables:
+                    self._known.pop(table, None)
+                self._generation += 1
+
+    def _after_rollback(self, session):
+        session.info.pop('cache_bumped', None)
+
+    def _versions(self, tables):
+        """{table: (version, written_at)}, (0, 0) for a table never written"""
+        from app import db
+        from app.models.cache_version import cache_versions
+
+        now = time.monotonic()
+        with self._lock:
+            known = {t: self._known[t] for t in tables
+                     if t in self._known and self._known[t][2] > now}
+            generation = self._generation
+        if len(known) == len(tables):
+            return {t: entry[:2] for t, entry in known.items()}
+
+        rows = db.session.execute(sa.select(
+            cache_versions.c.name, cache_versions.c.version, cache_versions.c.written_at
+        ).where(cache_versions.c.name.in_(tables)))
+        versions = {name: (version, written_at) for name, version, written_at in rows}
+        versions.update((t, (0, 0.0)) for t in tables if t not in versions)
+        with self._lock:
+            if generation == self._generation:
+                expires = now + self.version_ttl
+                self._known.update((t, (*v, expires)) for t, v in versions.items())
+        return versions
+
+    def _lagging(self, versions):
+        """True while a replica may not have caught up with a write to these tables"""
+        if not self.replica_lag:
+            return False
+        horizon = time.time() - self.replica_lag
+        return any(written_at > horizon for _, written_at in versions.values())
+
+    def _etag(self, key, tables, versions):
+        stamp = ','.join(f'{t}={versions[t][0]}' for t in tables)
+        return hashlib.sha1(f'{key}|{stamp}'.encode('utf-8')).hexdigest()
+
+    def _get(self, key, etag):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag or entry[2] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _put(self, key, etag, body):
+        with self._lock:
+            self._entries[key] = (etag, body, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified
+            }
+
+    def cached(self, *tables):
+        """
+        Cache a Resource GET method that reads the given tables
+        The method must return (body, status); only 200 dict/list bodies
+        are cached
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                versions = self._versions(tables)
+                if self._lagging(versions):
+                    return fn(*args, **kwargs)
+
+                query = urlencode(sorted(request.args.items(multi=True)))
+                key = f'{request.path}?{query}'
+                etag = self._etag(key, tables, versions)
+                headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+
+                if etag in request.if_none_match:
+                    with self._lock:
+                        self.not_modified += 1
+                    return None, 304, headers
+
+                body = self._get(key, etag)
+                if body is None:
+                    body, status = fn(*args, **kwargs)
+                    if status != 200:
+                        return body, status
+                    # Streamed bodies can only be sent once; they still
+                    # get an ETag for revalidation
+                    if isinstance(body, (dict, list)):
+                        self._put(key, etag, body)
+                return body, 200, headers
+            return wrapper
+        return decorator
+
+    def invalidates(self, *tables):
+        """
+        Bump the given tables' versions in every commit the wrapped write
+        makes; works on facade methods and on async facade coroutines
+        """
+        def decorator(fn):
+            if inspect.iscoroutinefunction(fn):
+                @wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    from app.persistence.async_db import async_db
+
+                    with self._writing(async_db.session, tables):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                from app import db
+
+                with self._writing(db.session, tables):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    @contextmanager
+    def _writing(session, tables):
+        """Mark tables as written by session until the block exits"""
+        pending = session.info.setdefault('cache_writes', Counter())
+        pending.update(tables)
+        try:
+            yield
+        finally:
+            pending.subtract(tables)
+
+
+class EntityCache:
+    """
+    Cross-request TTL/LRU cache of entity column values by primary key
+    Values are plain dicts, so nothing here is bound to a session; the
+    repository turns them back into session-attached instances
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.ttl = 60
+        self.max_entries = 1024
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure from ENTITY_CACHE_* settings and start empty"""
+        self.enabled = app.config.get('ENTITY_CACHE_ENABLED', True)
+        self.ttl = app.config.get('ENTITY_CACHE_TTL', 60)
+        self.max_entries = app.config.get('ENTITY_CACHE_MAX_ENTRIES', 1024)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def get(self, key):
+        """Return cached values for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, values):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,149 @@
+"""
+Flask CLI commands
+"""
+import sys
+import time
+import click
+from app.synthetic import (DEFAULT_CHUNK_SIZE, DEFAULT_CLUSTERS, DEFAULT_SPREAD_KM,
+                           DEFAULT_ZIPF_EXPONENT, amenity_name, email_for, generate)
+
+
+def seed_admin(app):
+    """
+    Create the ADMIN_EMAIL/ADMIN_PASSWORD admin account if it is missing
+    Returns (email, created), or (None, False) when either is unset
+    """
+    email = app.config.get('ADMIN_EMAIL')
+    password = app.config.get('ADMIN_PASSWORD')
+    if not email or not password:
+        return None, False
+
+    from app.services.facade import facade
+
+    with app.app_context():
+        existing = facade.get_user_by_email(email)
+        if existing:
+            return existing.email, False
+        admin = facade.create_user({
+            'first_name': 'Admin',
+            'last_name': 'User',
+            'email': email,
+            'password': password,
+            'is_admin': True
+        })
+        return admin.email, True
+
+
+def register_commands(app):
+    """Attach the HBnB maintenance commands to the app CLI"""
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade():
+        """Apply pending schema migrations"""
+        from app import db
+        from app.persistence.migrations import upgrade
+
+        applied = upgrade(db.engine, echo=lambda m: click.echo(
+            f"Applying {m.version}: {m.description}"))
+        click.echo(f"Applied {len(applied)} migrations" if applied else "Schema is up to date")
+
+    @app.cli.command('db-version')
+    def db_version():
+        """Show the schema version of the database and of the code"""
+        from app import db
+        from app.persistence.migrations import LATEST_VERSION, current_version
+
+        with db.engine.connect() as conn:
+            version = current_version(conn)
+        click.echo(f"Database: {version}, code: {LATEST_VERSION}")
+
+    @app.cli.command('seed-admin')
+    def seed_admin_command():
+        """Create the ADMIN_EMAIL admin account if it is missing"""
+        email, created = seed_admin(app)
+        if email is None:
+            raise click.UsageError("ADMIN_EMAIL and ADMIN_PASSWORD must be set")
+        click.echo(f"Admin created: {email}" if created else f"Admin exists: {email}")
+
+    @app.cli.command('seed-data')
+    @click.option('--users', type=click.IntRange(min=0), default=1000, show_default=True)
+    @click.option('--places', type=click.IntRange(min=0), default=5000, show_default=True)
+    @click.option('--reviews', type=click.IntRange(min=0), default=20000, show_default=True)
+    @click.option('--amenities', type=click.IntRange(min=0), default=50, show_default=True)
+    @click.option('--seed', type=int, default=0, show_default=True,
+                  help='Same seed and counts, same rows')
+    @click.option('--password', default='password123', show_default=True,
+                  help='Password of every generated user (hashed once)')
+    @click.option('--clusters', type=click.IntRange(min=1), default=DEFAULT_CLUSTERS,
+                  show_default=True, help='City-like groups the places are spread around')
+    @click.option('--spread-km', type=click.FloatRange(min=0), default=DEFAULT_SPREAD_KM,
+                  show_default=True, help='Standard deviation of a place from its cluster centre')
+    @click.option('--zipf', 'zipf_exponent', type=click.FloatRange(min=0),
+                  default=DEFAULT_ZIPF_EXPONENT, show_default=True,
+                  help='Skew of reviews per place, cluster sizes and amenity popularity')
+    @click.option('--chunk-size', type=click.IntRange(min=1), default=DEFAULT_CHUNK_SIZE,
+                  show_default=True, help='Rows per insert and commit')
+    def seed_data(users, places, reviews, amenities, seed, password, clusters,
+                  spread_km, zipf_exponent, chunk_size):
+        """Bulk insert a deterministic synthetic dataset (see app/synthetic.py)"""
+        from app import password_hasher
+        from app.services.facade import facade
+
+        if users and facade.get_user_by_email(email_for(0, seed)):
+            raise click.UsageError(f"Seed {seed} is already loaded; pick another --seed")
+        taken = facade.amenity_repo.existing_names([amenity_name(i) for i in range(amenities)])
+        if taken:
+            raise click.UsageError(f"Amenities already exist ({', '.join(sorted(taken)[:3])}, ...); "
+                                   "use a database without them or --amenities 0")
+        started = time.perf_counter()
+        try:
+            batches = generate(seed, users, places, reviews, amenities,
+                               password_hasher.hash(password), clusters=clusters,
+                               spread_km=spread_km, zipf_exponent=zipf_exponent,
+                               chunk_size=chunk_size)
+            counts = facade.load_generated(batches, progress=lambda counts: click.echo(
+                f"\r{sum(counts.values()):,} rows", nl=False, err=True))
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+        click.echo('', err=True)
+        click.echo(f"Inserted {counts['users']} users, {counts['amenities']} amenities, "
+                   f"{counts['places']} places ({counts['place_amenity']} amenity links) and "
+                   f"{counts['reviews']} reviews in {time.perf_counter() - started:.1f}s")
+
+    @app.cli.command('rebuild-ratings')
+    def rebuild_ratings():
+        """Recompute place review_count/rating_sum from the reviews table"""
+        from app.services.facade import facade
+
+        updated = facade.rebuild_rating_aggregates()
+        click.echo(f"Rebuilt rating aggregates for {updated} places")
+
+    @app.cli.command('export-catalog')
+    @click.option('--types', default=None,
+                  help='Comma-separated subset of users,amenities,places,reviews')
+    @click.option('--cursor', default=None, help='Resume after the line carrying this cursor')
+    @click.option('--output', '-o', type=click.Path(dir_okay=False), default=None,
+                  help='Write to this file instead of stdout')
+    @click.option('--gzip', 'compress', is_flag=True, default=None,
+                  help='gzip the output (default when --output ends in .gz)')
+    def export_catalog(types, cursor, output, compress):
+        """Stream the catalog as NDJSON with constant memory"""
+        from app.export import export_chunks, parse_export_types
+        from app.services.facade import facade
+
+        if compress is None:
+            compress = bool(output and output.endswith('.gz'))
+        try:
+            records = facade.export_catalog(parse_export_types(types), cursor=cursor)
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+
+        stream = open(output, 'wb') if output else sys.stdout.buffer
+        try:
+            for chunk in export_chunks(records, compress=compress):
+                stream.write(chunk)
+        finally:
+            if output:
+                stream.close()
+            else:
+                stream.flush()
@@ -0,0 +1,88 @@
+"""
+Streaming NDJSON export of the catalog
+
+The facade yields (type, record) pairs straight from database cursors.
+This module turns them into NDJSON lines, optionally gzip-compressed,
+in chunks of bounded size. Each line carries a cursor, so an
+interrupted export can be resumed after the last line received.
+"""
+import base64
+from datetime import datetime
+import json
+import zlib
+
+# Export order; a cursor from one type resumes with the types after it
+EXPORT_TYPES = ('users', 'amenities', 'places', 'reviews')
+
+# Bytes buffered before a chunk is handed to the response or file
+CHUNK_BYTES = 64 * 1024
+
+
+def encode_export_cursor(kind, record):
+    """Build an opaque resume cursor from a record's type, created_at and id"""
+    raw = f"{kind}|{record['created_at'].isoformat()}|{record['id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_export_cursor(cursor):
+    """Decode a resume cursor into (type, (created_at, id))"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        kind, created_at, obj_id = raw.split('|', 2)
+        if kind not in EXPORT_TYPES:
+            raise ValueError
+        return kind, (datetime.fromisoformat(created_at), obj_id)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_export_types(value):
+    """Turn a comma-separated list of types into a tuple in export order"""
+    if not value:
+        return EXPORT_TYPES
+    requested = {kind.strip() for kind in value.split(',') if kind.strip()}
+    unknown = requested - set(EXPORT_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown export types: {', '.join(sorted(unknown))}")
+    return tuple(kind for kind in EXPORT_TYPES if kind in requested)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def ndjson_lines(records):
+    """Encode (type, record) pairs as NDJSON lines with a resume cursor each"""
+    for kind, record in records:
+        line = json.dumps({
+            'type': kind,
+            'cursor': encode_export_cursor(kind, record),
+            'data': record
+        }, default=_json_default, separators=(',', ':'))
+        yield line.encode('utf-8') + b'\n'
+
+
+def export_chunks(records, compress=False, chunk_bytes=CHUNK_BYTES):
+    """Yield the NDJSON export as byte chunks of roughly chunk_bytes"""
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = []
+    size = 0
+    for line in ndjson_lines(records):
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            data = b''.join(buffer)
+            buffer = []
+            size = 0
+            if compressor is not None:
+                data = compressor.compress(data)
+            if data:
+                yield data
+
+    data = b''.join(buffer)
+    if compressor is not None:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
@@ -0,0 +1,281 @@
+"""
+Per-request SQL metrics and N+1 detection
+
+QueryMetrics hooks the engines' cursor and commit events and adds up,
+for each request, the statements executed, the time spent in them, the
+ORM rows loaded and the commits. The totals go out as a Server-Timing
+header and as one logfmt line on the 'app.sql' logger:
+
+    sql method=GET path=/api/v1/places/ endpoint=api_v1.places_place_list
+        status=200 queries=3 db_ms=1.84 rows=20 commits=0 total_ms=6.10
+
+SQL_QUERY_BUDGETS caps the statements an endpoint may issue, per method
+('GET api_v1.places_place_list') or for all of them. A request
+over its budget is logged as a warning, or raises QueryBudgetExceeded
+when SQL_QUERY_BUDGET_ACTION is 'raise' (as in tests), so an N+1 such
+as a lazy load per listed row shows up on the first request that hits
+it.
+
+A streamed body runs its queries after the headers are sent: the
+header covers the work before the first byte, while the log line and
+the budget check cover the whole request. Rows are ORM instances
+loaded; Core selects of plain columns (ID checks, the catalog export)
+add to queries and db_ms only.
+
+The N+1 detector counts each statement's SQL text (its shape: bound
+parameters are not part of it) within one scope, a request or a call
+to a facade method decorated with QueryMetrics.scoped. A shape run more
+than N_PLUS_ONE_THRESHOLD times is reported once per scope, according
+to N_PLUS_ONE_ACTION: 'warn' (NPlusOneWarning), 'log' (the 'app.sql'
+logger), 'raise' (NPlusOneDetected, from the statement that crossed the
+threshold) or 'off'. Chunked batch jobs repeat their statements on
+purpose and run inside repeated_queries_expected().
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import inspect
+import logging
+import time
+import warnings
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper
+
+logger = logging.getLogger('app.sql')
+
+BUDGET_ACTIONS = ('log', 'raise')
+N_PLUS_ONE_ACTIONS = ('off', 'warn', 'log', 'raise')
+
+# Scopes opened by QueryMetrics.scope and ASGI requests; a Flask
+# request keeps its stats in the WSGI environ instead, which lives
+# exactly as long as the request context, streamed body included
+_current = ContextVar('query_stats', default=None)
+ENVIRON_KEY = 'app.query_stats'
+
+
+class QueryBudgetExceeded(Exception):
+    """A request issued more statements than its endpoint's budget"""
+
+
+class NPlusOneDetected(Exception):
+    """A query shape was repeated past the N+1 threshold in one scope"""
+
+
+class NPlusOneWarning(UserWarning):
+    """Warning category of the N+1 detector in 'warn' mode"""
+
+
+class QueryStats:
+    """SQL totals of one request or facade call"""
+
+    __slots__ = ('queries', 'db_time', 'rows', 'commits', 'started',
+                 'scope', 'detector', 'shapes', 'repeats_expected')
+
+    def __init__(self, scope=None, detector=None):
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.commits = 0
+        self.started = time.perf_counter()
+        self.scope = scope
+        # The QueryMetrics to report repeated shapes to, if detecting
+        self.detector = detector
+        self.shapes = {}
+        self.repeats_expected = 0
+
+    def server_timing(self):
+        """Server-Timing header value: database time and the request so far"""
+        total = time.perf_counter() - self.started
+        return (f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries, '
+                f'{self.rows} rows, {self.commits} commits", total;dur={total * 1000:.2f}')
+
+
+def current_stats():
+    """The QueryStats of the current scope, or None outside one"""
+    stats = _current.get()
+    if stats is None and has_request_context():
+        stats = request.environ.get(ENVIRON_KEY)
+    return stats
+
+
+@contextmanager
+def repeated_queries_expected():
+    """Exempt a block that repeats statements by design (chunked batches) from N+1 detection"""
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    stats.repeats_expected += 1
+    try:
+        yield
+    finally:
+        stats.repeats_expected -= 1
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_stats() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    started = conn.info.get('query_started')
+    if stats is not None and started:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started.pop()
+        if stats.detector is not None and not stats.repeats_expected:
+            count = stats.shapes[statement] = stats.shapes.get(statement, 0) + 1
+            if count == stats.detector.n_plus_one_threshold + 1:
+                stats.detector.repeated_shape(stats, statement, count)
+
+
+def _on_commit(conn):
+    stats = current_stats()
+    if stats is not None:
+        stats.commits += 1
+
+
+def _on_load(target, context):
+    stats = current_stats()
+    if stats is not None:
+        stats.rows += 1
+
+
+class QueryMetrics:
+    """Engine event hooks plus per-request reporting"""
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.budgets = {}
+        self.budget_action = 'log'
+        self.n_plus_one_action = 'log'
+        self.n_plus_one_threshold = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the SQL_METRICS_*, SQL_QUERY_BUDGET* and N_PLUS_ONE_* settings and hook the app's requests"""
+        self.enabled = app.config.get('SQL_METRICS_ENABLED', True)
+        self.budgets = dict(app.config.get('SQL_QUERY_BUDGETS') or {})
+        self.budget_action = app.config.get('SQL_QUERY_BUDGET_ACTION', 'log')
+        if self.budget_action not in BUDGET_ACTIONS:
+            raise ValueError(f"SQL_QUERY_BUDGET_ACTION must be one of: {', '.join(BUDGET_ACTIONS)}")
+        self.n_plus_one_action = app.config.get('N_PLUS_ONE_ACTION', 'log')
+        if self.n_plus_one_action not in N_PLUS_ONE_ACTIONS:
+            raise ValueError(f"N_PLUS_ONE_ACTION must be one of: {', '.join(N_PLUS_ONE_ACTIONS)}")
+        self.n_plus_one_threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 5)
+        if not event.contains(Mapper, 'load', _on_load):
+            event.listen(Mapper, 'load', _on_load)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def instrument(self, engine):
+        """Install the cursor and commit hooks on an engine (once)"""
+        if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+            return
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'commit', _on_commit)
+
+    @property
+    def detecting(self):
+        return self.n_plus_one_action != 'off'
+
+    def _new_stats(self, scope):
+        return QueryStats(scope, self if self.detecting else None)
+
+    def start(self, scope=None):
+        """Begin counting for the current ASGI request; returns its QueryStats"""
+        if not self.enabled and not self.detecting:
+            return None
+        stats = self._new_stats(scope)
+        _current.set(stats)
+        return stats
+
+    @contextmanager
+    def scope(self, name):
+        """
+        Count the block's statements as one N+1 detection scope
+        Inside a request (or another scope) the block joins that scope
+        """
+        if current_stats() is not None or not self.detecting:
+            yield current_stats()
+            return
+        stats = self._new_stats(name)
+        token = _current.set(stats)
+        try:
+            yield stats
+        finally:
+            _current.reset(token)
+
+    def scoped(self, cls):
+        """Class decorator: each public method call is a scope of its own"""
+        for name, attr in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.isfunction(attr):
+                continue
+            setattr(cls, name, self._scoped(attr, f'{cls.__name__}.{name}'))
+        return cls
+
+    def _scoped(self, fn, name):
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with self.scope(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.scope(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def repeated_shape(self, stats, statement, count):
+        """Report a statement run count times in one scope"""
+        message = (f"N+1 query: statement ran {count} times in {stats.scope}: "
+                   f"{' '.join(statement.split())}")
+        if self.n_plus_one_action == 'raise':
+            raise NPlusOneDetected(message)
+        if self.n_plus_one_action == 'warn':
+            warnings.warn(message, NPlusOneWarning)
+        else:
+            logger.warning(message)
+
+    def finish(self, stats, method, path, endpoint, status):
+        """Log a finished request and enforce its endpoint's budget"""
+        if _current.get() is stats:
+            _current.set(None)
+        if not self.enabled:
+            return
+        total = time.perf_counter() - stats.started
+        budget = self.budgets.get(f'{method} {endpoint}', self.budgets.get(endpoint))
+        over = budget is not None and stats.queries > budget
+        logger.log(
+            logging.WARNING if over else logging.INFO,
+            'sql method=%s path=%s endpoint=%s status=%s queries=%d db_ms=%.2f '
+            'rows=%d commits=%d total_ms=%.2f%s',
+            method, path, endpoint, status, stats.queries, stats.db_time * 1000,
+            stats.rows, stats.commits, total * 1000, f' budget={budget}' if over else '')
+        if over and self.budget_action == 'raise':
+            raise QueryBudgetExceeded(
+                f"{method} {path} ({endpoint}) issued {stats.queries} statements, "
+                f"budget is {budget}")
+
+    def _before_request(self):
+        if self.enabled or self.detecting:
+            request.environ[ENVIRON_KEY] = self._new_stats(f'{request.method} {request.path}')
+
+    def _after_request(self, response):
+        stats = request.environ.get(ENVIRON_KEY)
+        if stats is None:
+            return response
+        if self.enabled:
+            response.headers['Server-Timing'] = stats.server_timing()
+        report = (stats, request.method, request.path, request.endpoint, response.status_code)
+        if response.is_streamed:
+            # The body's queries have not run yet
+            response.call_on_close(lambda: self.finish(*report))
+        else:
+            self.finish(*report)
+        return response
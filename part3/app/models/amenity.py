@@ -35,12 +35,10 @@ class Amenity(BaseModel):
         
         return name
     
-    def update(self, data):
-        """Update amenity data"""
+    def apply_update(self, data):
+        """Validate and set amenity data"""
         if 'name' in data:
             self.name = self._validate_name(data['name'])
-        
-        self.save()
     
     def to_dict(self):
         """Convert to dictionary"""
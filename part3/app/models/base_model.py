@@ -16,20 +16,37 @@ class BaseModel(db.Model):
     
     # ✅ لا يوجد __init__ - SQLAlchemy يتولاها تلقائياً
     
-    def save(self):
+    def touch(self):
         """Update the updated_at timestamp whenever the object is modified"""
         self.updated_at = datetime.now()
-        db.session.commit()
     
-    def update(self, data):
+    def save(self):
         """
-        Update object attributes from a dictionary
+        Touch the object and flush
+        Only flushes; the surrounding unit of work commits
+        """
+        self.touch()
+        db.session.flush()
+    
+    def apply_update(self, data):
+        """
+        Set object attributes from a dictionary, without flushing
+        Subclasses validate their fields here, so the sync and async
+        facades share the same checks
         Args:
             data (dict): Dictionary containing updated values
         """
         for key, value in data.items():
             if hasattr(self, key):
                 setattr(self, key, value)
+    
+    def update(self, data):
+        """
+        Update object attributes from a dictionary
+        Args:
+            data (dict): Dictionary containing updated values
+        """
+        self.apply_update(data)
         self.save()
     
     def to_dict(self):
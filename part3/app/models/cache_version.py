@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Response cache versions
+"""
+from app import db
+
+"""Version counter per table read by cached responses; see app/cache.py"""
+cache_versions = db.Table(
+    'cache_versions',
+    db.Column('name', db.String(64), primary_key=True),
+    db.Column('version', db.BigInteger, nullable=False),
+    # Wall-clock seconds of the last write, for the replica lag window
+    db.Column('written_at', db.Float, nullable=False)
+)
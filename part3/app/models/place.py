@@ -2,8 +2,10 @@
 """
 Place Model
 """
+from sqlalchemy.ext.hybrid import hybrid_property
 from app.models.base_model import BaseModel
 from app import db
+from app.geo import cell_for
 """Create an association table to manage the many-to-many relationship between Place and Amenity."""
 place_amenity = db.Table(
     'place_amenity',
@@ -11,28 +13,40 @@ place_amenity = db.Table(
         'place_id',
         db.String(36),
         db.ForeignKey('places.id'),
-
+        primary_key=True
     ),
     db.Column(
         'amenity_id',
         db.String(36),
         db.ForeignKey('amenities.id'),
-
-    )
+        primary_key=True
+    ),
+    db.Index('ix_place_amenity_amenity_place', 'amenity_id', 'place_id')
 )
 class Place(BaseModel):
     """Place class"""
 
     __tablename__ = 'places'
+    __table_args__ = (
+        db.Index('ix_places_lat_lon', 'latitude', 'longitude'),
+        # Keyset pages, newest-first search and the export walk (created_at, id)
+        db.Index('ix_places_created_at_id', 'created_at', 'id'),
+    )
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.String(500))
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Float, nullable=False, index=True)
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
+    # Spatial grid cell kept in sync with latitude/longitude
+    geo_cell = db.Column(db.String(16), index=True)
+    # Rating aggregates maintained by the facade review methods
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     # ForeignKey
     owner_id = db.Column(db.String(36),
                           db.ForeignKey('users.id'),
-                          nullable=False)
+                          nullable=False,
+                          index=True)
     # relationship
     owner = db.relationship('User', back_populates='places')
     reviews = db.relationship('Review',
@@ -45,6 +59,20 @@ class Place(BaseModel):
         cascade='all, delete'
     )
 
+    @hybrid_property
+    def avg_rating(self):
+        """Average review rating, or None without reviews"""
+        if not self.review_count:
+            return None
+        return self.rating_sum / self.review_count
+
+    @avg_rating.expression
+    def avg_rating(cls):
+        return db.case(
+            (cls.review_count > 0, cls.rating_sum * 1.0 / cls.review_count),
+            else_=None
+        )
+
     def _validate_title(self, title):
         """Validate title"""
         if not title or not isinstance(title, str):
@@ -110,8 +138,8 @@ class Place(BaseModel):
         if amenity in self.amenities:
             self.amenities.remove(amenity)
 
-    def update(self, data):
-        """Update place data"""
+    def apply_update(self, data):
+        """Validate and set place data"""
         if 'title' in data:
             self.title = self._validate_title(data['title'])
 
@@ -127,8 +155,6 @@ class Place(BaseModel):
         if 'longitude' in data:
             self.longitude = self._validate_longitude(data['longitude'])
 
-        self.save()
-
     def to_dict(self):
         """Convert to dictionary"""
         data = super().to_dict()
@@ -138,7 +164,9 @@ class Place(BaseModel):
             'price': self.price,
             'latitude': self.latitude,
             'longitude': self.longitude,
-            'owner_id': self.owner.id,
+            'owner_id': self.owner_id,
+            'review_count': self.review_count or 0,
+            'avg_rating': self.avg_rating,
             'amenities': [{'id': amenity.id, 'name': amenity.name} for amenity in self.amenities],
             'reviews': [{'id': r.id, 'text': r.text, 'rating': r.rating, 'user_id': r.user_id} for r in self.reviews]
         })
@@ -146,4 +174,11 @@ class Place(BaseModel):
 
     def __repr__(self):
         """String representation"""
-        return f"<Place {self.id}: {self.title}>"
\ No newline at end of file
+        return f"<Place {self.id}: {self.title}>"
+
+
+@db.event.listens_for(Place, 'before_insert')
+@db.event.listens_for(Place, 'before_update')
+def _update_geo_cell(mapper, connection, target):
+    """Keep geo_cell in sync with the coordinates on every flush"""
+    target.geo_cell = cell_for(target.latitude, target.longitude)
@@ -20,12 +20,16 @@ class Review(BaseModel):
          
     # Task 7
     __tablename__ = 'reviews'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'place_id', name='unique_user_place_review'),
+    )
     
     text = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer, nullable=False)
     # ✅ Foreign Keys
+    # user_id lookups use the leading column of unique_user_place_review
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
-    place_id = db.Column(db.String(36), db.ForeignKey('places.id'), nullable=False)
+    place_id = db.Column(db.String(36), db.ForeignKey('places.id'), nullable=False, index=True)
 
     # ✅ Relationships
     user = db.relationship('User', back_populates='reviews')
@@ -53,15 +57,13 @@ class Review(BaseModel):
         
         return rating
     
-    def update(self, data):
-        """Update review data"""
+    def apply_update(self, data):
+        """Validate and set review data"""
         if 'text' in data:
             self.text = self._validate_text(data['text'])
         
         if 'rating' in data:
             self.rating = self._validate_rating(data['rating'])
-        
-        self.save()
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -69,8 +71,8 @@ class Review(BaseModel):
         data.update({
             'text': self.text,
             'rating': self.rating,
-            'place_id': self.place.id,
-            'user_id': self.user.id
+            'place_id': self.place_id,
+            'user_id': self.user_id
         })
         return data
     
@@ -1,4 +1,4 @@
-from app import db, bcrypt
+from app import db, password_hasher
 import uuid
 from .base_model import BaseModel  # Import BaseModel from its module
 
@@ -29,11 +29,15 @@ class User(BaseModel):
     
     def hash_password(self, password):
         """Hashes the password before storing it."""
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = password_hasher.hash(password)
     
     def verify_password(self, password):
         """Verifies if the provided password matches the hashed password."""
-        return bcrypt.check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
+    
+    def password_needs_rehash(self):
+        """True when the stored hash uses a different bcrypt cost than configured."""
+        return password_hasher.needs_rehash(self.password)
     
     def to_dict(self):
         """Convert user object to dictionary, excluding password."""
@@ -0,0 +1,88 @@
+"""
+Password hashing off the request thread
+
+bcrypt is deliberately slow, so hashes are computed on a small bounded
+thread pool (bcrypt releases the GIL). A login burst can then only keep
+PASSWORD_HASH_WORKERS cores busy while other requests keep being served.
+The *_async methods await the same pool, so under ASGI the event loop
+keeps serving other requests while a hash is computed.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+import bcrypt
+
+DEFAULT_LOG_ROUNDS = 12
+
+
+class PasswordHasher:
+    """bcrypt hashing with a configurable cost and a bounded worker pool"""
+
+    def __init__(self, app=None):
+        self.log_rounds = DEFAULT_LOG_ROUNDS
+        self.max_workers = os.cpu_count() or 2
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read BCRYPT_LOG_ROUNDS and PASSWORD_HASH_WORKERS from the config"""
+        self.log_rounds = app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
+        self.max_workers = app.config.get('PASSWORD_HASH_WORKERS') or self.max_workers
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def after_fork(self):
+        """Drop a pool inherited from the parent process; its threads do not survive a fork"""
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='password-hash'
+            )
+        return self._executor
+
+    def _hash(self, password, rounds):
+        salt = bcrypt.gensalt(rounds)
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    def _verify(self, hashed, password):
+        try:
+            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            # Not a bcrypt hash
+            return False
+
+    def hash(self, password):
+        """Hash a password with the configured cost"""
+        return self.executor.submit(self._hash, password, self.log_rounds).result()
+
+    def verify(self, hashed, password):
+        """Check a password against a stored hash"""
+        if not hashed or password is None:
+            return False
+        return self.executor.submit(self._verify, hashed, password).result()
+
+    async def hash_async(self, password):
+        """hash() for coroutines: awaits the worker pool"""
+        return await asyncio.wrap_future(
+            self.executor.submit(self._hash, password, self.log_rounds))
+
+    async def verify_async(self, hashed, password):
+        """verify() for coroutines: awaits the worker pool"""
+        if not hashed or password is None:
+            return False
+        return await asyncio.wrap_future(
+            self.executor.submit(self._verify, hashed, password))
+
+    def needs_rehash(self, hashed):
+        """True when a stored hash was made with a different cost"""
+        try:
+            # Format: $2b$<cost>$<salt+hash>
+            return int(hashed.split('$')[2]) != self.log_rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
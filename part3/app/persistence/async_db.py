@@ -0,0 +1,127 @@
+"""
+Async engine and per-request AsyncSession for the ASGI app
+
+The async engine points at the same database as the Flask app, through
+the asyncio driver of its backend (aiosqlite for SQLite). Each ASGI
+request runs inside session_scope(); async_db.session then returns that
+request's AsyncSession, created on first use and closed when the
+request (including a streamed body) is finished.
+
+async_unit_of_work/async_transactional mirror unit_of_work/transactional:
+repositories only flush and the outermost unit commits once.
+"""
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from config import engine_options
+
+# Sync backend -> asyncio driver
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'asyncpg',
+    'mysql': 'aiomysql'
+}
+
+_scope = ContextVar('async_session_scope', default=None)
+
+
+def async_url(uri):
+    """The asyncio-driver form of a database URI"""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver known for '{backend}' databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+class SyncSession(Session):
+    """The sync session behind each AsyncSession, as a target for session events"""
+
+
+class AsyncDatabase:
+    """Async engine plus a session per request scope"""
+
+    def __init__(self):
+        self.engine = None
+        self._sessionmaker = None
+
+    def init_app(self, app):
+        """Create the engine from the Flask app's database settings"""
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from app import query_metrics, response_cache
+        from app.persistence.engine import tune_engine
+
+        uri = app.config.get('ASYNC_SQLALCHEMY_DATABASE_URI') \
+            or app.config['SQLALCHEMY_DATABASE_URI']
+        url = async_url(uri)
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            # One shared connection, or every checkout gets an empty database
+            options = {'poolclass': StaticPool}
+        else:
+            options = engine_options(uri)
+        self.engine = create_async_engine(url, **options)
+        tune_engine(self.engine.sync_engine, app.config)
+        query_metrics.instrument(self.engine.sync_engine)
+        self._sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False,
+                                                sync_session_class=SyncSession)
+        response_cache.watch(SyncSession)
+
+    async def dispose(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    @asynccontextmanager
+    async def session_scope(self):
+        """Scope one request: its session is closed on exit"""
+        holder = {}
+        token = _scope.set(holder)
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+            session = holder.get('session')
+            if session is not None:
+                await session.close()
+
+    @property
+    def session(self):
+        """The current request's AsyncSession"""
+        holder = _scope.get()
+        if holder is None:
+            raise RuntimeError("async_db.session used outside session_scope()")
+        if 'session' not in holder:
+            holder['session'] = self._sessionmaker()
+        return holder['session']
+
+
+async_db = AsyncDatabase()
+
+
+@asynccontextmanager
+async def async_unit_of_work():
+    """Commit once when the outermost scope exits, roll back on error"""
+    session = async_db.session
+    depth = session.info.get('uow_depth', 0)
+    session.info['uow_depth'] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            await session.commit()
+    except Exception:
+        if depth == 0:
+            await session.rollback()
+        raise
+    finally:
+        session.info['uow_depth'] = depth
+
+
+def async_transactional(fn):
+    """Run an async facade method inside a unit of work"""
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        async with async_unit_of_work():
+            return await fn(*args, **kwargs)
+    return wrapper
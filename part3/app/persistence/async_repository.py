@@ -0,0 +1,190 @@
+"""
+Async SQLAlchemy repositories for the ASGI app
+
+Each repository builds its statements with the same *Statements classes
+as the sync repositories in repository.py and awaits them on the
+request's AsyncSession. Like the sync ones they only flush; the async
+unit of work commits. Relationships are never lazy-loaded here: list
+queries carry their loader options, and writes touch foreign key
+columns instead of relationships.
+"""
+from sqlalchemy import inspect, select, update
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from app import entity_cache
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.persistence.async_db import async_db
+from app.persistence.repository import _CACHED_MODELS
+from app.persistence.statements import ModelStatements, PlaceStatements, ReviewStatements
+
+
+class AsyncSQLAlchemyRepository(ModelStatements):
+    def __init__(self, model, cached=False):
+        self.model = model
+        self.cached = cached
+        if cached:
+            _CACHED_MODELS.add(model)
+        self.stats = {'identity_map_hits': 0, 'cache_hits': 0, 'queries': 0}
+
+    @property
+    def session(self):
+        return async_db.session
+
+    def _cache_key(self, obj_id):
+        return (self.model.__name__, obj_id)
+
+    async def _from_cache(self, obj_id):
+        """Rebuild a session-attached instance from cached values, no SQL"""
+        values = entity_cache.get(self._cache_key(obj_id))
+        if values is None:
+            return None
+        obj = self.model(**values)
+        make_transient_to_detached(obj)
+        return await self.session.merge(obj, load=False)
+
+    def _to_cache(self, obj):
+        columns = self.model.__mapper__.column_attrs
+        entity_cache.put(self._cache_key(obj.id),
+                         {attr.key: getattr(obj, attr.key) for attr in columns})
+
+    async def add(self, obj):
+        self.session.add(obj)
+        await self.session.flush()
+
+    async def get(self, obj_id):
+        """
+        Get an object by primary key
+        Checks the session identity map, then the entity cache for
+        cached models, and only then queries the database
+        """
+        if obj_id is None:
+            return None
+        session = self.session
+        obj = session.identity_map.get(identity_key(self.model, obj_id))
+        if obj is not None and not inspect(obj).expired_attributes:
+            self.stats['identity_map_hits'] += 1
+            return obj
+        if self.cached and entity_cache.enabled:
+            obj = await self._from_cache(obj_id)
+            if obj is not None:
+                self.stats['cache_hits'] += 1
+                return obj
+        self.stats['queries'] += 1
+        obj = await session.get(self.model, obj_id)
+        if obj is not None and self.cached and entity_cache.enabled:
+            self._to_cache(obj)
+        return obj
+
+    async def get_with(self, obj_id, options):
+        """Get an object by primary key, loaded with the given loader options"""
+        statement = self.all_statement(options).where(self.model.id == obj_id)
+        return (await self.session.scalars(statement)).first()
+
+    async def get_all(self, options=None):
+        return (await self.session.scalars(self.all_statement(options))).all()
+
+    async def iter_all(self, options=None, batch_size=1000):
+        """Async iterator over every object, fetching batch_size rows at a time"""
+        statement = self.all_statement(options).execution_options(yield_per=batch_size)
+        return await self.session.stream_scalars(statement)
+
+    async def get_page(self, limit, cursor=None, options=None):
+        """
+        Get one page of objects ordered by (created_at, id)
+        Returns (items, next_cursor); next_cursor is None on the last page
+        """
+        statement = self.page_statement(limit, cursor, options)
+        return self.split_page((await self.session.scalars(statement)).all(), limit)
+
+    async def get_by_attribute(self, attr_name, attr_value):
+        statement = self.attribute_statement(attr_name, attr_value)
+        return (await self.session.scalars(statement)).first()
+
+    async def save(self, obj):
+        """Touch an object changed in place (see BaseModel.apply_update) and flush"""
+        obj.touch()
+        await self.session.flush()
+        entity_cache.invalidate(self._cache_key(obj.id))
+
+    async def delete(self, obj_id):
+        obj = await self.get(obj_id)
+        if obj:
+            await self.session.delete(obj)
+            await self.session.flush()
+            entity_cache.invalidate(self._cache_key(obj_id))
+
+    async def existing_ids(self, ids):
+        """Return the subset of ids present in the table, in one IN query"""
+        ids = {obj_id for obj_id in ids if isinstance(obj_id, str)}
+        if not ids:
+            return set()
+        rows = await self.session.execute(
+            select(self.model.id).where(self.model.id.in_(ids)))
+        return {row[0] for row in rows}
+
+
+class AsyncUserRepository(AsyncSQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(User, cached=True)
+
+
+class AsyncPlaceRepository(AsyncSQLAlchemyRepository, PlaceStatements):
+    def __init__(self):
+        super().__init__(Place)
+
+    async def search(self, min_price=None, max_price=None, bbox=None,
+                     amenity_ids=None, min_rating=None, sort='newest',
+                     limit=20, offset=0, options=None):
+        """Filter places in SQL; see PlaceStatements.search_statement"""
+        statement = self.search_statement(
+            min_price=min_price, max_price=max_price, bbox=bbox,
+            amenity_ids=amenity_ids, min_rating=min_rating, sort=sort,
+            limit=limit, offset=offset, options=options)
+        return (await self.session.scalars(statement)).all()
+
+    async def get_nearby(self, latitude, longitude, radius_km, options=None):
+        """Get (place, distance_km) pairs within radius_km, nearest first"""
+        statement = self.nearby_statement(latitude, longitude, radius_km, options)
+        places = await self.session.scalars(statement)
+        return self.nearest(places, latitude, longitude, radius_km)
+
+    async def apply_review_delta(self, place_id, count_delta, rating_delta):
+        """Adjust a place's review_count/rating_sum in SQL, in the current transaction"""
+        await self.session.execute(
+            update(Place).where(Place.id == place_id).values(
+                review_count=Place.review_count + count_delta,
+                rating_sum=Place.rating_sum + rating_delta))
+
+    async def link_amenities(self, place_id, amenity_ids):
+        """Link amenities to a place in one statement; returns the number of new links"""
+        result = await self.session.execute(
+            self.link_amenities_statement(place_id, amenity_ids))
+        return result.rowcount
+
+    async def unlink_amenities(self, place_id, amenity_ids):
+        """Unlink amenities from a place in one statement; returns the number removed"""
+        result = await self.session.execute(
+            self.unlink_amenities_statement(place_id, amenity_ids))
+        return result.rowcount
+
+
+class AsyncReviewRepository(AsyncSQLAlchemyRepository, ReviewStatements):
+    def __init__(self):
+        super().__init__(Review)
+
+    async def exists_for(self, user_id, place_id):
+        """Check whether a user already reviewed a place (index lookup)"""
+        return (await self.session.execute(self.exists_statement(user_id, place_id))).scalar()
+
+    async def get_by_place(self, place_id, options=None):
+        """Get the reviews of one place (uses the place_id index)"""
+        statement = self.by_place_statement(place_id, options)
+        return (await self.session.scalars(statement)).all()
+
+
+class AsyncAmenityRepository(AsyncSQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(Amenity, cached=True)
@@ -0,0 +1,40 @@
+"""
+Per-connection engine tuning
+
+SQLite connections get their PRAGMAs from the SQLITE_* settings as soon
+as they are opened: WAL journaling so readers never block the writer,
+synchronous=NORMAL (safe with WAL, one fsync per checkpoint instead of
+per commit), a busy timeout so concurrent writers queue for the lock
+instead of failing with "database is locked", and memory-mapped reads.
+"""
+from sqlalchemy import event
+
+
+def sqlite_pragmas(config, in_memory=False):
+    """(name, value) PRAGMAs to run on each new SQLite connection"""
+    pragmas = [
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))),
+    ]
+    if not in_memory:
+        # Neither applies to a database that lives in memory
+        pragmas.insert(0, ('journal_mode', config.get('SQLITE_JOURNAL_MODE', 'WAL')))
+        pragmas.append(('mmap_size', int(config.get('SQLITE_MMAP_SIZE', 0))))
+    return pragmas
+
+
+def tune_engine(engine, config):
+    """Install the connect hooks an engine's backend needs"""
+    if engine.dialect.name != 'sqlite':
+        return
+    in_memory = engine.url.database in (None, '', ':memory:')
+    pragmas = sqlite_pragmas(config, in_memory)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,258 @@
+"""
+Versioned schema migrations
+
+Each migration brings the schema from the previous version to its own
+and records that version in the schema_version table. Migrations
+inspect the live schema before changing it, so a database created by
+the old db.create_all() call (which has no schema_version table)
+upgrades in place from version 0.
+
+create_app either runs upgrade() (DATABASE_AUTO_MIGRATE) or calls
+check_schema(), which refuses to start on a schema that is behind.
+"""
+from collections import namedtuple
+import logging
+import sqlalchemy as sa
+
+Migration = namedtuple('Migration', ['version', 'description', 'upgrade'])
+
+VERSION_TABLE = 'schema_version'
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """The live schema is behind the models"""
+
+
+def _index_names(conn, table):
+    return {index['name'] for index in sa.inspect(conn).get_indexes(table)}
+
+
+def _create_index(conn, table, name, *columns, unique=False):
+    """Create an index unless one with that name already exists"""
+    if name not in _index_names(conn, table):
+        cols = ', '.join(columns)
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        conn.execute(sa.text(f'CREATE {kind} {name} ON {table} ({cols})'))
+
+
+def _base_columns():
+    """BaseModel columns as of the baseline"""
+    return [
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime)
+    ]
+
+
+def _v1_baseline(conn):
+    """Tables as the first db.create_all() made them"""
+    metadata = sa.MetaData()
+    sa.Table('users', metadata,
+             sa.Column('first_name', sa.String(255), nullable=False),
+             sa.Column('last_name', sa.String(255), nullable=False),
+             sa.Column('email', sa.String(255), nullable=False, unique=True),
+             sa.Column('password', sa.String(255), nullable=False),
+             sa.Column('is_admin', sa.Boolean),
+             *_base_columns())
+    sa.Table('amenities', metadata,
+             sa.Column('name', sa.String(255), nullable=False, unique=True),
+             *_base_columns())
+    sa.Table('places', metadata,
+             sa.Column('title', sa.String(255), nullable=False),
+             sa.Column('description', sa.String(500)),
+             sa.Column('price', sa.Float, nullable=False),
+             sa.Column('latitude', sa.Float),
+             sa.Column('longitude', sa.Float),
+             sa.Column('owner_id', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+             *_base_columns())
+    sa.Table('place_amenity', metadata,
+             sa.Column('place_id', sa.String(36), sa.ForeignKey('places.id')),
+             sa.Column('amenity_id', sa.String(36), sa.ForeignKey('amenities.id')))
+    sa.Table('reviews', metadata,
+             sa.Column('text', sa.Text, nullable=False),
+             sa.Column('rating', sa.Integer, nullable=False),
+             sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+             sa.Column('place_id', sa.String(36), sa.ForeignKey('places.id'), nullable=False),
+             *_base_columns())
+    metadata.create_all(conn, checkfirst=True)
+
+
+def _v2_search_and_ratings(conn):
+    """Search indexes, geo grid cell, rating aggregates, one review per user and place"""
+    from app.geo import cell_for
+
+    columns = {column['name'] for column in sa.inspect(conn).get_columns('places')}
+    if 'geo_cell' not in columns:
+        conn.execute(sa.text('ALTER TABLE places ADD COLUMN geo_cell VARCHAR(16)'))
+    for name in ('review_count', 'rating_sum'):
+        if name not in columns:
+            conn.execute(sa.text(
+                f"ALTER TABLE places ADD COLUMN {name} INTEGER NOT NULL DEFAULT '0'"))
+
+    unique = {c['name'] for c in sa.inspect(conn).get_unique_constraints('reviews')}
+    has_unique_review = ('unique_user_place_review' in unique
+                         or 'unique_user_place_review' in _index_names(conn, 'reviews'))
+    if not has_unique_review:
+        # Keep each user's newest review of a place (ties go to the higher
+        # id) so the unique index below can be built; the rating
+        # aggregates are computed after this
+        removed = conn.execute(sa.text(
+            'DELETE FROM reviews WHERE EXISTS ('
+            'SELECT 1 FROM reviews AS newer '
+            'WHERE newer.user_id = reviews.user_id AND newer.place_id = reviews.place_id '
+            "AND (COALESCE(newer.created_at, '') > COALESCE(reviews.created_at, '') "
+            "OR (COALESCE(newer.created_at, '') = COALESCE(reviews.created_at, '') "
+            'AND newer.id > reviews.id)))')).rowcount
+        if removed:
+            logger.warning("Removed %d duplicate reviews (same user and place) "
+                           "before adding unique_user_place_review", removed)
+
+    rows = conn.execute(sa.text(
+        'SELECT id, latitude, longitude FROM places WHERE geo_cell IS NULL')).all()
+    if rows:
+        conn.execute(sa.text('UPDATE places SET geo_cell = :cell WHERE id = :id'), [
+            {'id': row.id, 'cell': cell_for(row.latitude, row.longitude)} for row in rows
+        ])
+    conn.execute(sa.text(
+        'UPDATE places SET '
+        'review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id), '
+        'rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews '
+        'WHERE reviews.place_id = places.id)'))
+
+    _create_index(conn, 'places', 'ix_places_price', 'price')
+    _create_index(conn, 'places', 'ix_places_lat_lon', 'latitude', 'longitude')
+    _create_index(conn, 'places', 'ix_places_geo_cell', 'geo_cell')
+    _create_index(conn, 'place_amenity', 'ix_place_amenity_amenity_place',
+                  'amenity_id', 'place_id')
+    if not has_unique_review:
+        _create_index(conn, 'reviews', 'unique_user_place_review',
+                      'user_id', 'place_id', unique=True)
+
+
+def _v3_foreign_key_indexes(conn):
+    """Index every foreign key; give place_amenity a (place_id, amenity_id) primary key"""
+    _create_index(conn, 'places', 'ix_places_owner_id', 'owner_id')
+    _create_index(conn, 'reviews', 'ix_reviews_place_id', 'place_id')
+
+    primary_key = sa.inspect(conn).get_pk_constraint('place_amenity')
+    if not primary_key['constrained_columns']:
+        # Adding a primary key needs a table rebuild; duplicate links are dropped
+        conn.execute(sa.text('ALTER TABLE place_amenity RENAME TO place_amenity_old'))
+        conn.execute(sa.text('DROP INDEX IF EXISTS ix_place_amenity_amenity_place'))
+        conn.execute(sa.text(
+            'CREATE TABLE place_amenity ('
+            'place_id VARCHAR(36) NOT NULL REFERENCES places (id), '
+            'amenity_id VARCHAR(36) NOT NULL REFERENCES amenities (id), '
+            'PRIMARY KEY (place_id, amenity_id))'))
+        conn.execute(sa.text(
+            'INSERT INTO place_amenity (place_id, amenity_id) '
+            'SELECT DISTINCT place_id, amenity_id FROM place_amenity_old '
+            'WHERE place_id IS NOT NULL AND amenity_id IS NOT NULL'))
+        conn.execute(sa.text('DROP TABLE place_amenity_old'))
+        _create_index(conn, 'place_amenity', 'ix_place_amenity_amenity_place',
+                      'amenity_id', 'place_id')
+
+
+def _v4_place_order_index(conn):
+    """Index places in (created_at, id) order for keyset pages and newest-first search"""
+    _create_index(conn, 'places', 'ix_places_created_at_id', 'created_at', 'id')
+
+
+def _v5_cache_versions(conn):
+    """Shared response cache version counters"""
+    if not sa.inspect(conn).has_table('cache_versions'):
+        conn.execute(sa.text(
+            'CREATE TABLE cache_versions ('
+            'name VARCHAR(64) NOT NULL PRIMARY KEY, version BIGINT NOT NULL, '
+            'written_at FLOAT NOT NULL)'))
+
+
+MIGRATIONS = [
+    Migration(1, 'baseline tables', _v1_baseline),
+    Migration(2, 'search indexes, geo cells and rating aggregates', _v2_search_and_ratings),
+    Migration(3, 'foreign key indexes and place_amenity primary key', _v3_foreign_key_indexes),
+    Migration(4, 'places (created_at, id) index', _v4_place_order_index),
+    Migration(5, 'response cache versions', _v5_cache_versions),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn):
+    """Schema version recorded in the database, 0 if none"""
+    if not sa.inspect(conn).has_table(VERSION_TABLE):
+        return 0
+    return conn.execute(sa.text(f'SELECT MAX(version) FROM {VERSION_TABLE}')).scalar() or 0
+
+
+def upgrade(engine, echo=None):
+    """
+    Apply pending migrations, each in its own transaction
+    Returns the list of versions applied; echo(migration) is called
+    before each one
+    """
+    applied = []
+    with engine.begin() as conn:
+        conn.execute(sa.text(
+            f'CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ('
+            'version INTEGER PRIMARY KEY, description VARCHAR(255) NOT NULL, '
+            'applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)'))
+        version = current_version(conn)
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        if echo is not None:
+            echo(migration)
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(sa.text(
+                f'INSERT INTO {VERSION_TABLE} (version, description) VALUES (:v, :d)'),
+                {'v': migration.version, 'd': migration.description})
+        applied.append(migration.version)
+    return applied
+
+
+def schema_problems(conn, metadata):
+    """List the tables, columns, indexes and keys of metadata missing from the database"""
+    inspector = sa.inspect(conn)
+    problems = []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            problems.append(f"missing table {table.name}")
+            continue
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        problems.extend(f"missing column {table.name}.{column.name}"
+                        for column in table.columns if column.name not in columns)
+
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        uniques = {c['name'] for c in inspector.get_unique_constraints(table.name)}
+        problems.extend(f"missing index {index.name}"
+                        for index in table.indexes if index.name not in indexes)
+        problems.extend(
+            f"missing unique constraint {constraint.name}"
+            for constraint in table.constraints
+            if isinstance(constraint, sa.UniqueConstraint) and constraint.name
+            and constraint.name not in uniques | indexes)
+
+        expected = {column.name for column in table.primary_key.columns}
+        actual = set(inspector.get_pk_constraint(table.name)['constrained_columns'])
+        if expected != actual:
+            problems.append(f"primary key of {table.name} is {sorted(actual)}, "
+                            f"expected {sorted(expected)}")
+    return problems
+
+
+def check_schema(engine, metadata):
+    """Raise SchemaOutOfDateError if the database is behind the migrations or models"""
+    with engine.connect() as conn:
+        version = current_version(conn)
+        if version < LATEST_VERSION:
+            raise SchemaOutOfDateError(
+                f"Database schema is at version {version}, the code needs "
+                f"{LATEST_VERSION}; run 'DATABASE_SCHEMA_CHECK=0 flask db-upgrade'")
+        problems = schema_problems(conn, metadata)
+    if problems:
+        raise SchemaOutOfDateError("Database schema does not match the models: "
+                                   + '; '.join(problems))
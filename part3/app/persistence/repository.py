@@ -3,13 +3,19 @@ In-memory repository for storing objects temporarily
 This will be replaced with a database in Part 3
 """
 from abc import ABC, abstractmethod
-from app import db
+from sqlalchemy import and_, bindparam, func, insert, or_, select, tuple_, update
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from app import db, entity_cache
 from app.models.user import User # Task 6 to handle the error from call SQLAlchemyRepository
 #from app.persistence.repository import SQLAlchemyRepository # task 6 اذا كان بملف ثاني
 # Task 7
 from app.models.amenity import Amenity
-from app.models.place import Place
+from app.models.place import Place, place_amenity
 from app.models.review import Review
+from app.persistence.routing import replica_read
+from app.persistence.statements import ModelStatements, PlaceStatements, ReviewStatements
 
 class Repository(ABC):
     @abstractmethod
@@ -38,13 +44,59 @@ class Repository(ABC):
 
 
 class InMemoryRepository:
-    """Repository for storing objects in memory"""
+    """
+    Repository for storing objects in memory
+    unique_indexes/indexes name attributes to keep secondary indexes on,
+    so get_by_attribute on them is a dict lookup instead of a scan
+    """
     
-    def __init__(self):
+    def __init__(self, unique_indexes=(), indexes=()):
         self._storage = {}
+        self._unique = {attr: {} for attr in unique_indexes}
+        self._indexes = {attr: {} for attr in indexes}
+        # Indexed values per object id, so updates can find the old keys
+        self._indexed_values = {}
+    
+    def _check_unique(self, obj_id, values):
+        """Raise ValueError if a unique value already belongs to another object"""
+        for attr, index in self._unique.items():
+            value = values.get(attr)
+            owner_id = index.get(value)
+            if value is not None and owner_id is not None and owner_id != obj_id:
+                raise ValueError(f"Duplicate value for unique attribute '{attr}'")
+    
+    def _index(self, obj):
+        """Add an object to every secondary index"""
+        values = {}
+        for attr, index in self._unique.items():
+            value = getattr(obj, attr, None)
+            if value is not None:
+                index[value] = obj.id
+            values[attr] = value
+        for attr, index in self._indexes.items():
+            value = getattr(obj, attr, None)
+            index.setdefault(value, set()).add(obj.id)
+            values[attr] = value
+        self._indexed_values[obj.id] = values
+    
+    def _unindex(self, obj_id):
+        """Remove an object from every secondary index"""
+        values = self._indexed_values.pop(obj_id, {})
+        for attr, index in self._unique.items():
+            if attr in values and index.get(values[attr]) == obj_id:
+                del index[values[attr]]
+        for attr, index in self._indexes.items():
+            ids = index.get(values.get(attr))
+            if ids is not None:
+                ids.discard(obj_id)
+                if not ids:
+                    del index[values[attr]]
     
     def add(self, obj):
         """Add an object to the repository"""
+        self._check_unique(obj.id, {attr: getattr(obj, attr, None)
+                                    for attr in self._unique})
+        self._index(obj)
         self._storage[obj.id] = obj
     
     def get(self, obj_id):
@@ -59,74 +111,336 @@ class InMemoryRepository:
         """Update an object"""
         obj = self.get(obj_id)
         if obj:
+            self._check_unique(obj_id, data)
+            self._unindex(obj_id)
             for key, value in data.items():
                 setattr(obj, key, value)
+            self._index(obj)
         return obj
     
     def delete(self, obj_id):
         """Delete an object"""
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
             return True
         return False
     
     def get_by_attribute(self, attr_name, attr_value):
         """Get an object by a specific attribute"""
+        if attr_name == 'id':
+            return self.get(attr_value)
+        if attr_name in self._unique:
+            return self.get(self._unique[attr_name].get(attr_value))
+        if attr_name in self._indexes:
+            ids = self._indexes[attr_name].get(attr_value)
+            return self._storage[next(iter(ids))] if ids else None
         return next(
             (obj for obj in self._storage.values() 
              if getattr(obj, attr_name, None) == attr_value),
             None
         )
+    
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Get every object whose attribute equals the given value"""
+        if attr_name in self._unique:
+            obj = self.get_by_attribute(attr_name, attr_value)
+            return [obj] if obj else []
+        if attr_name in self._indexes:
+            ids = self._indexes[attr_name].get(attr_value, ())
+            return [self._storage[obj_id] for obj_id in ids]
+        return [obj for obj in self._storage.values()
+                if getattr(obj, attr_name, None) == attr_value]
 
 
 class UserRepository(InMemoryRepository):
     """Repository specifically for User objects"""
     pass
+# Models whose rows are kept in the cross-request entity cache
+_CACHED_MODELS = set()
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_cached_entities(session, flush_context):
+    """Drop cached rows that were written in this flush, however they changed"""
+    for obj in list(session.dirty) + list(session.deleted):
+        if type(obj) in _CACHED_MODELS:
+            key = (type(obj).__name__, obj.id)
+            entity_cache.invalidate(key)
+            session.info.setdefault('written_entities', set()).add(key)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_entities(session):
+    """Drop them again at commit, in case another request re-cached the old row"""
+    for key in session.info.pop('written_entities', ()):
+        entity_cache.invalidate(key)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_written_entities(session):
+    session.info.pop('written_entities', None)
+
+
 # For task 5 
-class SQLAlchemyRepository(Repository):
-    def __init__(self, model):
+class SQLAlchemyRepository(Repository, ModelStatements):
+    def __init__(self, model, cached=False):
         self.model = model
+        self.cached = cached
+        if cached:
+            _CACHED_MODELS.add(model)
+        self.stats = {'identity_map_hits': 0, 'cache_hits': 0, 'queries': 0}
+
+    def _cache_key(self, obj_id):
+        return (self.model.__name__, obj_id)
+
+    def _from_cache(self, obj_id):
+        """Rebuild a session-attached instance from cached values, no SQL"""
+        values = entity_cache.get(self._cache_key(obj_id))
+        if values is None:
+            return None
+        obj = self.model(**values)
+        make_transient_to_detached(obj)
+        return db.session.merge(obj, load=False)
+
+    def _to_cache(self, obj):
+        columns = self.model.__mapper__.column_attrs
+        entity_cache.put(self._cache_key(obj.id),
+                         {attr.key: getattr(obj, attr.key) for attr in columns})
 
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        db.session.flush()
 
+    @replica_read
     def get(self, obj_id):
-        return self.model.query.get(obj_id)
+        """
+        Get an object by primary key
+        Checks the session identity map (per request), then the entity
+        cache for cached models, and only then queries the database
+        """
+        if obj_id is None:
+            return None
+        obj = db.session.identity_map.get(identity_key(self.model, obj_id))
+        if obj is not None and not inspect(obj).expired_attributes:
+            self.stats['identity_map_hits'] += 1
+            return obj
+        if self.cached and entity_cache.enabled:
+            obj = self._from_cache(obj_id)
+            if obj is not None:
+                self.stats['cache_hits'] += 1
+                return obj
+        self.stats['queries'] += 1
+        obj = db.session.get(self.model, obj_id)
+        if obj is not None and self.cached and entity_cache.enabled:
+            self._to_cache(obj)
+        return obj
 
-    def get_all(self):
-        return self.model.query.all()
+    @replica_read
+    def get_all(self, options=None):
+        return db.session.execute(self.all_statement(options)).scalars().all()
+
+    @replica_read
+    def iter_all(self, options=None, batch_size=1000):
+        """Iterate over every object, fetching batch_size rows at a time"""
+        statement = self.all_statement(options).execution_options(yield_per=batch_size)
+        return db.session.execute(statement).scalars()
+
+    @replica_read
+    def get_page(self, limit, cursor=None, options=None):
+        """
+        Get one page of objects ordered by (created_at, id)
+        Returns (items, next_cursor); next_cursor is None on the last page
+        """
+        statement = self.page_statement(limit, cursor, options)
+        return self.split_page(db.session.execute(statement).scalars().all(), limit)
 
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            db.session.flush()
+            entity_cache.invalidate(self._cache_key(obj_id))
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            db.session.flush()
+            entity_cache.invalidate(self._cache_key(obj_id))
 
+    @replica_read
     def get_by_attribute(self, attr_name, attr_value):
-        return self.model.query.filter_by(**{attr_name: attr_value}).first()
+        statement = self.attribute_statement(attr_name, attr_value)
+        return db.session.execute(statement).scalars().first()
+
+    def existing_ids(self, ids):
+        """Return the subset of ids present in the table, in one IN query"""
+        ids = {obj_id for obj_id in ids if isinstance(obj_id, str)}
+        if not ids:
+            return set()
+        rows = db.session.execute(select(self.model.id).where(self.model.id.in_(ids)))
+        return {row[0] for row in rows}
+
+    def stream_rows(self, after=None, batch_size=1000, exclude=()):
+        """
+        Yield batches of plain column dicts ordered by (created_at, id)
+        Rows are fetched with yield_per and never enter the session, so
+        memory stays bounded by batch_size. after is a decoded
+        (created_at, id) keyset position to resume from; exclude names
+        columns to leave out
+        """
+        table = self.model.__table__
+        statement = select(*[c for c in table.c if c.key not in exclude]) \
+            .order_by(table.c.created_at, table.c.id)
+        if after is not None:
+            created_at, obj_id = after
+            statement = statement.where(or_(
+                table.c.created_at > created_at,
+                and_(table.c.created_at == created_at, table.c.id > obj_id)
+            ))
+        result = db.session.execute(statement.execution_options(yield_per=batch_size))
+        for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+
+    def bulk_insert(self, mappings):
+        """
+        Insert plain column dicts with one executemany
+        ORM events do not fire, so mappings must be complete rows
+        """
+        if mappings:
+            db.session.execute(insert(self.model.__table__), mappings)
 # Task 6
 class UserRepository(SQLAlchemyRepository):
     def __init__(self):
-        super().__init__(User)
+        super().__init__(User, cached=True)
 
     def get_user_by_email(self, email):
         return self.model.query.filter_by(email=email).first()
             #### Task 7 ####
-class PlaceRepository(SQLAlchemyRepository):
+class PlaceRepository(SQLAlchemyRepository, PlaceStatements):
     def __init__(self):
         super().__init__(Place)
+
+    @replica_read
+    def search(self, min_price=None, max_price=None, bbox=None,
+               amenity_ids=None, min_rating=None, sort='newest',
+               limit=20, offset=0, options=None):
+        """Filter places in SQL; see PlaceStatements.search_statement"""
+        statement = self.search_statement(
+            min_price=min_price, max_price=max_price, bbox=bbox,
+            amenity_ids=amenity_ids, min_rating=min_rating, sort=sort,
+            limit=limit, offset=offset, options=options)
+        return db.session.execute(statement).scalars().all()
+
+    def apply_review_delta(self, place_id, count_delta, rating_delta):
+        """
+        Adjust a place's review_count/rating_sum in the current transaction
+        The increment runs in SQL so concurrent reviews do not lose updates
+        """
+        self.model.query.filter_by(id=place_id).update({
+            Place.review_count: Place.review_count + count_delta,
+            Place.rating_sum: Place.rating_sum + rating_delta
+        })
+
+    def apply_review_deltas(self, deltas):
+        """Apply {place_id: (count_delta, rating_delta)} with one executemany"""
+        if not deltas:
+            return
+        table = self.model.__table__
+        statement = update(table) \
+            .where(table.c.id == bindparam('place_id')) \
+            .values(review_count=table.c.review_count + bindparam('count_delta'),
+                    rating_sum=table.c.rating_sum + bindparam('rating_delta'))
+        db.session.execute(statement, [
+            {'place_id': place_id, 'count_delta': count, 'rating_delta': rating}
+            for place_id, (count, rating) in deltas.items()
+        ])
+
+    def bulk_link_amenities(self, pairs):
+        """Insert (place_id, amenity_id) rows into place_amenity"""
+        if pairs:
+            db.session.execute(insert(place_amenity), [
+                {'place_id': place_id, 'amenity_id': amenity_id}
+                for place_id, amenity_id in pairs
+            ])
+
+    def link_amenities(self, place_id, amenity_ids):
+        """Link amenities to a place in one statement; returns the number of new links"""
+        return db.session.execute(
+            self.link_amenities_statement(place_id, amenity_ids)).rowcount
+
+    def unlink_amenities(self, place_id, amenity_ids):
+        """Unlink amenities from a place in one statement; returns the number removed"""
+        return db.session.execute(
+            self.unlink_amenities_statement(place_id, amenity_ids)).rowcount
+
+    def amenity_ids_for(self, place_ids):
+        """Return {place_id: [amenity_id, ...]} for the given places, in one IN query"""
+        linked = {place_id: [] for place_id in place_ids}
+        if linked:
+            rows = db.session.execute(
+                select(place_amenity.c.place_id, place_amenity.c.amenity_id)
+                .where(place_amenity.c.place_id.in_(list(linked)))
+            )
+            for place_id, amenity_id in rows:
+                linked[place_id].append(amenity_id)
+        return linked
+
+    def rebuild_rating_aggregates(self):
+        """Recompute review_count/rating_sum for every place from reviews"""
+        review_count = select(func.count(Review.id)) \
+            .where(Review.place_id == Place.id).scalar_subquery()
+        rating_sum = select(func.coalesce(func.sum(Review.rating), 0)) \
+            .where(Review.place_id == Place.id).scalar_subquery()
+        updated = self.model.query.update({
+            Place.review_count: review_count,
+            Place.rating_sum: rating_sum
+        }, synchronize_session=False)
+        return updated
+
+    @replica_read
+    def get_nearby(self, latitude, longitude, radius_km, options=None):
+        """
+        Get (place, distance_km) pairs within radius_km, nearest first
+        Candidates come from the geo_cell index and are refined with an
+        exact haversine distance
+        """
+        statement = self.nearby_statement(latitude, longitude, radius_km, options)
+        places = db.session.execute(statement).scalars()
+        return self.nearest(places, latitude, longitude, radius_km)
     
-class ReviewRepository(SQLAlchemyRepository):
+class ReviewRepository(SQLAlchemyRepository, ReviewStatements):
     def __init__(self):
         super().__init__(Review)
+
+    def exists_for(self, user_id, place_id):
+        """Check whether a user already reviewed a place (index lookup)"""
+        return db.session.execute(self.exists_statement(user_id, place_id)).scalar()
+
+    @replica_read
+    def get_by_place(self, place_id, options=None):
+        """Get the reviews of one place (uses the place_id index)"""
+        statement = self.by_place_statement(place_id, options)
+        return db.session.execute(statement).scalars().all()
+
+    def existing_pairs(self, pairs):
+        """Return the (user_id, place_id) pairs that already have a review"""
+        if not pairs:
+            return set()
+        rows = db.session.execute(
+            select(Review.user_id, Review.place_id)
+            .where(tuple_(Review.user_id, Review.place_id).in_(list(pairs)))
+        )
+        return {(row[0], row[1]) for row in rows}
 class AmenityRepository(SQLAlchemyRepository):
     def __init__(self):
-        super().__init__(Amenity)
+        super().__init__(Amenity, cached=True)
+
+    def existing_names(self, names):
+        """Return the subset of amenity names already taken, in one IN query"""
+        if not names:
+            return set()
+        rows = db.session.execute(select(Amenity.name).where(Amenity.name.in_(names)))
+        return {row[0] for row in rows}
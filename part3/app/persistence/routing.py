@@ -0,0 +1,73 @@
+"""
+Read-replica routing for db.session
+
+When a 'replica' bind is configured (DATABASE_REPLICA_URL), repository
+read methods decorated with replica_read send their SELECTs to it and
+everything else goes to the primary. Once a session has written
+anything, or while a unit of work is open, it reads from the primary
+too, so a request always sees its own writes. primary_read pins the
+reads of a method that must not see a lagging copy but does not
+otherwise need a unit of work (login) to the primary.
+"""
+from contextlib import contextmanager
+from functools import wraps
+import sqlalchemy as sa
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that can route reads to the replica bind"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            is_select = isinstance(clause, sa.Select)
+            if self._flushing or (clause is not None and not is_select):
+                self.info['wrote'] = True
+            elif (self.info.get('replica_reads') and is_select
+                  and not self.info.get('wrote')
+                  and not self.info.get('uow_depth')
+                  and not self.info.get('primary_reads')):
+                engine = self._db.engines.get(REPLICA_BIND)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def replica_reads(session):
+    """Let SELECTs run inside the block go to the replica"""
+    depth = session.info.get('replica_reads', 0)
+    session.info['replica_reads'] = depth + 1
+    try:
+        yield session
+    finally:
+        session.info['replica_reads'] = depth
+
+
+def replica_read(fn):
+    """Run a repository read method with replica reads allowed"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        from app import db
+
+        with replica_reads(db.session):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def primary_read(fn):
+    """Run a facade method with every read on the primary"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        from app import db
+
+        session = db.session
+        depth = session.info.get('primary_reads', 0)
+        session.info['primary_reads'] = depth + 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            session.info['primary_reads'] = depth
+    return wrapper
@@ -0,0 +1,197 @@
+"""
+Statements shared by the sync and async repositories
+
+The classes here only build statements and post-process loaded rows;
+they never touch a session. SQLAlchemyRepository executes the
+statements on db.session and AsyncSQLAlchemyRepository awaits them on
+an AsyncSession, so both serve the same queries.
+"""
+import base64
+from datetime import datetime
+from sqlalchemy import and_, delete, func, insert, literal, or_, select
+from sqlalchemy.orm import joinedload, selectinload, undefer
+from app.geo import bounding_box, cells_covering, haversine_km
+from app.models.amenity import Amenity
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+
+
+def encode_cursor(obj):
+    """Build an opaque keyset cursor from an object's (created_at, id)"""
+    raw = f"{obj.created_at.isoformat()}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a keyset cursor back into a (created_at, id) tuple"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, obj_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), obj_id
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+class ModelStatements:
+    """Statements over one model's table"""
+
+    def _eager_options(self):
+        """Loader options applied to list queries (overridden per model)"""
+        return []
+
+    def _list_options(self, options, *columns):
+        """
+        Loader options for a list query
+        options replaces the model's eager options (e.g. a column
+        projection); columns the query itself reads are always loaded
+        """
+        if options is None:
+            return self._eager_options()
+        return [*options, *[undefer(column) for column in columns]]
+
+    def all_statement(self, options=None):
+        return select(self.model).options(*(options or []))
+
+    def attribute_statement(self, attr_name, attr_value):
+        return select(self.model).filter_by(**{attr_name: attr_value}).limit(1)
+
+    def page_statement(self, limit, cursor=None, options=None):
+        """
+        One page ordered by (created_at, id), plus one row to tell
+        whether another page follows (see split_page)
+        """
+        statement = select(self.model).options(
+            *self._list_options(options, self.model.created_at))
+        if cursor:
+            created_at, obj_id = decode_cursor(cursor)
+            statement = statement.where(or_(
+                self.model.created_at > created_at,
+                and_(self.model.created_at == created_at,
+                     self.model.id > obj_id)
+            ))
+        return statement.order_by(self.model.created_at, self.model.id) \
+                        .limit(limit + 1)
+
+    @staticmethod
+    def split_page(items, limit):
+        """(items, next_cursor) from the rows of page_statement"""
+        if len(items) > limit:
+            items = items[:limit]
+            return items, encode_cursor(items[-1])
+        return items, None
+
+
+class PlaceStatements(ModelStatements):
+    """Search and radius queries over places"""
+
+    def _eager_options(self):
+        return [
+            joinedload(Place.owner),
+            selectinload(Place.amenities),
+            selectinload(Place.reviews)
+        ]
+
+    def link_amenities_statement(self, place_id, amenity_ids):
+        """
+        INSERT ... SELECT of the place_amenity rows a place is missing
+        Only amenities that exist and are not linked yet are selected,
+        so duplicates are skipped instead of violating the primary key
+        """
+        linked = select(place_amenity.c.amenity_id) \
+            .where(place_amenity.c.place_id == place_id)
+        rows = select(literal(place_id), Amenity.id) \
+            .where(Amenity.id.in_(set(amenity_ids)), Amenity.id.not_in(linked))
+        return insert(place_amenity).from_select(['place_id', 'amenity_id'], rows)
+
+    def unlink_amenities_statement(self, place_id, amenity_ids):
+        """DELETE of a place's place_amenity rows for the given amenities"""
+        return delete(place_amenity).where(
+            place_amenity.c.place_id == place_id,
+            place_amenity.c.amenity_id.in_(set(amenity_ids)))
+
+    def search_statement(self, min_price=None, max_price=None, bbox=None,
+                         amenity_ids=None, min_rating=None, sort='newest',
+                         limit=20, offset=0, options=None):
+        """
+        Filter places in SQL
+        bbox is (min_lat, min_lon, max_lat, max_lon); amenity_ids must all
+        be attached to a place for it to match
+        """
+        statement = select(Place).options(*self._list_options(options))
+
+        if min_price is not None:
+            statement = statement.where(Place.price >= min_price)
+        if max_price is not None:
+            statement = statement.where(Place.price <= max_price)
+
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            statement = statement.where(Place.latitude.between(min_lat, max_lat))
+            if min_lon <= max_lon:
+                statement = statement.where(Place.longitude.between(min_lon, max_lon))
+            else:
+                # Box crosses the antimeridian
+                statement = statement.where(or_(Place.longitude >= min_lon,
+                                                Place.longitude <= max_lon))
+
+        if amenity_ids:
+            amenity_ids = set(amenity_ids)
+            matching = select(place_amenity.c.place_id) \
+                .where(place_amenity.c.amenity_id.in_(amenity_ids)) \
+                .group_by(place_amenity.c.place_id) \
+                .having(func.count(func.distinct(place_amenity.c.amenity_id))
+                        == len(amenity_ids))
+            statement = statement.where(Place.id.in_(matching))
+
+        if min_rating is not None:
+            statement = statement.where(Place.avg_rating >= min_rating)
+
+        if sort == 'price_asc':
+            statement = statement.order_by(Place.price, Place.id)
+        elif sort == 'price_desc':
+            statement = statement.order_by(Place.price.desc(), Place.id)
+        elif sort == 'rating':
+            statement = statement.order_by(Place.avg_rating.desc().nulls_last(),
+                                           Place.id)
+        else:
+            statement = statement.order_by(Place.created_at.desc(), Place.id)
+
+        return statement.offset(offset).limit(limit)
+
+    def nearby_statement(self, latitude, longitude, radius_km, options=None):
+        """
+        Candidate places for a radius query, from the geo_cell index and
+        a latitude band; refine them with nearest()
+        """
+        statement = select(Place).options(
+            *self._list_options(options, Place.latitude, Place.longitude))
+        min_lat, min_lon, max_lat, max_lon = bounding_box(latitude, longitude, radius_km)
+        cells = cells_covering(latitude, longitude, radius_km)
+        if cells is not None:
+            statement = statement.where(Place.geo_cell.in_(cells))
+        return statement.where(Place.latitude.between(min_lat, max_lat))
+
+    @staticmethod
+    def nearest(places, latitude, longitude, radius_km):
+        """(place, distance_km) pairs within radius_km, nearest first"""
+        results = []
+        for place in places:
+            distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+            if distance <= radius_km:
+                results.append((place, distance))
+        results.sort(key=lambda pair: pair[1])
+        return results
+
+
+class ReviewStatements(ModelStatements):
+    """Per-place and per-user review queries"""
+
+    def by_place_statement(self, place_id, options=None):
+        """The reviews of one place (uses the place_id index)"""
+        return select(Review).options(*(options or [])) \
+            .where(Review.place_id == place_id)
+
+    def exists_statement(self, user_id, place_id):
+        """Whether a user already reviewed a place (unique index lookup)"""
+        return select(select(Review.id).where(
+            Review.user_id == user_id, Review.place_id == place_id).exists())
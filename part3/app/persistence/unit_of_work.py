@@ -0,0 +1,37 @@
+"""
+Unit of work for the SQLAlchemy repositories
+
+Repositories and models only flush. The outermost unit of work (one per
+facade operation) commits once at the end, or rolls back if anything
+raised. Nested units join the outer one instead of committing early.
+"""
+from contextlib import contextmanager
+from functools import wraps
+from app import db
+
+
+@contextmanager
+def unit_of_work():
+    """Commit once when the outermost scope exits, roll back on error"""
+    session = db.session
+    depth = session.info.get('uow_depth', 0)
+    session.info['uow_depth'] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except Exception:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        session.info['uow_depth'] = depth
+
+
+def transactional(fn):
+    """Run a facade method inside a unit of work"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with unit_of_work():
+            return fn(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,302 @@
+"""
+Async facade for the ASGI app
+
+AsyncHBnBFacade mirrors the request-serving methods of HBnBFacade on
+the async repositories. Field validation is the models' own
+(_validate_* and apply_update) and argument checks come from
+app.services.validation, so both facades accept and reject the same
+input. bcrypt runs on the password_hasher pool and is awaited.
+
+Bulk import, catalog export and rating rebuilds are admin batch jobs
+and stay on the sync facade.
+"""
+from sqlalchemy.exc import IntegrityError
+from app import password_hasher, query_metrics, response_cache
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.persistence.async_db import async_transactional, async_unit_of_work
+from app.persistence.async_repository import (AsyncAmenityRepository, AsyncPlaceRepository,
+                                              AsyncReviewRepository, AsyncUserRepository)
+from app.services.validation import (check_found, check_nearby, check_place_search,
+                                     normalize_email)
+
+
+@query_metrics.scoped
+class AsyncHBnBFacade:
+    def __init__(self):
+        self.user_repo = AsyncUserRepository()
+        self.amenity_repo = AsyncAmenityRepository()
+        self.place_repo = AsyncPlaceRepository()
+        self.review_repo = AsyncReviewRepository()
+
+    # ========== User Methods ==========
+    @async_transactional
+    async def create_user(self, user_data):
+        """Create a new user with hashed password"""
+        email = normalize_email(user_data['email'])
+
+        if await self.user_repo.get_by_attribute('email', email):
+            raise ValueError("Email already registered")
+
+        user = User(
+            first_name=user_data['first_name'],
+            last_name=user_data['last_name'],
+            email=email,
+            is_admin=user_data.get('is_admin', False)
+        )
+        user.password = await password_hasher.hash_async(user_data['password'])
+
+        await self.user_repo.add(user)
+        return user
+
+    async def iter_all_users(self):
+        """Async iterator over all users in batches, for streamed listings"""
+        return await self.user_repo.iter_all()
+
+    async def get_user_by_email(self, email):
+        """Get user by email"""
+        return await self.user_repo.get_by_attribute('email', normalize_email(email))
+
+    async def authenticate_user(self, email, password):
+        """
+        Return the user for valid credentials, or None
+        Hashes made with a different bcrypt cost are upgraded on success;
+        only that upgrade opens a unit of work, so other logins never commit
+        """
+        user = await self.get_user_by_email(email)
+        if not user or not await password_hasher.verify_async(user.password, password):
+            return None
+
+        if user.password_needs_rehash():
+            password_hash = await password_hasher.hash_async(password)
+            async with async_unit_of_work():
+                user.password = password_hash
+        return user
+
+    async def get_user_by_id(self, user_id):
+        """Get user by ID"""
+        return await self.user_repo.get(user_id)
+
+    @async_transactional
+    async def update_user(self, user_id, user_data):
+        """Update user information"""
+        user = await self.user_repo.get(user_id)
+        if not user:
+            return None
+
+        if 'first_name' in user_data:
+            user.first_name = user_data['first_name']
+        if 'last_name' in user_data:
+            user.last_name = user_data['last_name']
+        if 'password' in user_data:
+            user.password = await password_hasher.hash_async(user_data['password'])
+
+        await self.user_repo.save(user)
+        return user
+
+    # ========== Place Methods ==========
+    @response_cache.invalidates('places')
+    @async_transactional
+    async def create_place(self, place_data):
+        """Create a new place"""
+        owner = await self.user_repo.get(place_data['owner_id'])
+        if not owner:
+            raise ValueError("Owner not found")
+
+        place = Place(
+            title=place_data['title'],
+            description=place_data.get('description', ''),
+            price=place_data['price'],
+            latitude=place_data['latitude'],
+            longitude=place_data['longitude'],
+            owner_id=owner.id,
+            # Loaded and empty, so to_dict() never lazy-loads them
+            amenities=[],
+            reviews=[]
+        )
+
+        await self.place_repo.add(place)
+        return place
+
+    async def get_place(self, place_id, options=None):
+        """Get a place by ID, with loader options for its serializer projection"""
+        if options is None:
+            return await self.place_repo.get(place_id)
+        return await self.place_repo.get_with(place_id, options)
+
+    async def get_places_page(self, limit=20, cursor=None, options=None):
+        """Get one page of places and the cursor for the next page"""
+        return await self.place_repo.get_page(limit, cursor, options=options)
+
+    async def search_places(self, min_price=None, max_price=None, bbox=None,
+                            amenity_ids=None, min_rating=None, sort='newest',
+                            limit=20, offset=0, options=None):
+        """Search places by price, bounding box, amenities and rating"""
+        check_place_search(min_price, max_price, bbox, min_rating, sort, offset)
+
+        return await self.place_repo.search(
+            min_price=min_price,
+            max_price=max_price,
+            bbox=bbox,
+            amenity_ids=amenity_ids,
+            min_rating=min_rating,
+            sort=sort,
+            limit=limit,
+            offset=offset,
+            options=options
+        )
+
+    async def get_places_nearby(self, latitude, longitude, radius_km, limit=None, options=None):
+        """Get (place, distance_km) pairs within radius_km of a point"""
+        check_nearby(latitude, longitude, radius_km)
+
+        results = await self.place_repo.get_nearby(latitude, longitude, radius_km,
+                                                   options=options)
+        return results[:limit] if limit else results
+
+    @response_cache.invalidates('places')
+    @async_transactional
+    async def update_place(self, place_id, place_data):
+        """Update a place"""
+        place = await self.place_repo.get(place_id)
+        if not place:
+            return None
+
+        place.apply_update(place_data)
+        await self.place_repo.save(place)
+        return place
+
+    @response_cache.invalidates('places')
+    @async_transactional
+    async def attach_amenities(self, place_id, amenity_ids):
+        """
+        Link amenities to a place; links that already exist are kept
+        Raises ValueError naming every amenity ID that does not exist;
+        returns the number of links added
+        """
+        amenity_ids = list(amenity_ids)
+        check_found('Amenities', amenity_ids,
+                    await self.amenity_repo.existing_ids(amenity_ids))
+        return await self.place_repo.link_amenities(place_id, amenity_ids)
+
+    @response_cache.invalidates('places')
+    @async_transactional
+    async def detach_amenities(self, place_id, amenity_ids):
+        """Unlink amenities from a place; returns the number of links removed"""
+        return await self.place_repo.unlink_amenities(place_id, amenity_ids)
+
+    # ========== Review Methods ==========
+    @response_cache.invalidates('reviews', 'places')
+    @async_transactional
+    async def create_review(self, review_data):
+        """Create a new review"""
+        place = await self.place_repo.get(review_data['place_id'])
+        if not place:
+            raise ValueError("Place not found")
+
+        user = await self.user_repo.get(review_data['user_id'])
+        if not user:
+            raise ValueError("User not found")
+
+        review = Review(
+            text=review_data['text'],
+            rating=review_data['rating'],
+            place_id=place.id,
+            user_id=user.id
+        )
+        review.text = review._validate_text(review.text)
+        review.rating = review._validate_rating(review.rating)
+
+        if await self.review_repo.exists_for(user.id, place.id):
+            raise ValueError("You have already reviewed this place")
+
+        # Counters are committed together with the review; the unique
+        # (user_id, place_id) constraint catches concurrent duplicates
+        try:
+            await self.place_repo.apply_review_delta(place.id, 1, review.rating)
+            await self.review_repo.add(review)
+        except IntegrityError:
+            raise ValueError("You have already reviewed this place")
+        return review
+
+    async def get_review(self, review_id):
+        """Get a review by ID"""
+        return await self.review_repo.get(review_id)
+
+    async def iter_all_reviews(self, options=None):
+        """Async iterator over all reviews in batches, for streamed listings"""
+        return await self.review_repo.iter_all(options)
+
+    async def get_reviews_by_place(self, place_id, options=None):
+        """Get all reviews for a specific place"""
+        return await self.review_repo.get_by_place(place_id, options)
+
+    @response_cache.invalidates('reviews', 'places')
+    @async_transactional
+    async def update_review(self, review_id, review_data):
+        """Update a review"""
+        review = await self.review_repo.get(review_id)
+        if not review:
+            return None
+
+        old_rating = review.rating
+        review.apply_update(review_data)
+        if review.rating != old_rating:
+            await self.place_repo.apply_review_delta(
+                review.place_id, 0, review.rating - old_rating)
+
+        await self.review_repo.save(review)
+        return review
+
+    @response_cache.invalidates('reviews', 'places')
+    @async_transactional
+    async def delete_review(self, review_id):
+        """Delete a review"""
+        review = await self.review_repo.get(review_id)
+        if not review:
+            return False
+
+        await self.place_repo.apply_review_delta(review.place_id, -1, -review.rating)
+        await self.review_repo.delete(review_id)
+        return True
+
+    # ========== Amenity Methods ==========
+    @response_cache.invalidates('amenities')
+    @async_transactional
+    async def create_amenity(self, amenity_data):
+        """Create a new amenity"""
+        amenity = Amenity(
+            name=amenity_data['name']
+        )
+
+        await self.amenity_repo.add(amenity)
+        return amenity
+
+    async def get_amenity(self, amenity_id):
+        """Get an amenity by ID"""
+        return await self.amenity_repo.get(amenity_id)
+
+    async def get_amenity_by_name(self, name):
+        """Get an amenity by its unique name"""
+        return await self.amenity_repo.get_by_attribute('name', name)
+
+    async def get_all_amenities(self):
+        """Get all amenities"""
+        return await self.amenity_repo.get_all()
+
+    @response_cache.invalidates('amenities', 'places')
+    @async_transactional
+    async def update_amenity(self, amenity_id, amenity_data):
+        """Update an amenity"""
+        amenity = await self.amenity_repo.get(amenity_id)
+        if not amenity:
+            return None
+
+        amenity.apply_update(amenity_data)
+        await self.amenity_repo.save(amenity)
+        return amenity
+
+
+async_facade = AsyncHBnBFacade()
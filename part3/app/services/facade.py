@@ -1,11 +1,56 @@
+from datetime import datetime
+import uuid
+from sqlalchemy.exc import IntegrityError
+from app import entity_cache, query_metrics, response_cache
 from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
+from app.models.amenity import Amenity
+from app.export import EXPORT_TYPES, decode_export_cursor
+from app.geo import cell_for
+from app.metrics import repeated_queries_expected
 from app.persistence.repository import InMemoryRepository
 from app.persistence.repository import SQLAlchemyRepository # task 5
 #from app.services.repositories.user_repository import UserRepository # Task 6 المطلوب بس الباث مو صحيح لمشروعنا
 from app.persistence.repository import UserRepository, AmenityRepository, PlaceRepository, ReviewRepository # Tasks 6&7
+from app.persistence.routing import primary_read
+from app.persistence.unit_of_work import transactional, unit_of_work
+from app.services.validation import (PLACE_SORTS, check_found, check_nearby,
+                                     check_place_search, normalize_email)
 
+# Rows inserted per executemany/commit by the bulk import methods
+BULK_CHUNK_SIZE = 1000
+
+# Rows fetched per round trip by the catalog export
+EXPORT_BATCH_SIZE = 1000
+
+
+def _chunked(rows, size):
+    """Yield lists of (row_number, row) with at most size items each"""
+    chunk = []
+    for item in enumerate(rows, 1):
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _known(value, ids):
+    """True if value is a string ID contained in ids"""
+    return isinstance(value, str) and value in ids
+
+
+def _bulk_row(row):
+    """Check a bulk row is a JSON object (parse errors arrive as ValueError)"""
+    if isinstance(row, ValueError):
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError("Row must be a JSON object")
+    return row
+
+@query_metrics.scoped
 class HBnBFacade:
     def __init__(self):
         #self.user_repo = InMemoryRepository()
@@ -19,10 +64,21 @@ class HBnBFacade:
         #self.review_repo = InMemoryRepository()     # تاسك 3: إضافة repository للتقييمات
         #self.amenity_repo = InMemoryRepository()    # تاسك 3: إضافة repository للمرافق
     
+    def get_repository_stats(self):
+        """Primary-key lookup statistics per repository and for the entity cache"""
+        return {
+            'users': dict(self.user_repo.stats),
+            'places': dict(self.place_repo.stats),
+            'reviews': dict(self.review_repo.stats),
+            'amenities': dict(self.amenity_repo.stats),
+            'entity_cache': entity_cache.stats()
+        }
+    
     # ========== User Methods ==========
+    @transactional
     def create_user(self, user_data):
         """Create a new user with hashed password"""
-        email = user_data['email'].strip().lower()
+        email = normalize_email(user_data['email'])
         
         if self.user_repo.get_by_attribute('email', email):
             raise ValueError("Email already registered")
@@ -41,20 +97,40 @@ class HBnBFacade:
         self.user_repo.add(user)
         return user
     
+    def iter_all_users(self):
+        """Iterate over all users in batches, for streamed listings"""
+        return self.user_repo.iter_all()
+    
     def get_all_users(self):
         """Get all users"""
         return self.user_repo.get_all()
     
     def get_user_by_email(self, email):
         """Get user by email"""
-        normalized_email = email.strip().lower()
-        return self.user_repo.get_by_attribute('email', normalized_email)
+        return self.user_repo.get_by_attribute('email', normalize_email(email))
+    
+    @primary_read
+    def authenticate_user(self, email, password):
+        """
+        Return the user for valid credentials, or None
+        Hashes made with a different bcrypt cost are upgraded on success;
+        only that upgrade opens a unit of work, so other logins never commit
+        """
+        user = self.get_user_by_email(email)
+        if not user or not user.verify_password(password):
+            return None
+        
+        if user.password_needs_rehash():
+            with unit_of_work():
+                user.hash_password(password)
+        return user
     
     def get_user_by_id(self, user_id):
         """Get user by ID"""
         return self.user_repo.get(user_id)
     
     # تاسك 3: دالة جديدة لتعديل بيانات المستخدم (PUT /api/v1/users/<user_id>)
+    @transactional
     def update_user(self, user_id, user_data):
         """Update user information"""
         user = self.user_repo.get(user_id)
@@ -65,11 +141,15 @@ class HBnBFacade:
             user.first_name = user_data['first_name']
         if 'last_name' in user_data:
             user.last_name = user_data['last_name']
+        if 'password' in user_data:
+            user.hash_password(user_data['password'])
         
         return user
     
     # ========== Place Methods - تاسك 3 ==========
     # تاسك 3: دالة إنشاء مكان جديد (POST /api/v1/places/)
+    @response_cache.invalidates('places')
+    @transactional
     def create_place(self, place_data):
         """Create a new place"""
         owner = self.user_repo.get(place_data['owner_id'])
@@ -97,8 +177,41 @@ class HBnBFacade:
     def get_all_places(self):
         """Get all places"""
         return self.place_repo.get_all()
+
+    def get_places_page(self, limit=20, cursor=None, options=None):
+        """Get one page of places and the cursor for the next page"""
+        return self.place_repo.get_page(limit, cursor, options=options)
+
+    PLACE_SORTS = PLACE_SORTS
+
+    def search_places(self, min_price=None, max_price=None, bbox=None,
+                      amenity_ids=None, min_rating=None, sort='newest',
+                      limit=20, offset=0, options=None):
+        """Search places by price, bounding box, amenities and rating"""
+        check_place_search(min_price, max_price, bbox, min_rating, sort, offset)
+
+        return self.place_repo.search(
+            min_price=min_price,
+            max_price=max_price,
+            bbox=bbox,
+            amenity_ids=amenity_ids,
+            min_rating=min_rating,
+            sort=sort,
+            limit=limit,
+            offset=offset,
+            options=options
+        )
+
+    def get_places_nearby(self, latitude, longitude, radius_km, limit=None, options=None):
+        """Get (place, distance_km) pairs within radius_km of a point"""
+        check_nearby(latitude, longitude, radius_km)
+
+        results = self.place_repo.get_nearby(latitude, longitude, radius_km, options=options)
+        return results[:limit] if limit else results
     
     # تاسك 3: دالة تعديل المكان (PUT /api/v1/places/<place_id>)
+    @response_cache.invalidates('places')
+    @transactional
     def update_place(self, place_id, place_data):
         """Update a place"""
         place = self.place_repo.get(place_id)
@@ -107,9 +220,30 @@ class HBnBFacade:
         
         place.update(place_data)
         return place
+
+    @response_cache.invalidates('places')
+    @transactional
+    def attach_amenities(self, place_id, amenity_ids):
+        """
+        Link amenities to a place; links that already exist are kept
+        All IDs are checked with one IN query and the links inserted
+        with one statement. Raises ValueError naming every amenity ID
+        that does not exist; returns the number of links added
+        """
+        amenity_ids = list(amenity_ids)
+        check_found('Amenities', amenity_ids, self.amenity_repo.existing_ids(amenity_ids))
+        return self.place_repo.link_amenities(place_id, amenity_ids)
+
+    @response_cache.invalidates('places')
+    @transactional
+    def detach_amenities(self, place_id, amenity_ids):
+        """Unlink amenities from a place in one statement; returns the number removed"""
+        return self.place_repo.unlink_amenities(place_id, amenity_ids)
     
     # ========== Review Methods - تاسك 3 ==========
     # تاسك 3: دالة إنشاء تقييم جديد (POST /api/v1/reviews/)
+    @response_cache.invalidates('reviews', 'places')
+    @transactional
     def create_review(self, review_data):
         """Create a new review"""
         place = self.place_repo.get(review_data['place_id'])
@@ -123,12 +257,22 @@ class HBnBFacade:
         review = Review(
             text=review_data['text'],
             rating=review_data['rating'],
-            place=place,
-            user=user
+            place_id=place.id,
+            user_id=user.id
         )
+        review.text = review._validate_text(review.text)
+        review.rating = review._validate_rating(review.rating)
+        
+        if self.review_repo.exists_for(user.id, place.id):
+            raise ValueError("You have already reviewed this place")
         
-        self.review_repo.add(review)
-        place.add_review(review)
+        # Counters are committed together with the review; the unique
+        # (user_id, place_id) constraint catches concurrent duplicates
+        try:
+            self.place_repo.apply_review_delta(place.id, 1, review.rating)
+            self.review_repo.add(review)
+        except IntegrityError:
+            raise ValueError("You have already reviewed this place")
         return review
     
     # تاسك 3: دالة جلب تقييم بالـ ID
@@ -137,39 +281,65 @@ class HBnBFacade:
         return self.review_repo.get(review_id)
     
     # تاسك 3: دالة جلب كل التقييمات
-    def get_all_reviews(self):
+    def get_all_reviews(self, options=None):
         """Get all reviews"""
-        return self.review_repo.get_all()
+        return self.review_repo.get_all(options)
+    
+    def iter_all_reviews(self, options=None):
+        """Iterate over all reviews in batches, for streamed listings"""
+        return self.review_repo.iter_all(options)
     
     # تاسك 3: دالة جلب تقييمات مكان معين (للتحقق من عدم التكرار)
-    def get_reviews_by_place(self, place_id):
+    def get_reviews_by_place(self, place_id, options=None):
         """Get all reviews for a specific place"""
-        place = self.place_repo.get(place_id)
-        if not place:
-            return []
-        return place.reviews
+        return self.review_repo.get_by_place(place_id, options)
     
     # تاسك 3: دالة تعديل التقييم (PUT /api/v1/reviews/<review_id>)
+    @response_cache.invalidates('reviews', 'places')
+    @transactional
     def update_review(self, review_id, review_data):
         """Update a review"""
         review = self.review_repo.get(review_id)
         if not review:
             return None
         
+        if 'text' in review_data:
+            review._validate_text(review_data['text'])
+        if 'rating' in review_data:
+            new_rating = review._validate_rating(review_data['rating'])
+            if new_rating != review.rating:
+                self.place_repo.apply_review_delta(
+                    review.place_id, 0, new_rating - review.rating)
+        
+        # The review and the place counters are committed together
         review.update(review_data)
         return review
     
     # تاسك 3: دالة حذف التقييم (DELETE /api/v1/reviews/<review_id>)
+    @response_cache.invalidates('reviews', 'places')
+    @transactional
     def delete_review(self, review_id):
         """Delete a review"""
-        return self.review_repo.delete(review_id)
+        review = self.review_repo.get(review_id)
+        if not review:
+            return False
+        
+        self.place_repo.apply_review_delta(review.place_id, -1, -review.rating)
+        self.review_repo.delete(review_id)
+        return True
+    
+    @response_cache.invalidates('places')
+    @transactional
+    def rebuild_rating_aggregates(self):
+        """Recompute every place's review_count/rating_sum from reviews"""
+        return self.place_repo.rebuild_rating_aggregates()
     
     # ========== Amenity Methods - تاسك 3 & 4 ==========
     # تاسك 4: دالة إنشاء مرفق جديد (POST /api/v1/amenities/) - فقط Admin
+    @response_cache.invalidates('amenities')
+    @transactional
     def create_amenity(self, amenity_data):
         """Create a new amenity"""
-        from app.models.amenity import Amenity
-        
         amenity = Amenity(
             name=amenity_data['name']
         )
@@ -188,6 +358,8 @@ class HBnBFacade:
         return self.amenity_repo.get_all()
     
     # تاسك 4: دالة تعديل المرفق (PUT /api/v1/amenities/<id>) - فقط Admin
+    @response_cache.invalidates('amenities', 'places')
+    @transactional
     def update_amenity(self, amenity_id, amenity_data):
         """Update an amenity"""
         amenity = self.amenity_repo.get(amenity_id)
@@ -196,5 +368,237 @@ class HBnBFacade:
         
         amenity.update(amenity_data)
         return amenity
+    
+    # ========== Bulk import ==========
+    # Rows are validated with the model _validate_* methods, foreign keys
+    # are resolved with one IN query per chunk, and each chunk is inserted
+    # with executemany and committed once. Invalid rows are skipped and
+    # reported as {'row': <1-based number>, 'error': <message>}.
+    
+    @response_cache.invalidates('places')
+    @repeated_queries_expected()
+    def bulk_create_places(self, rows, default_owner_id=None, chunk_size=BULK_CHUNK_SIZE):
+        """Import places from an iterable of dicts"""
+        report = {'created': 0, 'errors': []}
+        validator = Place()
+        for chunk in _chunked(rows, chunk_size):
+            dict_rows = [row for _, row in chunk if isinstance(row, dict)]
+            owners = self.user_repo.existing_ids(
+                row.get('owner_id', default_owner_id) for row in dict_rows)
+            amenities = self.amenity_repo.existing_ids(
+                amenity_id for row in dict_rows
+                if isinstance(row.get('amenities'), list)
+                for amenity_id in row['amenities'])
+            
+            now = datetime.utcnow()
+            places, links = [], []
+            for number, row in chunk:
+                try:
+                    row = _bulk_row(row)
+                    owner_id = row.get('owner_id', default_owner_id)
+                    if not _known(owner_id, owners):
+                        raise ValueError("Owner not found")
+                    amenity_ids = row.get('amenities') or []
+                    if not isinstance(amenity_ids, list) or \
+                            not all(isinstance(a, str) for a in amenity_ids):
+                        raise ValueError("amenities must be a list of amenity IDs")
+                    amenity_ids = set(amenity_ids)
+                    missing = amenity_ids - amenities
+                    if missing:
+                        raise ValueError(f"Amenity not found: {', '.join(sorted(missing))}")
+                    description = row.get('description') or ''
+                    if not isinstance(description, str) or len(description) > 500:
+                        raise ValueError("Description must be a string of 500 characters or less")
+                    latitude = validator._validate_latitude(row.get('latitude'))
+                    longitude = validator._validate_longitude(row.get('longitude'))
+                    place = {
+                        'id': str(uuid.uuid4()),
+                        'title': validator._validate_title(row.get('title')),
+                        'description': description,
+                        'price': validator._validate_price(row.get('price')),
+                        'latitude': latitude,
+                        'longitude': longitude,
+                        'geo_cell': cell_for(latitude, longitude),
+                        'review_count': 0,
+                        'rating_sum': 0,
+                        'owner_id': owner_id,
+                        'created_at': now,
+                        'updated_at': now
+                    }
+                except ValueError as e:
+                    report['errors'].append({'row': number, 'error': str(e)})
+                    continue
+                places.append(place)
+                links.extend((place['id'], amenity_id) for amenity_id in amenity_ids)
+            
+            with unit_of_work():
+                self.place_repo.bulk_insert(places)
+                self.place_repo.bulk_link_amenities(links)
+            report['created'] += len(places)
+        return report
+    
+    @response_cache.invalidates('reviews', 'places')
+    @repeated_queries_expected()
+    def bulk_create_reviews(self, rows, chunk_size=BULK_CHUNK_SIZE):
+        """Import reviews from an iterable of dicts, keeping place rating aggregates"""
+        report = {'created': 0, 'errors': []}
+        validator = Review()
+        for chunk in _chunked(rows, chunk_size):
+            dict_rows = [row for _, row in chunk if isinstance(row, dict)]
+            users = self.user_repo.existing_ids(row.get('user_id') for row in dict_rows)
+            places = self.place_repo.existing_ids(row.get('place_id') for row in dict_rows)
+            taken = self.review_repo.existing_pairs({
+                (row.get('user_id'), row.get('place_id')) for row in dict_rows
+                if _known(row.get('user_id'), users) and _known(row.get('place_id'), places)
+            })
+            
+            now = datetime.utcnow()
+            reviews, deltas = [], {}
+            for number, row in chunk:
+                try:
+                    row = _bulk_row(row)
+                    user_id, place_id = row.get('user_id'), row.get('place_id')
+                    if not _known(user_id, users):
+                        raise ValueError("User not found")
+                    if not _known(place_id, places):
+                        raise ValueError("Place not found")
+                    if (user_id, place_id) in taken:
+                        raise ValueError("User has already reviewed this place")
+                    review = {
+                        'id': str(uuid.uuid4()),
+                        'text': validator._validate_text(row.get('text')),
+                        'rating': validator._validate_rating(row.get('rating')),
+                        'user_id': user_id,
+                        'place_id': place_id,
+                        'created_at': now,
+                        'updated_at': now
+                    }
+                except ValueError as e:
+                    report['errors'].append({'row': number, 'error': str(e)})
+                    continue
+                taken.add((user_id, place_id))
+                reviews.append(review)
+                count, total = deltas.get(place_id, (0, 0))
+                deltas[place_id] = (count + 1, total + review['rating'])
+            
+            with unit_of_work():
+                self.review_repo.bulk_insert(reviews)
+                self.place_repo.apply_review_deltas(deltas)
+            report['created'] += len(reviews)
+        return report
+    
+    @response_cache.invalidates('amenities')
+    @repeated_queries_expected()
+    def bulk_create_amenities(self, rows, chunk_size=BULK_CHUNK_SIZE):
+        """Import amenities from an iterable of dicts"""
+        report = {'created': 0, 'errors': []}
+        validator = Amenity()
+        for chunk in _chunked(rows, chunk_size):
+            names = {row.get('name').strip() for _, row in chunk
+                     if isinstance(row, dict) and isinstance(row.get('name'), str)}
+            taken = self.amenity_repo.existing_names(names)
+            
+            now = datetime.utcnow()
+            amenities = []
+            for number, row in chunk:
+                try:
+                    name = validator._validate_name(_bulk_row(row).get('name'))
+                    if name in taken:
+                        raise ValueError("Amenity already exists")
+                except ValueError as e:
+                    report['errors'].append({'row': number, 'error': str(e)})
+                    continue
+                taken.add(name)
+                amenities.append({
+                    'id': str(uuid.uuid4()),
+                    'name': name,
+                    'created_at': now,
+                    'updated_at': now
+                })
+            
+            with unit_of_work():
+                self.amenity_repo.bulk_insert(amenities)
+            report['created'] += len(amenities)
+        return report
+
+    @response_cache.invalidates('places', 'reviews', 'amenities')
+    @repeated_queries_expected()
+    def load_generated(self, batches, progress=None):
+        """
+        Insert trusted (kind, rows) batches from app.synthetic.generate
+        Rows are not validated. With the SQLAlchemy repositories each
+        batch is one executemany and one commit; in-memory repositories
+        get model instances. Returns the rows written per kind, and calls
+        progress(counts) after every batch; a batch of an unknown kind
+        raises ValueError before anything of it is written
+        """
+        repos = {'users': (self.user_repo, User), 'amenities': (self.amenity_repo, Amenity),
+                 'places': (self.place_repo, Place), 'place_amenity': (self.place_repo, None),
+                 'reviews': (self.review_repo, Review)}
+        counts = dict.fromkeys(repos, 0)
+        for kind, rows in batches:
+            if kind not in repos:
+                raise ValueError(f"Unknown generated batch kind: {kind!r}")
+            repo, model = repos[kind]
+            if not isinstance(repo, InMemoryRepository):
+                with unit_of_work():
+                    if kind == 'place_amenity':
+                        repo.bulk_link_amenities(rows)
+                    else:
+                        repo.bulk_insert(rows)
+            elif kind == 'place_amenity':
+                for place_id, amenity_id in rows:
+                    repo.get(place_id).amenities.append(self.amenity_repo.get(amenity_id))
+            else:
+                for row in rows:
+                    repo.add(model(**row))
+            counts[kind] += len(rows)
+            if progress:
+                progress(counts)
+        return counts
+
+    # Export
+    
+    def export_catalog(self, types=EXPORT_TYPES, cursor=None, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Stream (type, record) pairs for the requested types in export order
+        Records are plain column dicts: users without password hashes and
+        places with their amenity IDs. A cursor from a previous export
+        resumes right after the record it was taken from.
+        The cursor is checked here; rows are only read while iterating
+        """
+        start = None
+        if cursor:
+            start = decode_export_cursor(cursor)
+        return self._export_records(types, start, batch_size)
+    
+    def _export_records(self, types, start, batch_size):
+        repos = {
+            'users': (self.user_repo, ('password',)),
+            'amenities': (self.amenity_repo, ()),
+            'places': (self.place_repo, ()),
+            'reviews': (self.review_repo, ())
+        }
+        for kind in EXPORT_TYPES:
+            after = None
+            if start is not None:
+                if kind == start[0]:
+                    after = start[1]
+                elif EXPORT_TYPES.index(kind) < EXPORT_TYPES.index(start[0]):
+                    continue
+            if kind not in types:
+                continue
+            
+            repo, exclude = repos[kind]
+            # One amenity lookup per batch of places
+            with repeated_queries_expected():
+                for batch in repo.stream_rows(after=after, batch_size=batch_size,
+                                              exclude=exclude):
+                    if kind == 'places':
+                        amenity_ids = self.place_repo.amenity_ids_for(row['id'] for row in batch)
+                        for row in batch:
+                            row['amenities'] = amenity_ids[row['id']]
+                    for row in batch:
+                        yield kind, row
 
 facade = HBnBFacade()
@@ -0,0 +1,60 @@
+"""
+Argument checks shared by the sync and async facades
+
+Model fields are validated by the models' own _validate_* and
+apply_update methods; these cover the arguments of facade queries.
+"""
+
+PLACE_SORTS = ('newest', 'price_asc', 'price_desc', 'rating')
+
+
+def normalize_email(email):
+    """Emails are stored and looked up trimmed and lower-cased"""
+    return email.strip().lower()
+
+
+def check_credentials(credentials):
+    """Return (email, password) from a login payload; ValueError unless both are strings"""
+    if not isinstance(credentials, dict):
+        raise ValueError("email and password are required")
+    email, password = credentials.get('email'), credentials.get('password')
+    if not isinstance(email, str) or not isinstance(password, str):
+        raise ValueError("email and password must be strings")
+    return email, password
+
+
+def check_place_search(min_price=None, max_price=None, bbox=None,
+                       min_rating=None, sort='newest', offset=0):
+    """Raise ValueError for inconsistent place search arguments"""
+    if sort not in PLACE_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(PLACE_SORTS)}")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError("min_price cannot be greater than max_price")
+    if bbox is not None:
+        min_lat, min_lon, max_lat, max_lon = bbox
+        if not (-90 <= min_lat <= max_lat <= 90):
+            raise ValueError("Invalid latitude range")
+        if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+            raise ValueError("Invalid longitude range")
+    if min_rating is not None and not (1 <= min_rating <= 5):
+        raise ValueError("min_rating must be between 1 and 5")
+    if offset < 0:
+        raise ValueError("offset cannot be negative")
+
+
+def check_nearby(latitude, longitude, radius_km):
+    """Raise ValueError for an invalid nearby search centre or radius"""
+    if not -90 <= latitude <= 90:
+        raise ValueError("Latitude must be between -90 and 90")
+    if not -180 <= longitude <= 180:
+        raise ValueError("Longitude must be between -180 and 180")
+    if radius_km <= 0:
+        raise ValueError("radius_km must be positive")
+
+
+def check_found(label, ids, existing):
+    """Raise ValueError naming every ID in ids that is not in existing"""
+    missing = sorted({str(obj_id) for obj_id in ids
+                      if not isinstance(obj_id, str) or obj_id not in existing})
+    if missing:
+        raise ValueError(f"{label} not found: {', '.join(missing)}")
@@ -0,0 +1,207 @@
+"""
+Deterministic synthetic data for load and scale testing
+
+generate() turns a seed and row counts into batches of plain column
+dicts, the rows the repositories' bulk inserts take, so a dataset of
+millions of rows is written without the per-row validation, ORM events
+and bcrypt work of the facade's create_* methods:
+
+    users          user<i>@seed<seed>.test, user 0 an admin; every user
+                   shares one password hash, computed once by the caller
+    amenities      common amenity names, numbered past the list; the
+                   names are the same for every seed, and unique
+    places         around a few city-like clusters (Zipf-weighted
+                   sizes, normally distributed around each centre),
+                   with 0-5 amenities each, popular amenities first
+    reviews        spread over places by a Zipf law on a random
+                   ranking of the places, each from a different user,
+                   rated around a per-place quality; the places' rating
+                   aggregates are filled in with them
+
+The same seed and counts give the same rows, IDs and timestamps
+included; only the password hash has a random salt. Rows are generated
+as they are consumed: memory holds the user and amenity IDs, one
+review count per place and the current batch. The Zipf law is capped
+at one review per user for each place, so the reviews written can fall
+short of the requested number on a heavily skewed dataset.
+"""
+from bisect import bisect
+from datetime import datetime, timedelta
+from itertools import accumulate
+import math
+import random
+import uuid
+from app.geo import KM_PER_DEGREE_LAT, cell_for
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_CLUSTERS = 20
+DEFAULT_SPREAD_KM = 10.0
+DEFAULT_ZIPF_EXPONENT = 1.0
+MAX_AMENITIES_PER_PLACE = 5
+EPOCH = datetime(2024, 1, 1)
+
+AMENITY_NAMES = (
+    'WiFi', 'Kitchen', 'Air conditioning', 'Heating', 'Washer', 'Free parking',
+    'TV', 'Workspace', 'Pool', 'Hot tub', 'Gym', 'Breakfast', 'Balcony',
+    'Garden', 'BBQ grill', 'Fireplace', 'Elevator', 'Pets allowed',
+    'EV charger', 'Sea view'
+)
+FIRST_NAMES = ('Amal', 'Ben', 'Chen', 'Dana', 'Elif', 'Farid', 'Grace', 'Hiro',
+               'Ines', 'Jamal', 'Kofi', 'Lena', 'Mateo', 'Noor', 'Olga', 'Priya')
+LAST_NAMES = ('Alvarez', 'Brown', 'Haddad', 'Ivanova', 'Kim', 'Mensah', 'Novak',
+              'Okafor', 'Rossi', 'Sato', 'Schmidt', 'Silva', 'Tan', 'Yilmaz')
+REVIEW_TEXTS = {
+    1: 'Would not stay here again.',
+    2: 'Below what the listing promised.',
+    3: 'Fine for a night or two.',
+    4: 'Comfortable and well located.',
+    5: 'Wonderful stay, highly recommended.'
+}
+
+
+def email_for(index, seed):
+    """Email of the index-th generated user for a seed"""
+    return f'user{index}@seed{seed}.test'
+
+
+def amenity_name(index):
+    """Name of the index-th generated amenity"""
+    name = AMENITY_NAMES[index % len(AMENITY_NAMES)]
+    repeat = index // len(AMENITY_NAMES)
+    return f'{name} {repeat + 1}' if repeat else name
+
+
+def zipf_weights(size, exponent):
+    """Cumulative weights of ranks 1..size under a Zipf law"""
+    return list(accumulate(1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+def zipf_counts(rng, total, size, exponent, cap):
+    """
+    Split about total items over size ranks by a Zipf law, at most cap
+    each; counts are rounded up or down at random to keep the sum close
+    """
+    if not size:
+        return []
+    norm = sum(1 / rank ** exponent for rank in range(1, size + 1))
+    counts = []
+    for rank in range(1, size + 1):
+        expected = total / rank ** exponent / norm
+        whole = int(expected)
+        counts.append(min(cap, whole + (rng.random() < expected - whole)))
+    return counts
+
+
+def _check_counts(users, places, reviews, amenities):
+    for name, value in (('users', users), ('places', places),
+                        ('reviews', reviews), ('amenities', amenities)):
+        if not isinstance(value, int) or value < 0:
+            raise ValueError(f"{name} must be a non-negative integer")
+    if places and not users:
+        raise ValueError("places need at least one user to own them")
+    if reviews and not places:
+        raise ValueError("reviews need at least one place")
+
+
+def _point_near(rng, latitude, longitude, spread_km):
+    latitude = min(90.0, max(-90.0, latitude + rng.gauss(0, spread_km) / KM_PER_DEGREE_LAT))
+    km_per_degree_lon = KM_PER_DEGREE_LAT * max(0.01, math.cos(math.radians(latitude)))
+    longitude = (longitude + rng.gauss(0, spread_km) / km_per_degree_lon + 180) % 360 - 180
+    return round(latitude, 6), round(longitude, 6)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def generate(seed, users, places, reviews, amenities, password_hash,
+             clusters=DEFAULT_CLUSTERS, spread_km=DEFAULT_SPREAD_KM,
+             zipf_exponent=DEFAULT_ZIPF_EXPONENT, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield (kind, rows) batches of at most chunk_size rows, in an order
+    that satisfies the foreign keys: 'users', 'amenities', then for each
+    run of places 'places', 'place_amenity' ((place_id, amenity_id)
+    pairs) and 'reviews'
+    """
+    _check_counts(users, places, reviews, amenities)
+    rng = random.Random(seed)
+
+    def new_id():
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    user_ids = [new_id() for _ in range(users)]
+    for indexes in _chunks(range(users), chunk_size):
+        yield 'users', [{
+            'id': user_ids[i],
+            'first_name': FIRST_NAMES[i % len(FIRST_NAMES)],
+            'last_name': LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)],
+            'email': email_for(i, seed),
+            'password': password_hash,
+            'is_admin': i == 0,
+            'created_at': EPOCH + timedelta(seconds=i),
+            'updated_at': EPOCH + timedelta(seconds=i)
+        } for i in indexes]
+
+    amenity_ids = [new_id() for _ in range(amenities)]
+    for indexes in _chunks(range(amenities), chunk_size):
+        yield 'amenities', [{
+            'id': amenity_ids[i],
+            'name': amenity_name(i),
+            'created_at': EPOCH,
+            'updated_at': EPOCH
+        } for i in indexes]
+    if not places:
+        return
+
+    centres = [(rng.uniform(-45, 60), rng.uniform(-180, 180)) for _ in range(max(1, clusters))]
+    centre_weights = zipf_weights(len(centres), zipf_exponent)
+    amenity_weights = zipf_weights(amenities, zipf_exponent)
+    review_counts = zipf_counts(rng, reviews, places, zipf_exponent, cap=users)
+    rng.shuffle(review_counts)
+
+    place_rows, links, review_rows = [], [], []
+    for i in range(places):
+        place_id = new_id()
+        created = EPOCH + timedelta(minutes=i)
+        centre = centres[bisect(centre_weights, rng.random() * centre_weights[-1])]
+        latitude, longitude = _point_near(rng, *centre, spread_km)
+        quality = rng.uniform(1.5, 5.0)
+        count = review_counts[i]
+        ratings = [min(5, max(1, round(rng.gauss(quality, 1)))) for _ in range(count)]
+        for rating, reviewer in zip(ratings, rng.sample(range(users), count)):
+            review_rows.append({
+                'id': new_id(),
+                'text': REVIEW_TEXTS[rating],
+                'rating': rating,
+                'user_id': user_ids[reviewer],
+                'place_id': place_id,
+                'created_at': created,
+                'updated_at': created
+            })
+        place_rows.append({
+            'id': place_id,
+            'title': f'Place {i}',
+            'description': 'A synthetic place for load testing.',
+            'price': round(rng.lognormvariate(4.5, 0.6), 2),
+            'latitude': latitude,
+            'longitude': longitude,
+            'geo_cell': cell_for(latitude, longitude),
+            'review_count': count,
+            'rating_sum': sum(ratings),
+            'owner_id': user_ids[rng.randrange(users)],
+            'created_at': created,
+            'updated_at': created
+        })
+        linked = set()
+        for _ in range(rng.randint(0, min(MAX_AMENITIES_PER_PLACE, amenities))):
+            linked.add(amenity_ids[bisect(amenity_weights, rng.random() * amenity_weights[-1])])
+        links.extend((place_id, amenity_id) for amenity_id in sorted(linked))
+
+        if len(place_rows) == chunk_size or len(review_rows) >= chunk_size or i == places - 1:
+            yield 'places', place_rows
+            for pairs in _chunks(links, chunk_size):
+                yield 'place_amenity', pairs
+            for rows in _chunks(review_rows, chunk_size):
+                yield 'reviews', rows
+            place_rows, links, review_rows = [], [], []
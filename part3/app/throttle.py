@@ -0,0 +1,211 @@
+"""
+Login brute-force throttle
+
+Every login attempt takes a token from the client IP's bucket and, if
+that one lets it through, from the email's bucket; when either is empty
+the attempt is rejected before any bcrypt work is done. A successful
+login gives both tokens back, so only failed verifications use up the
+budget: users sharing an address (NAT, an office proxy) are not locked
+out by each other's correct logins, and a script whose IP bucket is
+empty cannot drain a victim's email bucket. The IP bucket is larger
+than the email one, since one address can front many users. Behind a
+reverse proxy, set PROXY_FIX_X_FOR so the client IP is read from
+X-Forwarded-For (see create_app).
+
+Bucket state lives in a pluggable storage: an in-process LRU by
+default, or a SQLite file that several worker processes on one host
+can share.
+"""
+from collections import OrderedDict
+import sqlite3
+import threading
+import time
+
+
+class LRUBucketStorage:
+    """Bucket state in a bounded in-process LRU"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, key, fn):
+        """Atomically replace a bucket's state with fn(old_state)"""
+        with self._lock:
+            state = fn(self._buckets.get(key))
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+            return state
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBucketStorage:
+    """
+    Bucket state in a SQLite file, a local stand-in for a shared store
+    such as Redis: every process pointing at the same file sees the same
+    buckets
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS login_buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+
+    def after_fork(self):
+        """Open new connections in a forked child instead of reusing the parent's"""
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def update(self, key, fn):
+        """Atomically replace a bucket's state with fn(old_state)"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM login_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            state = fn(row)
+            conn.execute(
+                'INSERT OR REPLACE INTO login_buckets (key, tokens, updated_at) '
+                'VALUES (?, ?, ?)', (key, state[0], state[1])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return state
+
+    def clear(self):
+        self._connect().execute('DELETE FROM login_buckets')
+
+
+class LoginThrottle:
+    """Token-bucket limiter for login attempts"""
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.capacity = 5
+        self.refill_per_second = 5 / 60
+        self.ip_capacity = 20
+        self.ip_refill_per_second = 20 / 60
+        self.storage = LRUBucketStorage()
+        self._stats_lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure from LOGIN_RATE_LIMIT_* settings"""
+        self.enabled = app.config.get('LOGIN_RATE_LIMIT_ENABLED', True)
+        self.capacity = app.config.get('LOGIN_RATE_LIMIT_CAPACITY', self.capacity)
+        self.refill_per_second = app.config.get(
+            'LOGIN_RATE_LIMIT_REFILL_PER_SECOND', self.refill_per_second)
+        self.ip_capacity = app.config.get('LOGIN_RATE_LIMIT_IP_CAPACITY', self.ip_capacity)
+        self.ip_refill_per_second = app.config.get(
+            'LOGIN_RATE_LIMIT_IP_REFILL_PER_SECOND', self.ip_refill_per_second)
+
+        storage = app.config.get('LOGIN_RATE_LIMIT_STORAGE', 'memory')
+        if storage == 'memory':
+            self.storage = LRUBucketStorage(
+                app.config.get('LOGIN_RATE_LIMIT_MAX_KEYS', 10000))
+        elif storage.startswith('sqlite:///'):
+            self.storage = SQLiteBucketStorage(storage[len('sqlite:///'):])
+        else:
+            raise ValueError(f"Unsupported LOGIN_RATE_LIMIT_STORAGE: {storage}")
+        self.allowed = 0
+        self.rejected = 0
+
+    def after_fork(self):
+        """Per-process reset for a worker forked from a preloaded parent"""
+        after_fork = getattr(self.storage, 'after_fork', None)
+        if after_fork is not None:
+            after_fork()
+
+    def _buckets(self, email, client_ip):
+        """(key, capacity, refill per second) of the IP and email buckets"""
+        email = email.strip().lower() if isinstance(email, str) else ''
+        return [(f'ip:{client_ip}', self.ip_capacity, self.ip_refill_per_second),
+                (f'email:{email}', self.capacity, self.refill_per_second)]
+
+    def _take(self, key, capacity, refill_per_second, now):
+        """Take one token from a bucket; return seconds to wait, 0 if taken"""
+        wait = [0.0]
+
+        def refill(state):
+            tokens, updated_at = state if state else (capacity, now)
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            if tokens >= 1:
+                return tokens - 1, now
+            wait[0] = (1 - tokens) / refill_per_second
+            return tokens, now
+
+        self.storage.update(key, refill)
+        return wait[0]
+
+    def check(self, email, client_ip):
+        """
+        Record a login attempt
+        Returns 0 when it may proceed, else the seconds until it may retry
+        """
+        if not self.enabled:
+            return 0
+
+        now = time.time()
+        retry_after = 0
+        # The email bucket is only charged for attempts the IP bucket lets through
+        for key, capacity, refill_per_second in self._buckets(email, client_ip):
+            retry_after = self._take(key, capacity, refill_per_second, now)
+            if retry_after:
+                break
+
+        with self._stats_lock:
+            if retry_after:
+                self.rejected += 1
+            else:
+                self.allowed += 1
+        return retry_after
+
+    def succeeded(self, email, client_ip):
+        """Give back the tokens of an attempt whose password was correct"""
+        if not self.enabled:
+            return
+        for key, capacity, _ in self._buckets(email, client_ip):
+            self.storage.update(key, lambda state, capacity=capacity: (
+                (min(capacity, state[0] + 1), state[1]) if state else (capacity, time.time())))
+
+    def stats(self):
+        """
+        Attempt counters; every rejected attempt counts as a bcrypt check
+        saved, so bcrypt_checks_saved is an upper bound (rejected attempts
+        on unknown emails would not have reached bcrypt either)
+        """
+        with self._stats_lock:
+            return {
+                'allowed': self.allowed,
+                'rejected': self.rejected,
+                'bcrypt_checks_saved': self.rejected
+            }
+
+    def reset(self):
+        """Forget all buckets and counters"""
+        self.storage.clear()
+        with self._stats_lock:
+            self.allowed = 0
+            self.rejected = 0
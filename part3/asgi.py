@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+Run the API as an ASGI application
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+"""
+from app.asgi import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,130 @@
+"""
+Requests/s and latency of the WSGI and ASGI servers under concurrent clients
+
+Run from part3/: python -m benchmarks.asgi_vs_wsgi [--clients 100] [--duration 10]
+
+Seeds a temporary SQLite database, then serves it with gunicorn
+(gthread workers, the Flask app) and with uvicorn (asgi.py), and drives
+each with --clients keep-alive connections for --duration seconds per
+scenario. The response cache is turned off so both servers do the
+database work on every request. Needs gunicorn and uvicorn installed;
+the load generator runs on the same host, so on few cores it competes
+with the server for CPU.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from benchmarks.load import HOST, Request, drive, free_port, percentile, start
+
+SCENARIOS = ('reads', 'login')
+
+
+def seed(database, places, reviewers):
+    """Fill a fresh database through the sync facade; returns (place_ids, emails)"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    from app import create_app
+    from app.services.facade import facade
+    from config import DevelopmentConfig
+
+    rng = random.Random(19)
+    app = create_app(DevelopmentConfig)
+    with app.app_context():
+        owner = facade.create_user({'first_name': 'Bench', 'last_name': 'Owner',
+                                    'email': 'owner@bench.test', 'password': 'bench-password'})
+        facade.bulk_create_places(({
+            'title': f'Place {i}',
+            'description': 'A quiet room close to the old town.',
+            'price': rng.uniform(20, 400),
+            'latitude': rng.uniform(24.5, 24.9),
+            'longitude': rng.uniform(46.5, 46.9)
+        } for i in range(places)), default_owner_id=owner.id)
+        emails = []
+        users = []
+        for i in range(reviewers):
+            email = f'guest{i}@bench.test'
+            users.append(facade.create_user({'first_name': 'Guest', 'last_name': str(i),
+                                             'email': email, 'password': 'bench-password'}))
+            emails.append(email)
+        place_ids = [place.id for place in facade.get_all_places()]
+        facade.bulk_create_reviews({
+            'text': 'Would stay again', 'rating': rng.randint(1, 5),
+            'place_id': place_id, 'user_id': user.id
+        } for place_id in place_ids[:places // 2] for user in users)
+    return place_ids, emails
+
+
+def start_server(kind, port, workers, threads, env):
+    if kind == 'wsgi':
+        command = [sys.executable, '-m', 'gunicorn', '--bind', f'{HOST}:{port}',
+                   '--workers', str(workers), '--worker-class', 'gthread',
+                   '--threads', str(threads), '--log-level', 'warning', 'wsgi:app']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', '--host', HOST, '--port', str(port),
+                   '--workers', str(workers), '--log-level', 'warning',
+                   '--no-access-log', 'asgi:app']
+    return start(command, port, kind, env)
+
+
+def scenario_requests(scenario, place_ids, emails):
+    if scenario == 'login':
+        return [Request('POST', '/api/v1/auth/login',
+                        {'email': email, 'password': 'bench-password'}) for email in emails]
+    requests = []
+    for place_id in place_ids[:200]:
+        requests.append(Request('GET', f'/api/v1/places/{place_id}?expand=amenities'))
+        requests.append(Request('GET', f'/api/v1/places/{place_id}/reviews'))
+    requests += [Request('GET', '/api/v1/places/?limit=20')] * 50
+    requests += [Request('GET', f'/api/v1/places/search?min_price={p}&max_price={p + 50}')
+                 for p in range(20, 400, 10)]
+    requests += [Request('GET', '/api/v1/places/nearby?lat=24.7&lon=46.7&radius_km=3&limit=20')] * 50
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--places', type=int, default=2000)
+    parser.add_argument('--reviewers', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--threads', type=int, default=32,
+                        help='threads per gunicorn worker')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    database = os.path.join(workdir, 'bench.db')
+    env = dict(os.environ, APP_CONFIG='development', DATABASE_URL=f'sqlite:///{database}',
+               RESPONSE_CACHE_ENABLED='0', LOGIN_RATE_LIMIT_ENABLED='0',
+               BCRYPT_LOG_ROUNDS=os.environ.get('BCRYPT_LOG_ROUNDS', '10'))
+    os.environ.update(env)
+    place_ids, emails = seed(database, args.places, args.reviewers)
+
+    print(f"{args.clients} clients, {args.workers} worker(s), {args.duration:g}s per run, "
+          f"{args.places} places")
+    print(f"{'scenario':<8} {'server':<22} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for scenario in args.scenarios.split(','):
+        requests = scenario_requests(scenario, place_ids, emails)
+        for kind in ('wsgi', 'asgi'):
+            port = free_port()
+            server = start_server(kind, port, args.workers, args.threads, env)
+            try:
+                asyncio.run(drive(port, requests, args.clients, args.warmup))
+                latencies, failures, elapsed = asyncio.run(
+                    drive(port, requests, args.clients, args.duration))
+            finally:
+                server.terminate()
+                server.wait()
+            latencies.sort()
+            label = (f'gunicorn gthread x{args.threads}' if kind == 'wsgi' else 'uvicorn')
+            print(f"{scenario:<8} {label:<22} {len(latencies) / elapsed:>8.0f} "
+                  f"{percentile(latencies, 0.5) * 1000:>8.1f} "
+                  f"{percentile(latencies, 0.99) * 1000:>8.1f} {len(failures):>7}")
+
+
+if __name__ == '__main__':
+    main()
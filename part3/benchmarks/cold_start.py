@@ -0,0 +1,109 @@
+"""
+Cold start of gunicorn workers with and without a preloaded app
+
+Run from part3/: python -m benchmarks.cold_start [--workers 4] [--runs 5]
+
+Starts gunicorn with gunicorn.conf.py against a temporary SQLite
+database, once with GUNICORN_PRELOAD=1 (create_app() in the master,
+workers forked from it) and once with GUNICORN_PRELOAD=0 (every worker
+imports the app and runs create_app() itself), and reports per run:
+
+    ready      seconds from launch until every worker has booted
+    first      seconds from launch until the first 200 response
+    worker     median milliseconds from fork to a worker being ready,
+               as logged by post_worker_init
+
+The worker figure is also what a replacement worker costs when one is
+recycled (max_requests) or crashes.
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+HOST = '127.0.0.1'
+READY = re.compile(r'Worker \d+ ready in ([\d.]+) ms')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_200(url, deadline):
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.005)
+    raise RuntimeError(f"{url} did not answer")
+
+
+def boot(env, workers, timeout=60):
+    """Start gunicorn; returns (seconds to all workers ready, seconds to first 200, worker ms)"""
+    port = free_port()
+    env = dict(env, PORT=str(port), WEB_CONCURRENCY=str(workers))
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'{HOST}:{port}']
+    worker_ms = []
+    all_ready = threading.Event()
+
+    started = time.monotonic()
+    server = subprocess.Popen(command, env=env, stderr=subprocess.PIPE, text=True)
+
+    def read_log():
+        for line in server.stderr:
+            match = READY.search(line)
+            if match:
+                worker_ms.append(float(match.group(1)))
+                if len(worker_ms) == workers:
+                    all_ready.set()
+
+    reader = threading.Thread(target=read_log, daemon=True)
+    reader.start()
+    try:
+        wait_for_200(f'http://{HOST}:{port}/api/v1/amenities/', started + timeout)
+        first = time.monotonic() - started
+        if not all_ready.wait(timeout):
+            raise RuntimeError("workers did not boot")
+        ready = time.monotonic() - started
+    finally:
+        server.terminate()
+        server.wait()
+    return ready, first, statistics.median(worker_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hbnb-bench-')
+    env = dict(os.environ, APP_CONFIG='production', SECRET_KEY='cold-start-benchmark',
+               DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+               DATABASE_AUTO_MIGRATE='1', ADMIN_EMAIL='admin@bench.test',
+               ADMIN_PASSWORD='bench-password', BCRYPT_LOG_ROUNDS='4')
+    # Creates the schema and the admin, so every measured run starts alike
+    boot(env, 1)
+
+    print(f"{args.workers} workers, median of {args.runs} runs")
+    print(f"{'mode':<10} {'ready s':>8} {'first s':>8} {'worker ms':>10}")
+    for preload in ('1', '0'):
+        runs = [boot(dict(env, GUNICORN_PRELOAD=preload), args.workers) for _ in range(args.runs)]
+        ready, first, worker = (statistics.median(column) for column in zip(*runs))
+        label = 'preload' if preload == '1' else 'per-worker'
+        print(f"{label:<10} {ready:>8.2f} {first:>8.2f} {worker:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
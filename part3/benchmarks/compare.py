@@ -0,0 +1,65 @@
+"""
+Compare two benchmark suite results files
+
+Run from part3/: python -m benchmarks.compare BASELINE CURRENT [--threshold 0.15]
+
+An operation regresses when its req/s falls, or its p95 latency rises,
+by more than the threshold (a fraction: 0.15 is 15%) relative to the
+baseline. Operations missing from either file are skipped. Exits with
+status 1 if any operation regressed, so it can gate a CI job; results
+are only comparable for the same dataset and options on the same host.
+"""
+import argparse
+import json
+import sys
+
+DEFAULT_THRESHOLD = 0.15
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    (mode, operation, rps change, p95 change, regressed) for each
+    operation measured in both; changes are fractions of the baseline
+    """
+    for key in ('dataset', 'options'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"warning: {key} differs from the baseline; results may not be comparable")
+    rows = []
+    for mode, operations in current['results'].items():
+        for name, new in operations.items():
+            old = baseline['results'].get(mode, {}).get(name)
+            if not old or not old['requests'] or not new['requests']:
+                continue
+            rps = new['rps'] / old['rps'] - 1
+            p95 = new['p95_ms'] / old['p95_ms'] - 1
+            rows.append((mode, name, rps, p95, rps < -threshold or p95 > threshold))
+    return rows
+
+
+def report(rows, threshold=DEFAULT_THRESHOLD):
+    """Print the comparison; returns the number of regressions"""
+    print(f"\n{'mode':<8} {'operation':<24} {'req/s':>8} {'p95':>8}")
+    for mode, name, rps, p95, regressed in rows:
+        print(f"{mode:<8} {name:<24} {rps:>+8.1%} {p95:>+8.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"{regressions} regression(s) past {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if report(compare(baseline, current, args.threshold), args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Reproducible benchmark datasets
+
+Run from part3/: python -m benchmarks.dataset [--preset small] [--rebuild]
+
+Builds a SQLite database with app.synthetic (what `flask seed-data`
+runs): the same seed and sizes give the same rows, IDs included, on
+every machine, so results from different commits measure the same data.
+Every user's password is PASSWORD; places are clustered around cities
+and reviews follow a Zipf law over places, as described there.
+
+The large preset (2.6M rows) takes minutes rather than hours. A built
+database is kept under benchmarks/data/ next to a .json of its
+parameters and reused while they match.
+"""
+import argparse
+import json
+import os
+import time
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+PRESETS = {
+    'tiny': {'users': 200, 'places': 1000, 'reviews': 4000, 'amenities': 50},
+    'small': {'users': 10000, 'places': 50000, 'reviews': 200000, 'amenities': 50},
+    'large': {'users': 100000, 'places': 500000, 'reviews': 2000000, 'amenities': 50}
+}
+
+SEED = 24
+PASSWORD = 'bench-password'
+SECRET_KEY = 'benchmark-secret-key-not-for-production'
+BCRYPT_LOG_ROUNDS = 10
+CHUNK_SIZE = 10000
+
+
+def bench_config(database, **settings):
+    """Config class serving the dataset at database with the given overrides"""
+    from config import Config, engine_options
+
+    uri = f'sqlite:///{database}'
+    return type('BenchConfig', (Config,), {
+        'SECRET_KEY': SECRET_KEY,
+        'JWT_SECRET_KEY': SECRET_KEY,
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLALCHEMY_ENGINE_OPTIONS': engine_options(uri),
+        'DATABASE_AUTO_MIGRATE': True,
+        'BCRYPT_LOG_ROUNDS': BCRYPT_LOG_ROUNDS,
+        'RESPONSE_CACHE_ENABLED': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False,
+        **settings
+    })
+
+
+def dataset_path(users, places, reviews, amenities, seed=SEED):
+    return os.path.join(DATA_DIR, f'{users}u-{places}p-{reviews}r-{amenities}a-s{seed}.db')
+
+
+def build(database, users, places, reviews, amenities, seed=SEED, progress=print):
+    """Create database (replacing any file there) and fill it"""
+    from app import create_app, db, password_hasher
+    from app.services.facade import facade
+    from app.synthetic import generate
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(database + suffix):
+            os.remove(database + suffix)
+    os.makedirs(os.path.dirname(database), exist_ok=True)
+
+    app = create_app(bench_config(database, ENTITY_CACHE_ENABLED=False,
+                                  SQL_METRICS_ENABLED=False, N_PLUS_ONE_ACTION='off'))
+    started = time.perf_counter()
+    with app.app_context():
+        batches = generate(seed, users, places, reviews, amenities,
+                           password_hasher.hash(PASSWORD), chunk_size=CHUNK_SIZE)
+        counts = facade.load_generated(batches, progress=lambda counts: progress(
+            f"\r{sum(counts.values()):,} rows, {time.perf_counter() - started:.0f}s", end=''))
+        db.session.remove()
+        db.engine.dispose()
+    progress()
+    return counts
+
+
+def ensure(users, places, reviews, amenities, seed=SEED, rebuild=False, progress=print):
+    """Path to a built dataset with these parameters, building it if needed"""
+    from app import synthetic
+
+    params = {'users': users, 'places': places, 'reviews': reviews,
+              'amenities': amenities, 'seed': seed, 'bcrypt_log_rounds': BCRYPT_LOG_ROUNDS,
+              'clusters': synthetic.DEFAULT_CLUSTERS, 'spread_km': synthetic.DEFAULT_SPREAD_KM,
+              'zipf_exponent': synthetic.DEFAULT_ZIPF_EXPONENT}
+    database = dataset_path(users, places, reviews, amenities, seed)
+    meta = database + '.json'
+    if not rebuild and os.path.exists(database) and os.path.exists(meta):
+        with open(meta) as f:
+            if json.load(f).get('params') == params:
+                return database
+    if os.path.exists(meta):
+        os.remove(meta)
+    progress(f"Building {os.path.relpath(database)}")
+    written = build(database, users, places, reviews, amenities, seed, progress)
+    with open(meta, 'w') as f:
+        json.dump({'params': params, 'written': written}, f)
+    return database
+
+
+def add_arguments(parser):
+    """Dataset size options, shared with the benchmark suite"""
+    parser.add_argument('--preset', choices=PRESETS, default='small')
+    for name in ('users', 'places', 'reviews', 'amenities'):
+        parser.add_argument(f'--{name}', type=int, help=f'override the preset number of {name}')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--rebuild', action='store_true', help='build even if a matching file exists')
+
+
+def sizes(args):
+    """(users, places, reviews, amenities) from add_arguments' options"""
+    preset = PRESETS[args.preset]
+    return tuple(getattr(args, name) if getattr(args, name) is not None else preset[name]
+                 for name in ('users', 'places', 'reviews', 'amenities'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    args = parser.parse_args()
+    print(ensure(*sizes(args), seed=args.seed, rebuild=args.rebuild))
+
+
+if __name__ == '__main__':
+    main()
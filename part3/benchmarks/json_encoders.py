@@ -0,0 +1,73 @@
+"""
+Compare JSON encoders on a 10k-place listing payload
+
+Run from part3/: python -m benchmarks.json_encoders [--places N] [--repeat R]
+"""
+import argparse
+from datetime import datetime, timedelta
+import json
+import time
+import uuid
+from app.api.v1.representations import ENCODERS, JSONArrayStream
+
+
+def place_payload(count):
+    """Dicts shaped like the default place_serializer output"""
+    start = datetime(2024, 1, 1)
+    places = []
+    for i in range(count):
+        created = start + timedelta(minutes=i)
+        places.append({
+            'id': str(uuid.uuid4()),
+            'created_at': created,
+            'updated_at': created,
+            'title': f'Place {i}',
+            'description': 'A quiet room close to the old town. ' * 3,
+            'price': 40.0 + i % 200,
+            'latitude': 24.0 + (i % 1000) / 1000,
+            'longitude': 46.0 + (i % 997) / 997,
+            'owner_id': str(uuid.uuid4()),
+            'review_count': i % 37,
+            'avg_rating': (i % 5) + 1 if i % 37 else None
+        })
+    return places
+
+
+def stringified(places):
+    """The same payload with datetimes pre-rendered, as BaseModel.to_dict does"""
+    return [dict(p, created_at=p['created_at'].isoformat(),
+                 updated_at=p['updated_at'].isoformat()) for p in places]
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    places = place_payload(args.places)
+    cases = {
+        'json.dumps + isoformat() per row': lambda: len(json.dumps(stringified(places))),
+    }
+    for name, dumps in sorted(ENCODERS.items()):
+        cases[f'{name} (native datetimes)'] = lambda dumps=dumps: len(dumps(places))
+        cases[f'{name} streamed array'] = lambda dumps=dumps: sum(
+            len(chunk) for chunk in JSONArrayStream(places).chunks(dumps))
+
+    print(f"{args.places} places, best of {args.repeat}")
+    for label, fn in cases.items():
+        seconds, size = best_of(args.repeat, fn)
+        print(f"  {label:<36} {seconds * 1000:8.1f} ms  {size / 1024:8.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
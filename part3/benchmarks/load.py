@@ -0,0 +1,128 @@
+"""
+HTTP load generation shared by the server benchmarks
+
+Keep-alive raw HTTP/1.1 clients on asyncio: no client library sits
+between the timer and the socket, and chunked (streamed) bodies are
+read to the end so a request is timed until its last byte.
+"""
+import asyncio
+from collections import namedtuple
+import json
+import random
+import socket
+import subprocess
+import time
+
+HOST = '127.0.0.1'
+
+Request = namedtuple('Request', 'method path body headers', defaults=(None, None))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def start(command, port, label, env, timeout=30):
+    """Launch a server process and return it once its port accepts connections"""
+    server = subprocess.Popen(command, env=env)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            socket.create_connection((HOST, port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"{label} server did not start")
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, keep_alive)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip().lower()
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection') != 'close'
+
+
+def encode(request):
+    payload = json.dumps(request.body).encode() if request.body is not None else b''
+    extra = ''.join(f'{name}: {value}\r\n' for name, value in (request.headers or {}).items())
+    head = (f'{request.method} {request.path} HTTP/1.1\r\nHost: {HOST}\r\n{extra}'
+            f'Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n')
+    return head.encode() + payload
+
+
+async def client(port, requests, deadline, latencies, failures):
+    """One keep-alive connection issuing random requests until the deadline"""
+    reader = writer = None
+    encoded = [encode(request) for request in requests]
+    while time.perf_counter() < deadline:
+        if writer is None:
+            reader, writer = await asyncio.open_connection(HOST, port)
+        start = time.perf_counter()
+        try:
+            writer.write(random.choice(encoded))
+            status, keep_alive = await read_response(reader)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            failures.append(None)
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        if status >= 400:
+            failures.append(status)
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def drive(port, requests, clients, duration):
+    """Run clients connections for duration seconds; returns (latencies, failures, elapsed)"""
+    latencies, failures = [], []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*[client(port, requests, deadline, latencies, failures)
+                           for _ in range(clients)])
+    elapsed = time.perf_counter() - started
+    return latencies, failures, elapsed
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarize(latencies, failures, elapsed):
+    """Throughput and latency percentiles (milliseconds) of one run"""
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': len(failures),
+        'rps': round(count / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / count * 1000, 3) if count else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if count else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3) if count else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if count else None,
+        'max_ms': round(latencies[-1] * 1000, 3) if count else None
+    }
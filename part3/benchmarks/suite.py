@@ -0,0 +1,348 @@
+"""
+Throughput and latency of every /api/v1 endpoint and of the facade
+
+Run from part3/: python -m benchmarks.suite [--preset small] [--modes client,server,facade]
+                 [--duration 3] [--baseline results/old.json]
+
+Measures, on a dataset from benchmarks.dataset, each operation in turn
+for --duration seconds (after --warmup seconds) in up to three modes:
+
+    client   the Flask test client, one request at a time in this
+             process: the app's own cost, with no HTTP server or socket
+    server   gunicorn (gunicorn.conf.py, wsgi:app, production config)
+             driven over keep-alive connections by --clients clients
+    facade   HBnBFacade methods called directly, with the session
+             removed after each call as at the end of a request
+
+Each operation picks among a couple of hundred requests built from
+sampled rows (places, reviews, users), so repeated calls do not all
+hit the same row. The writes (place and review updates) send the rows'
+current values, which leaves the dataset as it was apart from
+updated_at. The response cache is off unless --response-cache is
+given, so reads measure the database path.
+
+Results are written as JSON (benchmarks/results/<commit>-<preset>.json
+unless --output says otherwise): requests, errors, rps and mean, p50,
+p95, p99 and max latency in milliseconds per mode and operation, plus
+the commit, dataset and options. --baseline compares them with an
+earlier file (see benchmarks.compare) and exits with status 1 if an
+operation regressed past --threshold.
+"""
+import argparse
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from functools import partial
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from benchmarks import dataset
+from benchmarks.compare import DEFAULT_THRESHOLD, compare, report
+from benchmarks.load import Request, drive, free_port, start, summarize
+
+MODES = ('client', 'server', 'facade')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+SAMPLE_SIZE = 200
+NEARBY_KM = 2
+BBOX_DEGREES = 0.05
+
+
+def load_sample(size=SAMPLE_SIZE):
+    """Rows the requests are built from, the same for a given dataset"""
+    from sqlalchemy import text
+    from app import db
+
+    def rows(sql):
+        return db.session.execute(text(sql), {'size': size}).mappings().all()
+
+    return {
+        'users': rows('SELECT id, email, is_admin FROM users ORDER BY id LIMIT :size'),
+        'places': rows('SELECT id, owner_id, price, latitude, longitude '
+                       'FROM places ORDER BY id LIMIT :size'),
+        'reviews': rows('SELECT id, user_id, text, rating FROM reviews ORDER BY id LIMIT :size'),
+        'amenities': rows('SELECT id, name FROM amenities ORDER BY id LIMIT :size'),
+        'admin': rows('SELECT id FROM users WHERE is_admin ORDER BY id LIMIT 1')[0]['id']
+    }
+
+
+def bearer_tokens(sample):
+    """Authorization headers by user ID for every user a request acts as"""
+    from flask_jwt_extended import create_access_token
+
+    admins = {user['id'] for user in sample['users'] if user['is_admin']} | {sample['admin']}
+    user_ids = ({sample['admin']} | {user['id'] for user in sample['users']}
+                | {place['owner_id'] for place in sample['places']}
+                | {review['user_id'] for review in sample['reviews']})
+    return {user_id: {'Authorization': 'Bearer ' + create_access_token(
+        identity=user_id, additional_claims={'is_admin': user_id in admins})}
+        for user_id in user_ids}
+
+
+def _bbox(place):
+    return (place['latitude'] - BBOX_DEGREES, place['longitude'] - BBOX_DEGREES,
+            place['latitude'] + BBOX_DEGREES, place['longitude'] + BBOX_DEGREES)
+
+
+def endpoint_requests(sample, tokens):
+    """Operation name -> the requests it picks from, for the HTTP modes"""
+    users, places, reviews = sample['users'], sample['places'], sample['reviews']
+    amenities = sample['amenities']
+    admin = tokens[sample['admin']]
+    prices = range(20, 500, 10)
+    return {
+        'users.list': [Request('GET', '/api/v1/users/')],
+        'users.get': [Request('GET', f"/api/v1/users/{u['id']}") for u in users],
+        'auth.login': [Request('POST', '/api/v1/auth/login',
+                               {'email': u['email'], 'password': dataset.PASSWORD})
+                       for u in users],
+        'protected.get': [Request('GET', '/api/v1/protected/', headers=tokens[u['id']])
+                          for u in users],
+        'places.page': [Request('GET', '/api/v1/places/?limit=20')],
+        'places.page_expanded': [
+            Request('GET', '/api/v1/places/?limit=20&expand=amenities,reviews')],
+        'places.get': [Request('GET', f"/api/v1/places/{p['id']}") for p in places],
+        'places.get_expanded': [
+            Request('GET', f"/api/v1/places/{p['id']}?expand=amenities,reviews")
+            for p in places],
+        'places.search_price': [
+            Request('GET', f'/api/v1/places/search?min_price={low}&max_price={low + 50}')
+            for low in prices],
+        'places.search_bbox': [
+            Request('GET', '/api/v1/places/search?min_lat={}&min_lon={}&max_lat={}&max_lon={}'
+                           '&min_rating=3&sort=rating'.format(*_bbox(p)))
+            for p in places],
+        'places.nearby': [
+            Request('GET', f"/api/v1/places/nearby?lat={p['latitude']}&lon={p['longitude']}"
+                           f"&radius_km={NEARBY_KM}&limit=20")
+            for p in places],
+        'places.reviews': [Request('GET', f"/api/v1/places/{p['id']}/reviews") for p in places],
+        'places.update': [Request('PUT', f"/api/v1/places/{p['id']}", {'price': p['price']},
+                                  tokens[p['owner_id']]) for p in places],
+        'reviews.list': [Request('GET', '/api/v1/reviews/')],
+        'reviews.get': [Request('GET', f"/api/v1/reviews/{r['id']}") for r in reviews],
+        'reviews.update': [Request('PUT', f"/api/v1/reviews/{r['id']}",
+                                   {'text': r['text'], 'rating': r['rating']},
+                                   tokens[r['user_id']]) for r in reviews],
+        'amenities.list': [Request('GET', '/api/v1/amenities/')],
+        'amenities.get': [Request('GET', f"/api/v1/amenities/{a['id']}") for a in amenities],
+        'export.amenities': [Request('GET', '/api/v1/export/?types=amenities', headers=admin)]
+    }
+
+
+def _drain(iterable):
+    deque(iterable, maxlen=0)
+
+
+def facade_calls(sample):
+    """Operation name -> the HBnBFacade calls it picks from"""
+    from app.services.facade import facade
+
+    users, places, reviews = sample['users'], sample['places'], sample['reviews']
+    amenities = sample['amenities']
+    return {
+        'iter_all_users': [lambda: _drain(facade.iter_all_users())],
+        'get_user_by_id': [partial(facade.get_user_by_id, u['id']) for u in users],
+        'get_user_by_email': [partial(facade.get_user_by_email, u['email']) for u in users],
+        'authenticate_user': [partial(facade.authenticate_user, u['email'], dataset.PASSWORD)
+                              for u in users],
+        'get_place': [partial(facade.get_place, p['id']) for p in places],
+        'get_places_page': [partial(facade.get_places_page, 20)],
+        'search_places': [partial(facade.search_places, min_price=low, max_price=low + 50)
+                          for low in range(20, 500, 10)],
+        'search_places_bbox': [partial(facade.search_places, bbox=_bbox(p), min_rating=3,
+                                       sort='rating') for p in places],
+        'get_places_nearby': [partial(facade.get_places_nearby, p['latitude'], p['longitude'],
+                                      NEARBY_KM, limit=20) for p in places],
+        'get_reviews_by_place': [partial(facade.get_reviews_by_place, p['id']) for p in places],
+        'update_place': [partial(facade.update_place, p['id'], {'price': p['price']})
+                         for p in places],
+        'iter_all_reviews': [lambda: _drain(facade.iter_all_reviews())],
+        'get_review': [partial(facade.get_review, r['id']) for r in reviews],
+        'update_review': [partial(facade.update_review, r['id'],
+                                  {'text': r['text'], 'rating': r['rating']}) for r in reviews],
+        'get_all_amenities': [facade.get_all_amenities],
+        'get_amenity': [partial(facade.get_amenity, a['id']) for a in amenities],
+        'export_catalog': [lambda: _drain(facade.export_catalog(('amenities',)))]
+    }
+
+
+def measure(call, choices, duration, warmup):
+    """Call call(choice) for random choices, warmup then duration seconds; returns the summary"""
+    rng = random.Random(dataset.SEED)
+    deadline = time.perf_counter() + warmup
+    while time.perf_counter() < deadline:
+        call(rng.choice(choices))
+    latencies, failures = [], []
+    started = time.perf_counter()
+    deadline = started + duration
+    while not latencies or time.perf_counter() < deadline:
+        choice = rng.choice(choices)
+        begin = time.perf_counter()
+        status = call(choice)
+        latencies.append(time.perf_counter() - begin)
+        if status >= 400:
+            failures.append(status)
+    return summarize(latencies, failures, time.perf_counter() - started)
+
+
+def run_client(app, operations, args):
+    client = app.test_client()
+
+    def call(request):
+        response = client.open(request.path, method=request.method,
+                               json=request.body, headers=request.headers)
+        response.get_data()
+        response.close()
+        return response.status_code
+
+    return {name: measure(call, requests, args.duration, args.warmup)
+            for name, requests in operations.items()}
+
+
+def run_facade(operations, args):
+    from app import db
+
+    def call(fn):
+        try:
+            fn()
+        finally:
+            db.session.remove()
+        return 200
+
+    return {name: measure(call, calls, args.duration, args.warmup)
+            for name, calls in operations.items()}
+
+
+def run_server(database, operations, args):
+    port = free_port()
+    env = {name: value for name, value in os.environ.items()
+           if not name.startswith('ADMIN_')}
+    env.update(APP_CONFIG='production', SECRET_KEY=dataset.SECRET_KEY,
+               DATABASE_URL=f'sqlite:///{database}', DATABASE_AUTO_MIGRATE='0',
+               PORT=str(port), WEB_CONCURRENCY=str(args.workers),
+               GUNICORN_THREADS=str(args.threads),
+               BCRYPT_LOG_ROUNDS=str(dataset.BCRYPT_LOG_ROUNDS),
+               RESPONSE_CACHE_ENABLED='1' if args.response_cache else '0',
+               LOGIN_RATE_LIMIT_ENABLED='0')
+    server = start([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                    '--log-level', 'warning'], port, 'gunicorn', env)
+    results = {}
+    try:
+        for name, requests in operations.items():
+            asyncio.run(drive(port, requests, args.clients, args.warmup))
+            results[name] = summarize(*asyncio.run(
+                drive(port, requests, args.clients, args.duration)))
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def git_commit():
+    """(commit, dirty) of the working tree, or (None, None) outside git"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def print_table(mode, results):
+    print(f"\n{mode}")
+    print(f"{'operation':<24} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:<24} {result['rps']:>9.1f} {result['p50_ms']:>9.2f} "
+              f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    dataset.add_arguments(parser)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--only', help='regular expression the operation names must match')
+    parser.add_argument('--duration', type=float, default=3, help='seconds per operation')
+    parser.add_argument('--warmup', type=float, default=0.5, help='seconds per operation')
+    parser.add_argument('--clients', type=int, default=16, help='server mode connections')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--threads', type=int, default=8, help='threads per gunicorn worker')
+    parser.add_argument('--response-cache', action='store_true')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/)')
+    parser.add_argument('--baseline', help='earlier results file to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative change in req/s or p95 counted as a regression')
+    args = parser.parse_args()
+    modes = args.modes.split(',')
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"unknown mode {mode!r}; choose from {', '.join(MODES)}")
+
+    users, places, reviews, amenities = dataset.sizes(args)
+    database = dataset.ensure(users, places, reviews, amenities,
+                              seed=args.seed, rebuild=args.rebuild)
+
+    from app import create_app
+
+    app = create_app(dataset.bench_config(
+        database, RESPONSE_CACHE_ENABLED=args.response_cache))
+
+    def selected(operations):
+        if not args.only:
+            return operations
+        return {name: op for name, op in operations.items() if re.search(args.only, name)}
+
+    results = {}
+    with app.app_context():
+        sample = load_sample()
+        requests = selected(endpoint_requests(sample, bearer_tokens(sample)))
+        calls = selected(facade_calls(sample))
+        for mode in modes:
+            if mode == 'client':
+                results[mode] = run_client(app, requests, args)
+            elif mode == 'facade':
+                results[mode] = run_facade(calls, args)
+            else:
+                results[mode] = run_server(database, requests, args)
+            print_table(mode, results[mode])
+
+    commit, dirty = git_commit()
+    document = {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'dataset': {'preset': args.preset, 'users': users, 'places': places,
+                        'reviews': reviews, 'amenities': amenities, 'seed': args.seed},
+            'options': {'duration': args.duration, 'warmup': args.warmup,
+                        'clients': args.clients, 'workers': args.workers,
+                        'threads': args.threads, 'response_cache': args.response_cache}
+        },
+        'results': results
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{(commit or 'nogit')[:10]}{'-dirty' if dirty else ''}-{args.preset}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if report(compare(baseline, document, args.threshold), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
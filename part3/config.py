@@ -1,4 +1,87 @@
 import os
+from sqlalchemy.engine import make_url
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def engine_options(uri):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a database URI, from DB_* environment variables
+    In-memory SQLite gets none (Flask-SQLAlchemy gives it a StaticPool);
+    SQLite files get a connection pool; server databases also get
+    pre-ping, recycling and a per-statement timeout
+    """
+    if not uri:
+        return {}
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {}
+        return {
+            'pool_size': _env_int('DB_POOL_SIZE', 5),
+            'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30)
+        }
+
+    options = {
+        'pool_size': _env_int('DB_POOL_SIZE', 10),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+    }
+    timeout_ms = _env_int('DB_STATEMENT_TIMEOUT_MS', 30000)
+    if timeout_ms:
+        if url.get_backend_name() == 'postgresql':
+            options['connect_args'] = {'options': f'-c statement_timeout={timeout_ms}'}
+        elif url.get_backend_name() == 'mysql':
+            options['connect_args'] = {
+                'init_command': f'SET SESSION max_execution_time={timeout_ms}'}
+    return options
+
+
+# Statements each public read needs with every expansion requested
+# (a place page with ?expand=amenities,reviews is the page plus one
+# selectin load per relationship, plus the response cache's version
+# lookup on cached endpoints); none of them grows with the page size
+DEFAULT_QUERY_BUDGETS = {
+    'GET api_v1.places_place_list': 4,
+    'GET api_v1.places_place_search': 4,
+    'GET api_v1.places_place_nearby': 4,
+    'GET api_v1.places_place_resource': 4,
+    'GET api_v1.places_place_review_list': 3,
+    'GET api_v1.reviews_review_list': 2,
+    'GET api_v1.reviews_review_resource': 2,
+    'GET api_v1.users_user_list': 1,
+    'GET api_v1.users_user_resource': 1,
+    'GET api_v1.amenities_amenity_list': 2,
+    'GET api_v1.amenities_amenity_resource': 2
+}
+
+
+def query_budgets(spec):
+    """
+    SQL_QUERY_BUDGETS from 'endpoint=max,...', on top of
+    DEFAULT_QUERY_BUDGETS. Endpoints are named as in flask.request.endpoint
+    (api_v1.places_place_list), optionally prefixed with a method
+    ('GET api_v1.places_place_list') to cap only that method
+    """
+    budgets = dict(DEFAULT_QUERY_BUDGETS)
+    for item in (spec or '').split(','):
+        if item.strip():
+            endpoint, _, limit = item.partition('=')
+            budgets[endpoint.strip()] = int(limit)
+    return budgets
+
+
+def replica_binds(uri):
+    """SQLALCHEMY_BINDS with a 'replica' bind for read routing, if a URI is given"""
+    if not uri:
+        return {}
+    return {'replica': {'url': uri, **engine_options(uri)}}
+
 
 class Config:
     """Base configuration class"""
@@ -6,27 +89,105 @@ class Config:
     JWT_SECRET_KEY = SECRET_KEY
     DEBUG = False
     TESTING = False
+    # bcrypt cost factor; each +1 doubles the CPU time of a hash
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    # Max concurrent bcrypt computations (defaults to the CPU count)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0)) or None
+    # Login throttle: burst size and refill rate per email and per client IP
+    LOGIN_RATE_LIMIT_ENABLED = os.environ.get('LOGIN_RATE_LIMIT_ENABLED', '1') == '1'
+    LOGIN_RATE_LIMIT_CAPACITY = int(os.environ.get('LOGIN_RATE_LIMIT_CAPACITY', 5))
+    LOGIN_RATE_LIMIT_REFILL_PER_SECOND = float(os.environ.get('LOGIN_RATE_LIMIT_REFILL_PER_SECOND', 5 / 60))
+    # The per-IP bucket is larger: one address can front many users
+    LOGIN_RATE_LIMIT_IP_CAPACITY = int(os.environ.get('LOGIN_RATE_LIMIT_IP_CAPACITY', 20))
+    LOGIN_RATE_LIMIT_IP_REFILL_PER_SECOND = float(os.environ.get('LOGIN_RATE_LIMIT_IP_REFILL_PER_SECOND', 20 / 60))
+    # 'memory' or 'sqlite:///<path>' to share buckets between processes
+    LOGIN_RATE_LIMIT_STORAGE = os.environ.get('LOGIN_RATE_LIMIT_STORAGE', 'memory')
+    # Cross-request primary-key cache for users and amenities
+    ENTITY_CACHE_ENABLED = os.environ.get('ENTITY_CACHE_ENABLED', '1') == '1'
+    ENTITY_CACHE_TTL = int(os.environ.get('ENTITY_CACHE_TTL', 60))
+    ENTITY_CACHE_MAX_ENTRIES = int(os.environ.get('ENTITY_CACHE_MAX_ENTRIES', 1024))
+    # Public GET response cache (see app/cache.py); '0' to measure the database path
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1'
+    # Upper bound on an entry's life, for writes made outside the facade
+    RESPONSE_CACHE_TTL = _env_int('RESPONSE_CACHE_TTL', 300)
+    # How long a worker reuses the table versions it read; another worker's
+    # writes show up within this many seconds, its own immediately
+    RESPONSE_CACHE_VERSION_TTL = float(os.environ.get('RESPONSE_CACHE_VERSION_TTL', 1.0))
+    # 'auto' uses orjson when installed, else the stdlib json module
+    RESTX_JSON_ENCODER = os.environ.get('RESTX_JSON_ENCODER', 'auto')
+    # Apply pending schema migrations at startup; when off, startup fails
+    # on an out-of-date schema until 'flask db-upgrade' is run
+    DATABASE_AUTO_MIGRATE = os.environ.get('DATABASE_AUTO_MIGRATE', '0') == '1'
+    # Off only to let 'flask db-upgrade' load an app on an old schema
+    DATABASE_SCHEMA_CHECK = os.environ.get('DATABASE_SCHEMA_CHECK', '1') == '1'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted
+    # for the client IP (login throttle); 0 uses the socket address
+    PROXY_FIX_X_FOR = _env_int('PROXY_FIX_X_FOR', 0)
+    # How far a read replica may trail the primary; cached GET responses
+    # are bypassed for this long after a write when a replica is bound
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    # Applied to every SQLite connection; WAL lets readers run alongside
+    # a writer, and writers wait up to the busy timeout for the lock
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    SQLITE_MMAP_SIZE = _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+    # Per-request query count, DB time, rows and commits as a Server-Timing
+    # header and an 'app.sql' log line (see app/metrics.py)
+    SQL_METRICS_ENABLED = os.environ.get('SQL_METRICS_ENABLED', '1') == '1'
+    # Max statements per request by [method] endpoint; over budget is logged as a
+    # warning, or raises with SQL_QUERY_BUDGET_ACTION=raise
+    SQL_QUERY_BUDGETS = query_budgets(os.environ.get('SQL_QUERY_BUDGETS'))
+    SQL_QUERY_BUDGET_ACTION = os.environ.get('SQL_QUERY_BUDGET_ACTION', 'log')
+    # N+1 detector: a statement repeated more than the threshold within one
+    # request or facade call is reported ('off', 'warn', 'log' or 'raise')
+    N_PLUS_ONE_ACTION = os.environ.get('N_PLUS_ONE_ACTION', 'log')
+    N_PLUS_ONE_THRESHOLD = _env_int('N_PLUS_ONE_THRESHOLD', 5)
+    # Admin account created at startup by run.py and the gunicorn master
+    # (see seed_admin in app/commands.py); skipped unless both are set
+    ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL')
+    ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD')
+
+    @classmethod
+    def init_app(cls, app):
+        """Hook for config-specific checks, called by create_app"""
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///development.db')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_BINDS = replica_binds(os.environ.get('DATABASE_REPLICA_URL'))
+    DATABASE_AUTO_MIGRATE = os.environ.get('DATABASE_AUTO_MIGRATE', '1') == '1'
+    ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'admin@hbnb.com')
+    ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin123')
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     DEBUG = True
+    BCRYPT_LOG_ROUNDS = 4
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    DATABASE_AUTO_MIGRATE = True
+    SQL_QUERY_BUDGET_ACTION = 'raise'
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # Public reads go here when set; see app/persistence/routing.py
+    SQLALCHEMY_BINDS = replica_binds(os.environ.get('DATABASE_REPLICA_URL'))
     
     @classmethod
     def init_app(cls, app):
-        """Initialize production config - check SECRET_KEY at runtime"""
+        """Initialize production config - check SECRET_KEY and DATABASE_URL at runtime"""
         if not os.environ.get('SECRET_KEY'):
             raise ValueError("SECRET_KEY environment variable must be set in production")
+        if not os.environ.get('DATABASE_URL'):
+            raise ValueError("DATABASE_URL environment variable must be set in production")
 
 config = {
     'development': DevelopmentConfig,
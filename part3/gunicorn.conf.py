@@ -0,0 +1,71 @@
+"""
+Gunicorn settings for the WSGI app (wsgi.py)
+
+    SECRET_KEY=... DATABASE_URL=... gunicorn -c gunicorn.conf.py
+
+The app is preloaded: the master imports wsgi.py once, so create_app(),
+the startup migrations and schema check, and admin seeding run a single
+time, and every worker is forked with the modules and the app already
+built. Each worker then drops the pooled connections and the bcrypt
+thread pool it inherited (app.reset_after_fork) and opens its own.
+
+Every worker keeps its own response cache, but the table versions its
+ETags are built from live in the database and are bumped by each write
+transaction (see app/cache.py), so a write in one worker invalidates
+the others' entries within RESPONSE_CACHE_VERSION_TTL (1s); the cache
+stays on with several workers.
+
+Settings come from the environment:
+    PORT                  listen port (5000)
+    WEB_CONCURRENCY       worker processes (2 * CPUs + 1)
+    GUNICORN_THREADS      threads per worker (4)
+    GUNICORN_PRELOAD      0 to build the app in every worker instead
+                          (the admin is then not seeded here)
+    GUNICORN_TIMEOUT      worker timeout in seconds (30)
+"""
+import multiprocessing
+import os
+import time
+
+wsgi_app = 'wsgi:app'
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Requests block on SQLite and bcrypt, both of which release the GIL
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
+
+
+def when_ready(server):
+    """
+    Seed the admin account once, in the master, before workers serve
+    Without preloading the master never builds the app; run
+    `flask seed-admin` as a release step instead
+    """
+    if preload_app:
+        from app.commands import seed_admin
+
+        email, created = seed_admin(server.app.wsgi())
+        if created:
+            server.log.info("Admin created: %s", email)
+
+
+def pre_fork(server, worker):
+    worker.fork_started = time.perf_counter()
+
+
+def post_fork(server, worker):
+    """Give the worker its own connection pool and bcrypt pool"""
+    if preload_app:
+        from app import reset_after_fork
+        from wsgi import app
+
+        reset_after_fork(app)
+
+
+def post_worker_init(worker):
+    # perf_counter is CLOCK_MONOTONIC, so the fork time is comparable here
+    worker.log.info("Worker %s ready in %.1f ms", worker.pid,
+                    (time.perf_counter() - worker.fork_started) * 1000)
@@ -0,0 +1,40 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db, query_metrics
+from config import TestingConfig
+
+
+@pytest.fixture
+def app():
+    """Flask app backed by an in-memory database"""
+    app = create_app(TestingConfig)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def n_plus_one(app):
+    """
+    Fail the test when a statement repeats past N_PLUS_ONE_THRESHOLD
+    within one request or facade call (raises NPlusOneDetected)
+    """
+    previous = query_metrics.n_plus_one_action
+    query_metrics.n_plus_one_action = 'raise'
+    yield query_metrics
+    query_metrics.n_plus_one_action = previous
+
+
+def auth_header(user):
+    """Authorization header carrying a token for the given user"""
+    token = create_access_token(
+        identity=str(user.id),
+        additional_claims={'is_admin': user.is_admin}
+    )
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import logging
+import pytest
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('starlette')
+httpx = pytest.importorskip('httpx')
+
+from app import db
+from app.asgi import create_asgi_app
+from app.persistence.async_db import async_db
+from app.services.facade import facade
+from config import TestingConfig
+from conftest import auth_header
+
+
+@pytest.fixture
+def asgi_app(tmp_path):
+    """ASGI app and its Flask app, sharing one SQLite file"""
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'hbnb.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    app = create_asgi_app(Config)
+    with app.state.flask_app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def run(app, scenario):
+    """Run scenario(client) against the ASGI app on a fresh event loop"""
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            try:
+                return await scenario(client)
+            finally:
+                await async_db.dispose()
+    return asyncio.run(main())
+
+
+def make_user(email, is_admin=False):
+    return facade.create_user({'first_name': 'Test', 'last_name': 'User', 'email': email,
+                               'password': 'password123', 'is_admin': is_admin})
+
+
+def make_place(owner, title='Flat', price=100.0):
+    return facade.create_place({'title': title, 'price': price, 'latitude': 10.0,
+                                'longitude': 20.0, 'owner_id': owner.id})
+
+
+def test_reads_match_wsgi(asgi_app):
+    owner = make_user('owner@example.com')
+    place = make_place(owner)
+    paths = ['/api/v1/places/', f'/api/v1/places/{place.id}?expand=amenities,reviews',
+             '/api/v1/places/search?sort=price_asc',
+             '/api/v1/places/nearby?lat=10&lon=20&radius_km=5',
+             f'/api/v1/users/{owner.id}', '/api/v1/users/', '/api/v1/amenities/']
+    client = asgi_app.state.flask_app.test_client()
+    expected = [client.get(path).get_json() for path in paths]
+
+    async def scenario(client):
+        return [(await client.get(path)).json() for path in paths]
+
+    assert run(asgi_app, scenario) == expected
+
+
+def test_writes_and_tokens_are_shared_with_wsgi(asgi_app):
+    owner = make_user('owner@example.com')
+    guest = make_user('guest@example.com')
+    place = make_place(owner)
+    headers = auth_header(guest)
+    # Cached by the WSGI app before the ASGI write
+    wsgi = asgi_app.state.flask_app.test_client()
+    assert wsgi.get(f'/api/v1/places/{place.id}').get_json()['review_count'] == 0
+
+    async def scenario(client):
+        login = await client.post('/api/v1/auth/login', json={
+            'email': 'guest@example.com', 'password': 'password123'})
+        assert login.status_code == 200
+        response = await client.post('/api/v1/reviews/', headers=headers, json={
+            'text': 'Great stay', 'rating': 4, 'place_id': place.id})
+        assert response.status_code == 201
+        return login.json()['access_token']
+
+    token = run(asgi_app, scenario)
+    # Drop this test's session so the place is read back from the database
+    db.session.remove()
+    assert wsgi.get('/api/v1/protected/', headers={
+        'Authorization': f'Bearer {token}'}).status_code == 200
+    data = wsgi.get(f'/api/v1/places/{place.id}').get_json()
+    assert data['review_count'] == 1
+    assert data['avg_rating'] == 4
+
+
+def test_validation_and_auth_errors_match_wsgi(asgi_app):
+    owner = make_user('owner@example.com')
+    other = make_user('other@example.com')
+    place = make_place(owner)
+
+    async def scenario(client):
+        unauthenticated = await client.put(f'/api/v1/places/{place.id}', json={'price': 1})
+        not_owner = await client.put(f'/api/v1/places/{place.id}', headers=auth_header(other),
+                                     json={'price': 1})
+        invalid = await client.put(f'/api/v1/places/{place.id}', headers=auth_header(owner),
+                                   json={'price': -1})
+        bad_sort = await client.get('/api/v1/places/search?sort=cheapest')
+        bad_login = await client.post('/api/v1/auth/login', json={'email': 1, 'password': 'x'})
+        return [(r.status_code, r.json()) for r in
+                (unauthenticated, not_owner, invalid, bad_sort, bad_login)]
+
+    unauthenticated, not_owner, invalid, bad_sort, bad_login = run(asgi_app, scenario)
+    assert unauthenticated[0] == 401
+    assert not_owner == (403, {'error': 'Unauthorized action'})
+    assert invalid == (400, {'error': 'Price must be positive'})
+    client = asgi_app.state.flask_app.test_client()
+    wsgi = client.get('/api/v1/places/search?sort=cheapest')
+    assert bad_sort == (wsgi.status_code, wsgi.get_json())
+    wsgi = client.post('/api/v1/auth/login', json={'email': 1, 'password': 'x'})
+    assert bad_login == (wsgi.status_code, wsgi.get_json()) == (
+        400, {'error': 'email and password must be strings'})
+
+
+def test_attach_amenities_and_streamed_reviews(asgi_app):
+    owner = make_user('owner@example.com')
+    guests = [make_user(f'guest{i}@example.com') for i in range(3)]
+    place = make_place(owner)
+    wifi = facade.create_amenity({'name': 'Wifi'})
+    for i, guest in enumerate(guests, 1):
+        facade.create_review({'text': 'Fine', 'rating': i, 'place_id': place.id,
+                              'user_id': guest.id})
+
+    async def scenario(client):
+        missing = await client.post(f'/api/v1/places/{place.id}/amenities',
+                                    json=[{'id': wifi.id}, {'id': 'nope'}])
+        for _ in range(2):
+            added = await client.post(f'/api/v1/places/{place.id}/amenities',
+                                      json=[{'id': wifi.id}])
+            assert added.status_code == 200
+        detail = await client.get(f'/api/v1/places/{place.id}?expand=amenities')
+        removed = await client.request('DELETE', f'/api/v1/places/{place.id}/amenities',
+                                       headers=auth_header(owner), json=[{'id': wifi.id}])
+        assert removed.status_code == 200
+        after = await client.get(f'/api/v1/places/{place.id}?expand=amenities')
+        reviews = await client.get('/api/v1/reviews/?fields=rating')
+        return missing.json(), detail.json(), after.json(), reviews.content
+
+    missing, detail, after, reviews = run(asgi_app, scenario)
+    assert missing == {'error': 'Amenities not found: nope'}
+    assert detail['amenities'] == [{'id': wifi.id, 'name': 'Wifi'}]
+    assert after['amenities'] == []
+    assert sorted(r['rating'] for r in json.loads(reviews)) == [1, 2, 3]
+
+
+def test_sql_metrics_use_flask_endpoint_names(asgi_app, caplog):
+    owner = make_user('owner@example.com')
+    make_place(owner)
+    caplog.set_level(logging.INFO, logger='app.sql')
+
+    async def scenario(client):
+        return [await client.get(path) for path in ('/api/v1/places/', '/api/v1/protected/')]
+
+    places, protected = run(asgi_app, scenario)
+    assert places.headers['Server-Timing'].startswith('db;dur=')
+    lines = [r.getMessage() for r in caplog.records if r.name == 'app.sql']
+    assert 'endpoint=api_v1.places_place_list status=200 queries=1 ' in lines[0]
+    assert 'endpoint=api_v1.protected_protected status=401 queries=0 ' in lines[1]
+
+
+def test_forwarded_for_trusts_only_the_configured_proxies():
+    from app.asgi import ForwardedForMiddleware
+
+    seen = []
+
+    async def downstream(scope, receive, send):
+        seen.append(scope['client'])
+
+    for trusted, header in [(1, b'1.2.3.4, 203.0.113.7'), (2, b'1.2.3.4, 203.0.113.7'),
+                            (3, b'203.0.113.7'), (1, None)]:
+        headers = [(b'x-forwarded-for', header)] if header else []
+        middleware = ForwardedForMiddleware(downstream, trusted=trusted)
+        asyncio.run(middleware({'type': 'http', 'headers': headers,
+                                'client': ('10.0.0.1', 5000)}, None, None))
+    assert seen == [('203.0.113.7', 5000), ('1.2.3.4', 5000),
+                    ('10.0.0.1', 5000), ('10.0.0.1', 5000)]
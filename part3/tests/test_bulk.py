@@ -0,0 +1,73 @@
+import json
+import time
+from app.models.place import Place
+from app.services.facade import facade
+from conftest import auth_header
+
+
+def make_admin():
+    return facade.create_user({
+        'first_name': 'Admin', 'last_name': 'Test', 'email': 'bulk-admin@example.com',
+        'password': 'password123', 'is_admin': True
+    })
+
+
+def test_bulk_import_reports_per_row_errors(client):
+    admin = make_admin()
+    headers = auth_header(admin)
+
+    response = client.post('/api/v1/amenities/bulk', headers=headers,
+                           json=[{'name': 'Wi-Fi'}, {'name': 'Pool'}, {'name': 'Wi-Fi'}, {'name': ''}])
+    assert response.status_code == 200
+    assert response.json['created'] == 2
+    assert [e['row'] for e in response.json['errors']] == [3, 4]
+    wifi = facade.amenity_repo.get_by_attribute('name', 'Wi-Fi')
+
+    lines = [
+        {'title': 'A', 'price': 10, 'latitude': 24.7, 'longitude': 46.7, 'amenities': [wifi.id]},
+        {'title': 'B', 'price': -1, 'latitude': 24.7, 'longitude': 46.7},
+        {'title': 'C', 'price': 10, 'latitude': 24.7, 'longitude': 46.7, 'amenities': ['nope']},
+    ]
+    body = '\n'.join(json.dumps(line) for line in lines) + '\nnot json\n'
+    response = client.post('/api/v1/places/bulk', data=body, headers={
+        **headers, 'Content-Type': 'application/x-ndjson'})
+    assert response.json['created'] == 1
+    assert [e['row'] for e in response.json['errors']] == [2, 3, 4]
+    place = Place.query.filter_by(title='A').one()
+    assert place.owner_id == admin.id
+    assert [a.name for a in place.amenities] == ['Wi-Fi']
+    assert place.geo_cell is not None
+
+    reviewer = facade.create_user({
+        'first_name': 'R', 'last_name': 'T', 'email': 'bulk-reviewer@example.com',
+        'password': 'password123'
+    })
+    response = client.post('/api/v1/reviews/bulk', headers=headers, json=[
+        {'text': 'Good', 'rating': 4, 'user_id': reviewer.id, 'place_id': place.id},
+        {'text': 'Again', 'rating': 5, 'user_id': reviewer.id, 'place_id': place.id},
+        {'text': 'Ghost', 'rating': 5, 'user_id': 'missing', 'place_id': place.id},
+    ])
+    assert response.json['created'] == 1
+    assert [e['row'] for e in response.json['errors']] == [2, 3]
+    assert (place.review_count, place.rating_sum) == (1, 4)
+
+
+def test_bulk_import_requires_admin(client):
+    user = facade.create_user({
+        'first_name': 'U', 'last_name': 'T', 'email': 'bulk-user@example.com',
+        'password': 'password123'
+    })
+    response = client.post('/api/v1/amenities/bulk', headers=auth_header(user), json=[])
+    assert response.status_code == 403
+
+
+def test_bulk_place_throughput(app):
+    admin = make_admin()
+    rows = ({'title': f'Place {i}', 'price': 10 + i % 90, 'latitude': 24 + i % 100 / 100,
+             'longitude': 46 + i % 100 / 100} for i in range(10000))
+    start = time.perf_counter()
+    report = facade.bulk_create_places(rows, default_owner_id=admin.id)
+    elapsed = time.perf_counter() - start
+    assert report == {'created': 10000, 'errors': []}
+    # Generous bound so slow CI machines pass; locally this runs well above 10k rows/s
+    assert elapsed < 5
@@ -0,0 +1,133 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import db, response_cache
+from app.services.facade import facade
+
+
+def test_etag_revalidation_and_write_invalidation(client):
+    wifi = facade.create_amenity({'name': 'Wi-Fi'})
+
+    first = client.get('/api/v1/amenities/')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    again = client.get('/api/v1/amenities/', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+
+    cached = client.get('/api/v1/amenities/')
+    assert cached.json == first.json
+    assert response_cache.stats()['hits'] == 1
+
+    facade.update_amenity(wifi.id, {'name': 'Fast Wi-Fi'})
+    changed = client.get('/api/v1/amenities/', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.json[0]['name'] == 'Fast Wi-Fi'
+
+
+def test_unrelated_writes_keep_entries_valid(client):
+    facade.create_amenity({'name': 'Pool'})
+    etag = client.get('/api/v1/amenities/').headers['ETag']
+
+    owner = facade.create_user({
+        'first_name': 'Owner', 'last_name': 'Test',
+        'email': 'cache-owner@example.com', 'password': 'password123'
+    })
+    facade.create_place({
+        'title': 'New', 'price': 10, 'latitude': 1,
+        'longitude': 1, 'owner_id': owner.id
+    })
+    response = client.get('/api/v1/amenities/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_query_string_is_part_of_the_key(client):
+    a = client.get('/api/v1/places/?limit=5').headers['ETag']
+    b = client.get('/api/v1/places/?limit=6').headers['ETag']
+    assert a != b
+    assert client.get('/api/v1/places/nonexistent').status_code == 404
+    assert 'ETag' not in client.get('/api/v1/places/nonexistent').headers
+
+
+
+def test_versions_are_shared_between_processes(client, monkeypatch):
+    # Reread the versions on every request, as once version_ttl has passed
+    monkeypatch.setattr(response_cache, 'version_ttl', 0)
+    facade.create_amenity({'name': 'Wi-Fi'})
+    etag = client.get('/api/v1/amenities/').headers['ETag']
+
+    # A restarted worker starts empty but still honours the ETag
+    response_cache.clear()
+    assert client.get('/api/v1/amenities/', headers={'If-None-Match': etag}).status_code == 304
+
+    # Another worker writes: this one's entry goes stale with it
+    with Session(db.engine) as other:
+        other.execute(db.text("UPDATE amenities SET name = 'Fast Wi-Fi'"))
+        response_cache.invalidate(other, 'amenities')
+        other.commit()
+    changed = client.get('/api/v1/amenities/', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.json[0]['name'] == 'Fast Wi-Fi'
+
+
+def test_hits_reuse_recent_versions_without_queries(client):
+    from test_metrics import server_timing
+
+    facade.create_amenity({'name': 'Wi-Fi'})
+    first = client.get('/api/v1/amenities/')
+    assert server_timing(first)[1] == 2
+    assert server_timing(client.get('/api/v1/amenities/'))[1] == 0
+    not_modified = client.get('/api/v1/amenities/', headers={'If-None-Match': first.headers['ETag']})
+    assert not_modified.status_code == 304
+    assert server_timing(not_modified)[1] == 0
+
+    # Within version_ttl another worker's write is not seen yet...
+    with Session(db.engine) as other:
+        response_cache.invalidate(other, 'amenities')
+        other.commit()
+    assert client.get('/api/v1/amenities/').headers['ETag'] == first.headers['ETag']
+    # ...but this process's own writes are, at once
+    facade.create_amenity({'name': 'Pool'})
+    assert len(client.get('/api/v1/amenities/').json) == 2
+
+
+def test_failed_write_keeps_versions(client):
+    facade.create_amenity({'name': 'Pool'})
+    etag = client.get('/api/v1/amenities/').headers['ETag']
+    with pytest.raises(IntegrityError):
+        facade.create_amenity({'name': 'Pool'})
+    assert client.get('/api/v1/amenities/', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_entries_expire_after_ttl(client, monkeypatch):
+    facade.create_amenity({'name': 'Pool'})
+    monkeypatch.setattr(response_cache, 'ttl', 0)
+    client.get('/api/v1/amenities/')
+    client.get('/api/v1/amenities/')
+    assert response_cache.stats()['hits'] == 0
+
+def test_entity_cache_serves_primary_key_lookups_across_requests(app):
+    from app import db, entity_cache
+
+    wifi_id = facade.create_amenity({'name': 'Wi-Fi'}).id
+    db.session.remove()
+    facade.get_amenity(wifi_id)
+    db.session.remove()
+
+    before = dict(facade.amenity_repo.stats)
+    amenity = facade.get_amenity(wifi_id)
+    assert amenity.name == 'Wi-Fi'
+    assert facade.get_amenity(wifi_id) is amenity
+    stats = facade.amenity_repo.stats
+    assert stats['queries'] == before['queries']
+    assert stats['cache_hits'] == before['cache_hits'] + 1
+    assert stats['identity_map_hits'] == before['identity_map_hits'] + 1
+
+    # Writes through the model (not the repository) still invalidate
+    amenity.update({'name': 'Fast Wi-Fi'})
+    db.session.commit()
+    db.session.remove()
+    assert facade.get_amenity(wifi_id).name == 'Fast Wi-Fi'
+    assert entity_cache.stats()['hits'] >= 1
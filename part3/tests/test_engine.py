@@ -0,0 +1,68 @@
+import threading
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.services.facade import facade
+from config import TestingConfig, engine_options
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """App on a SQLite file, configured like development"""
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'hbnb.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    app = create_app(Config)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def pragma(name):
+    return db.session.execute(text(f'PRAGMA {name}')).scalar()
+
+
+def test_sqlite_file_connections_are_tuned(file_app):
+    assert pragma('journal_mode') == 'wal'
+    assert pragma('synchronous') == 1  # NORMAL
+    assert pragma('busy_timeout') == 5000
+    assert pragma('mmap_size') == 256 * 1024 * 1024
+    assert db.engine.pool.size() == 5
+
+
+def test_in_memory_sqlite_skips_file_pragmas(app):
+    assert pragma('journal_mode') == 'memory'
+    assert pragma('busy_timeout') == 5000
+
+
+def test_concurrent_writers_do_not_fail(file_app):
+    errors = []
+
+    def writer(worker):
+        with file_app.app_context():
+            try:
+                for i in range(20):
+                    facade.create_amenity({'name': f'Amenity {worker}-{i}'})
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert Amenity.query.count() == 160
+
+
+def test_engine_options_from_environment(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '3')
+    monkeypatch.setenv('DB_STATEMENT_TIMEOUT_MS', '1500')
+    assert engine_options('sqlite:///:memory:') == {}
+    options = engine_options('postgresql://u:p@db/hbnb')
+    assert options['pool_size'] == 3 and options['pool_pre_ping'] is True
+    assert options['connect_args'] == {'options': '-c statement_timeout=1500'}
+    assert engine_options('mysql://u:p@db/hbnb')['connect_args'] == {
+        'init_command': 'SET SESSION max_execution_time=1500'}
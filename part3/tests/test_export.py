@@ -0,0 +1,76 @@
+import gzip
+import json
+from app.services.facade import facade
+from conftest import auth_header
+
+
+def seed_catalog():
+    admin = facade.create_user({
+        'first_name': 'Admin', 'last_name': 'Test', 'email': 'export-admin@example.com',
+        'password': 'password123', 'is_admin': True
+    })
+    facade.bulk_create_amenities([{'name': f'Amenity {i}'} for i in range(3)])
+    amenity_ids = sorted(a.id for a in facade.get_all_amenities())
+    facade.bulk_create_places(
+        [{'title': f'Place {i}', 'price': 50, 'latitude': 10, 'longitude': 10,
+          'amenities': amenity_ids[:i % 3]} for i in range(25)],
+        default_owner_id=admin.id)
+    place_id = facade.get_all_places()[0].id
+    facade.bulk_create_reviews([{'text': 'Nice', 'rating': 5, 'user_id': admin.id,
+                                 'place_id': place_id}])
+    return admin
+
+
+def parse(body):
+    return [json.loads(line) for line in body.decode('utf-8').splitlines()]
+
+
+def test_export_streams_all_types_without_passwords(client):
+    admin = seed_catalog()
+    response = client.get('/api/v1/export/', headers=auth_header(admin))
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = parse(response.data)
+
+    assert [line['type'] for line in lines] == \
+        ['users'] + ['amenities'] * 3 + ['places'] * 25 + ['reviews']
+    assert 'password' not in lines[0]['data']
+    places = [line['data'] for line in lines if line['type'] == 'places']
+    assert sorted(len(p['amenities']) for p in places) == [0] * 9 + [1] * 8 + [2] * 8
+
+
+def test_export_resumes_from_cursor(client):
+    admin = seed_catalog()
+    headers = auth_header(admin)
+    full = parse(client.get('/api/v1/export/?types=places,reviews', headers=headers).data)
+    assert len(full) == 26
+
+    resumed = parse(client.get(
+        f"/api/v1/export/?types=places,reviews&cursor={full[9]['cursor']}",
+        headers=headers).data)
+    assert resumed == full[10:]
+
+
+def test_export_gzip_and_errors(client):
+    admin = seed_catalog()
+    headers = auth_header(admin)
+    response = client.get('/api/v1/export/?types=users',
+                          headers={**headers, 'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert parse(gzip.decompress(response.data))[0]['data']['email'] == admin.email
+
+    assert client.get('/api/v1/export/?types=bookings', headers=headers).status_code == 400
+    assert client.get('/api/v1/export/?cursor=bogus', headers=headers).status_code == 400
+
+    user = facade.create_user({'first_name': 'U', 'last_name': 'T',
+                               'email': 'export-user@example.com', 'password': 'password123'})
+    assert client.get('/api/v1/export/', headers=auth_header(user)).status_code == 403
+
+
+def test_export_cli_writes_gzip_file(app, tmp_path):
+    seed_catalog()
+    output = tmp_path / 'catalog.ndjson.gz'
+    result = app.test_cli_runner().invoke(args=['export-catalog', '--types', 'places',
+                                                '--output', str(output)])
+    assert result.exit_code == 0, result.output
+    assert len(parse(gzip.decompress(output.read_bytes()))) == 25
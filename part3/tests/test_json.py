@@ -0,0 +1,41 @@
+from datetime import datetime
+import json
+import pytest
+from app.api.v1.representations import ENCODERS, JSONArrayStream, get_encoder
+from app.services.facade import facade
+
+
+@pytest.mark.parametrize('name', sorted(ENCODERS))
+def test_encoders_agree_on_datetimes(name):
+    data = {'at': datetime(2024, 5, 1, 12, 30, 0, 250), 'items': [1, 'two', None]}
+    assert json.loads(get_encoder(name)(data)) == {
+        'at': '2024-05-01T12:30:00.000250', 'items': [1, 'two', None]}
+
+
+def test_unknown_encoder_rejected():
+    with pytest.raises(ValueError):
+        get_encoder('yaml')
+
+
+@pytest.mark.parametrize('name', sorted(ENCODERS))
+def test_streamed_array_is_valid_json(name):
+    dumps = get_encoder(name)
+    items = [{'n': i, 'pad': 'x' * 100} for i in range(2000)]
+    chunks = list(JSONArrayStream(iter(items)).chunks(dumps, chunk_bytes=4096))
+    assert len(chunks) > 1
+    assert json.loads(b''.join(chunks)) == items
+    assert json.loads(b''.join(JSONArrayStream([]).chunks(dumps))) == []
+
+
+@pytest.mark.parametrize('name', sorted(ENCODERS))
+def test_list_endpoints_stream_with_each_encoder(app, client, name):
+    app.config['RESTX_JSON_ENCODER'] = name
+    for i in range(3):
+        facade.create_user({'first_name': 'U', 'last_name': str(i),
+                            'email': f'json{i}@example.com', 'password': 'password123'})
+    response = client.get('/api/v1/users/')
+    assert response.is_streamed
+    assert sorted(u['last_name'] for u in response.json) == ['0', '1', '2']
+
+    response = client.get('/api/v1/reviews/')
+    assert response.json == [] and 'ETag' in response.headers
@@ -0,0 +1,176 @@
+from app import password_hasher
+from app.services.facade import facade
+
+
+def make_user():
+    return facade.create_user({
+        'first_name': 'Login', 'last_name': 'Test',
+        'email': 'login@example.com', 'password': 'password123'
+    })
+
+
+def login(client, password='password123', email='login@example.com'):
+    return client.post('/api/v1/auth/login', json={'email': email, 'password': password})
+
+
+def test_hash_uses_configured_cost(app):
+    user = make_user()
+    assert user.password.split('$')[2] == '04'
+    assert not user.password_needs_rehash()
+
+
+def test_login_rehashes_when_cost_changes(client):
+    user = make_user()
+    password_hasher.log_rounds = 5
+    try:
+        assert user.password_needs_rehash()
+        response = login(client)
+        assert response.status_code == 200
+        assert user.password.split('$')[2] == '05'
+        assert login(client).status_code == 200
+    finally:
+        password_hasher.log_rounds = 4
+
+
+
+def test_only_a_rehash_commits(client):
+    def commits(response):
+        return int(response.headers['Server-Timing'].split(' commits')[0].rsplit(' ', 1)[1])
+
+    make_user()
+    assert commits(login(client, password='wrong')) == 0
+    assert commits(login(client)) == 0
+    password_hasher.log_rounds = 5
+    try:
+        assert commits(login(client)) == 1
+    finally:
+        password_hasher.log_rounds = 4
+
+def test_login_rejects_wrong_password(client):
+    make_user()
+    assert login(client, password='wrong').status_code == 401
+    assert login(client, email='nobody@example.com').status_code == 401
+
+
+def test_throttle_rejects_before_password_check(app, client, monkeypatch):
+    from app import login_throttle
+    from app.models.user import User
+    from conftest import auth_header
+
+    make_user()
+    checks = []
+    original = User.verify_password
+    monkeypatch.setattr(User, 'verify_password',
+                        lambda self, pw: checks.append(pw) or original(self, pw))
+
+    statuses = [login(client, password='wrong').status_code for _ in range(8)]
+    assert statuses == [401] * 5 + [429] * 3
+    assert len(checks) == 5
+
+    response = login(client, password='wrong')
+    assert int(response.headers['Retry-After']) >= 1
+    assert login_throttle.stats()['bcrypt_checks_saved'] == 4
+
+    admin = facade.create_user({
+        'first_name': 'Admin', 'last_name': 'Test', 'email': 'admin@example.com',
+        'password': 'password123', 'is_admin': True
+    })
+    response = client.get('/api/v1/auth/throttle-stats', headers=auth_header(admin))
+    assert response.json['rejected'] == 4
+
+
+
+def test_rejected_attempts_run_no_sql(client):
+    from app import login_throttle
+
+    make_user()
+    statuses = [login(client, email='nobody@example.com').status_code for _ in range(7)]
+    assert statuses == [401] * 5 + [429] * 2
+    assert '"0 queries' in login(client, email='nobody@example.com').headers['Server-Timing']
+    assert login_throttle.stats()['bcrypt_checks_saved'] == 3
+
+
+def test_successful_logins_do_not_use_up_the_budget(client):
+    make_user()
+    assert [login(client).status_code for _ in range(12)] == [200] * 12
+    # Failures still count, on top of the successes
+    assert [login(client, password='wrong').status_code
+            for _ in range(6)] == [401] * 5 + [429]
+
+
+def test_ip_rejection_does_not_charge_the_email_bucket():
+    from app.throttle import LoginThrottle
+
+    throttle = LoginThrottle()
+    throttle.ip_capacity = 3
+    for i in range(3):
+        assert throttle.check(f'other{i}@example.com', '10.0.0.1') == 0
+    # The script's IP is out of tokens; its attempts on the victim cost nothing
+    for _ in range(10):
+        assert throttle.check('victim@example.com', '10.0.0.1') > 0
+    # The victim's own budget is untouched, from any address
+    assert [throttle.check('victim@example.com', f'10.0.1.{i}') == 0
+            for i in range(6)] == [True] * 5 + [False]
+
+
+def test_client_ip_comes_from_trusted_proxy_header():
+    from app import create_app, db
+    from config import TestingConfig
+
+    class Config(TestingConfig):
+        PROXY_FIX_X_FOR = 1
+        LOGIN_RATE_LIMIT_IP_CAPACITY = 2
+
+    app = create_app(Config)
+    client = app.test_client()
+    with app.app_context():
+        def attempt(email, forwarded_for):
+            return client.post('/api/v1/auth/login', headers={'X-Forwarded-For': forwarded_for},
+                               json={'email': email, 'password': 'wrong'}).status_code
+
+        assert [attempt(f'user{i}@example.com', '203.0.113.7') for i in range(3)] == [401, 401, 429]
+        # Same proxy, another client: its own bucket
+        assert attempt('user9@example.com', '198.51.100.4') == 401
+        # Only the last hop is trusted, a spoofed first value is ignored
+        assert attempt('user8@example.com', '1.2.3.4, 203.0.113.7') == 429
+        db.session.remove()
+
+
+def test_login_rejects_non_string_credentials(client):
+    make_user()
+    for payload in ({'email': ['login@example.com'], 'password': 'password123'},
+                    {'email': 'login@example.com', 'password': 123},
+                    {'password': 'password123'}):
+        response = client.post('/api/v1/auth/login', json=payload)
+        assert response.status_code == 400, payload
+        assert 'error' in response.get_json()
+
+
+def test_shared_sqlite_storage_is_seen_by_every_throttle(tmp_path):
+    from app.throttle import LoginThrottle, SQLiteBucketStorage
+
+    path = str(tmp_path / 'buckets.db')
+    first, second = LoginThrottle(), LoginThrottle()
+    for throttle in (first, second):
+        throttle.capacity = 2
+        throttle.storage = SQLiteBucketStorage(path)
+
+    assert first.check('a@example.com', '10.0.0.1') == 0
+    assert second.check('a@example.com', '10.0.0.2') == 0
+    assert first.check('a@example.com', '10.0.0.3') > 0
+
+
+def test_admin_password_change_is_hashed_in_the_update(client):
+    from conftest import auth_header
+
+    user = make_user()
+    admin = facade.create_user({'first_name': 'Admin', 'last_name': 'Test',
+                                'email': 'admin@example.com', 'password': 'password123',
+                                'is_admin': True})
+    response = client.put(f'/api/v1/users/{user.id}', headers=auth_header(admin),
+                          json={'first_name': 'Renamed', 'password': 'new-password'})
+    assert response.status_code == 200
+    # Name and password land in one commit
+    assert ' 1 commits' in response.headers['Server-Timing']
+    assert login(client).status_code == 401
+    assert login(client, password='new-password').status_code == 200
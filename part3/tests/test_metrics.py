@@ -0,0 +1,154 @@
+import logging
+import re
+import pytest
+from app import create_app, db, query_metrics
+from app.metrics import (NPlusOneDetected, NPlusOneWarning, QueryBudgetExceeded,
+                         repeated_queries_expected)
+from app.services.facade import facade
+from config import TestingConfig
+from conftest import auth_header
+
+
+def server_timing(response):
+    """(db ms, queries, rows, commits) from a Server-Timing header"""
+    match = re.match(r'db;dur=([\d.]+);desc="(\d+) queries, (\d+) rows, (\d+) commits"',
+                     response.headers['Server-Timing'])
+    return float(match.group(1)), *map(int, match.groups()[1:])
+
+
+def make_user(email, is_admin=False):
+    return facade.create_user({'first_name': 'Test', 'last_name': 'User', 'email': email,
+                               'password': 'password123', 'is_admin': is_admin})
+
+
+def test_server_timing_and_log_line(client, caplog):
+    admin = make_user('admin@example.com', is_admin=True)
+    caplog.set_level(logging.INFO, logger='app.sql')
+
+    response = client.post('/api/v1/amenities/', json={'name': 'Wifi'},
+                           headers=auth_header(admin))
+    _, queries, _, commits = server_timing(response)
+    assert queries >= 1
+    assert commits == 1
+    _, queries, rows, commits = server_timing(client.get('/api/v1/amenities/'))
+    # The amenities plus the response cache's version lookup
+    assert (queries, rows, commits) == (2, 1, 0)
+
+    with client.get('/api/v1/users/') as response:
+        assert len(response.get_json()) == 1
+    assert 'Server-Timing' in response.headers
+
+    lines = [r.getMessage() for r in caplog.records if r.name == 'app.sql']
+    assert lines[0].startswith('sql method=POST path=/api/v1/amenities/ '
+                               'endpoint=api_v1.amenities_amenity_list status=201')
+    # The log line of a streamed listing covers the queries of its body
+    assert 'endpoint=api_v1.users_user_list status=200 queries=1 ' in lines[2]
+
+
+@pytest.fixture(params=['raise', 'log'])
+def budget_app(request):
+    """App with a zero budget for listing amenities, in each budget action"""
+    class Config(TestingConfig):
+        SQL_QUERY_BUDGETS = {'GET api_v1.amenities_amenity_list': 0,
+                             'api_v1.places_place_resource': 5}
+        SQL_QUERY_BUDGET_ACTION = request.param
+    app = create_app(Config)
+    with app.app_context():
+        facade.create_amenity({'name': 'Wifi'})
+        yield app
+        db.session.remove()
+
+
+def test_budget_exceeded(budget_app, caplog):
+    client = budget_app.test_client()
+    caplog.set_level(logging.INFO, logger='app.sql')
+    if budget_app.config['SQL_QUERY_BUDGET_ACTION'] == 'raise':
+        with pytest.raises(QueryBudgetExceeded, match='issued 2 statements, budget is 0'):
+            client.get('/api/v1/amenities/')
+    else:
+        assert client.get('/api/v1/amenities/').status_code == 200
+    [record] = [r for r in caplog.records if r.name == 'app.sql']
+    assert record.levelno == logging.WARNING
+    assert record.getMessage().endswith(' budget=0')
+
+    # The budget is for GET only
+    admin = make_user('admin@example.com', is_admin=True)
+    response = client.post('/api/v1/amenities/', json={'name': 'Pool'},
+                           headers=auth_header(admin))
+    assert response.status_code == 201
+
+
+def test_metrics_can_be_disabled():
+    class Config(TestingConfig):
+        SQL_METRICS_ENABLED = False
+    app = create_app(Config)
+    with app.app_context():
+        assert 'Server-Timing' not in app.test_client().get('/api/v1/amenities/').headers
+        db.session.remove()
+
+
+def make_places(count):
+    owner = make_user(f'owner{len(facade.get_all_places())}@example.com')
+    for i in range(count):
+        facade.create_place({'title': f'Place {i}', 'price': 10, 'latitude': 1.0,
+                             'longitude': 1.0, 'owner_id': owner.id})
+    db.session.expire_all()
+
+
+def lazy_load_reviews():
+    """Touch each place's reviews lazily: one SELECT per place (an N+1)"""
+    return [len(place.reviews) for place in facade.get_all_places()]
+
+
+def test_n_plus_one_fixture_raises_in_scope(app, n_plus_one):
+    make_places(6)
+    with pytest.raises(NPlusOneDetected, match=r'ran 6 times in test: SELECT reviews\.'):
+        with n_plus_one.scope('test'):
+            lazy_load_reviews()
+
+
+def test_n_plus_one_threshold_and_expected_repeats(app, n_plus_one):
+    make_places(5)
+    with n_plus_one.scope('test'):
+        assert lazy_load_reviews() == [0] * 5
+    make_places(1)
+    with n_plus_one.scope('test'), repeated_queries_expected():
+        assert lazy_load_reviews() == [0] * 6
+
+
+def test_facade_calls_are_scopes(app, n_plus_one):
+    @query_metrics.scoped
+    class Reports:
+        def review_counts(self):
+            return lazy_load_reviews()
+
+    make_places(6)
+    with pytest.raises(NPlusOneDetected, match='in Reports.review_counts:'):
+        Reports().review_counts()
+
+
+def test_n_plus_one_warn_and_log(app, caplog, monkeypatch):
+    make_places(6)
+    monkeypatch.setattr(query_metrics, 'n_plus_one_action', 'warn')
+    with pytest.warns(NPlusOneWarning):
+        with query_metrics.scope('test'):
+            lazy_load_reviews()
+
+    monkeypatch.setattr(query_metrics, 'n_plus_one_action', 'log')
+    caplog.set_level(logging.WARNING, logger='app.sql')
+    db.session.expire_all()
+    with query_metrics.scope('again'):
+        lazy_load_reviews()
+    [record] = [r for r in caplog.records if r.name == 'app.sql']
+    assert record.getMessage().startswith('N+1 query: statement ran 6 times in again: ')
+
+
+def test_n_plus_one_in_request(client, n_plus_one, monkeypatch):
+    make_places(6)
+    from app.api.v1 import serializers
+    # A serializer that lazy-loads a relationship per row
+    monkeypatch.setattr(serializers.place_serializer, 'options', lambda projection: [])
+    monkeypatch.setattr(serializers.Serializer, 'dump_many',
+                        lambda self, rows, projection: [len(r.reviews) for r in rows])
+    with pytest.raises(NPlusOneDetected, match='in GET /api/v1/places/:'):
+        client.get('/api/v1/places/')
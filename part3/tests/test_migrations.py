@@ -0,0 +1,89 @@
+import pytest
+import sqlalchemy as sa
+from app import create_app, db
+from app.persistence.migrations import (
+    LATEST_VERSION, MIGRATIONS, SchemaOutOfDateError, check_schema, current_version, upgrade)
+from config import TestingConfig
+
+
+def legacy_database(path):
+    """A database as the old db.create_all() left it, with some rows"""
+    engine = sa.create_engine(f'sqlite:///{path}')
+    with engine.begin() as conn:
+        MIGRATIONS[0].upgrade(conn)
+        conn.execute(sa.text(
+            "INSERT INTO users (id, first_name, last_name, email, password) "
+            "VALUES ('u1', 'A', 'B', 'a@example.com', 'x')"))
+        conn.execute(sa.text(
+            "INSERT INTO places (id, title, price, latitude, longitude, owner_id) "
+            "VALUES ('p1', 'Flat', 10, 24.75, 46.65, 'u1')"))
+        conn.execute(sa.text("INSERT INTO amenities (id, name) VALUES ('a1', 'Wi-Fi')"))
+        conn.execute(sa.text(
+            "INSERT INTO place_amenity VALUES ('p1', 'a1'), ('p1', 'a1')"))
+        conn.execute(sa.text(
+            "INSERT INTO reviews (id, text, rating, user_id, place_id) "
+            "VALUES ('r1', 'Good', 4, 'u1', 'p1')"))
+    return engine
+
+
+def config_for(path, auto_migrate):
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        DATABASE_AUTO_MIGRATE = auto_migrate
+    return Config
+
+
+def test_upgrade_brings_legacy_database_up_to_date(app, tmp_path):
+    engine = legacy_database(tmp_path / 'legacy.db')
+    assert upgrade(engine) == [m.version for m in MIGRATIONS]
+    assert upgrade(engine) == []
+    check_schema(engine, db.metadata)
+
+    with engine.connect() as conn:
+        assert current_version(conn) == LATEST_VERSION
+        place = conn.execute(sa.text(
+            'SELECT geo_cell, review_count, rating_sum FROM places')).one()
+        assert tuple(place) == ('247:466', 1, 4)
+        assert conn.execute(sa.text('SELECT COUNT(*) FROM place_amenity')).scalar() == 1
+
+        for table, column in [('places', 'owner_id'), ('reviews', 'place_id'),
+                              ('reviews', 'user_id'), ('place_amenity', 'place_id'),
+                              ('place_amenity', 'amenity_id')]:
+            plan = conn.execute(sa.text(
+                f"EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE {column} = 'x'")).all()
+            assert 'USING' in plan[0][-1] and 'INDEX' in plan[0][-1], (table, column)
+
+
+def test_startup_fails_on_outdated_schema(app, tmp_path):
+    path = tmp_path / 'legacy.db'
+    legacy_database(path)
+    with pytest.raises(SchemaOutOfDateError):
+        create_app(config_for(path, auto_migrate=False))
+
+    create_app(config_for(path, auto_migrate=True))
+    create_app(config_for(path, auto_migrate=False))
+
+
+def test_check_schema_reports_missing_indexes(app):
+    with db.engine.begin() as conn:
+        conn.execute(sa.text('DROP INDEX ix_reviews_place_id'))
+    with pytest.raises(SchemaOutOfDateError, match='ix_reviews_place_id'):
+        check_schema(db.engine, db.metadata)
+
+
+def test_upgrade_keeps_newest_of_duplicate_reviews(app, tmp_path, caplog):
+    engine = legacy_database(tmp_path / 'legacy.db')
+    with engine.begin() as conn:
+        conn.execute(sa.text(
+            "INSERT INTO reviews (id, text, rating, user_id, place_id, created_at) VALUES "
+            "('r0', 'Old', 1, 'u1', 'p1', '2023-01-01 00:00:00'), "
+            "('r2', 'New', 5, 'u1', 'p1', '2024-06-01 00:00:00'), "
+            "('r3', 'Same time', 2, 'u1', 'p1', '2024-06-01 00:00:00')"))
+    upgrade(engine)
+
+    with engine.connect() as conn:
+        reviews = conn.execute(sa.text('SELECT id FROM reviews')).scalars().all()
+        place = conn.execute(sa.text('SELECT review_count, rating_sum FROM places')).one()
+    assert reviews == ['r3']
+    assert tuple(place) == (1, 2)
+    assert 'Removed 3 duplicate reviews' in caplog.text
@@ -0,0 +1,307 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from app.services.facade import facade
+
+
+def seed_places(count):
+    """Create one owner, one amenity and `count` reviewed places"""
+    owner = facade.create_user({
+        'first_name': 'Owner',
+        'last_name': 'Test',
+        'email': f'owner{count}@example.com',
+        'password': 'password123'
+    })
+    reviewer = facade.create_user({
+        'first_name': 'Reviewer',
+        'last_name': 'Test',
+        'email': f'reviewer{count}@example.com',
+        'password': 'password123'
+    })
+    wifi = facade.create_amenity({'name': f'Wi-Fi {count}'})
+    for i in range(count):
+        place = facade.create_place({
+            'title': f'Place {i}',
+            'price': 50 + i,
+            'latitude': 24.7,
+            'longitude': 46.6,
+            'owner_id': owner.id
+        })
+        place.add_amenity(wifi)
+        facade.create_review({
+            'text': 'Nice',
+            'rating': 4,
+            'place_id': place.id,
+            'user_id': reviewer.id
+        })
+
+
+def count_queries(client, url):
+    """Return (response, number of SELECT statements) for one GET"""
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_execute)
+    try:
+        db.session.expire_all()
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_execute)
+    return response, len([s for s in statements if s.lstrip().upper().startswith('SELECT')])
+
+
+def test_places_pagination_walks_every_row(client):
+    seed_places(7)
+    seen = []
+    url = '/api/v1/places/?limit=3'
+    while True:
+        response = client.get(url)
+        assert response.status_code == 200
+        seen.extend(p['title'] for p in response.json['places'])
+        cursor = response.json['next_cursor']
+        if not cursor:
+            break
+        url = f'/api/v1/places/?limit=3&cursor={cursor}'
+    assert sorted(seen) == sorted(f'Place {i}' for i in range(7))
+    assert len(seen) == len(set(seen))
+
+
+def test_places_page_has_constant_query_count(client):
+    seed_places(3)
+    _, small = count_queries(client, '/api/v1/places/?limit=3')
+    seed_places(12)
+    _, large = count_queries(client, '/api/v1/places/?limit=15')
+    assert small == large
+
+
+def test_places_list_projection_and_expand(client):
+    seed_places(3)
+    response, slim = count_queries(client, '/api/v1/places/?fields=id,title,owner_id')
+    place = response.json['places'][0]
+    assert set(place) == {'id', 'title', 'owner_id'}
+    # The page itself plus the response cache's version lookup
+    assert slim == 2
+
+    response, expanded = count_queries(client, '/api/v1/places/?expand=amenities,reviews')
+    place = response.json['places'][0]
+    assert [a['name'] for a in place['amenities']] == ['Wi-Fi 3']
+    assert set(place['reviews'][0]) == {'id', 'text', 'rating', 'user_id'}
+    assert 'owner' not in place and place['avg_rating'] == 4
+    # The page and two expansions; the cache versions read just before are reused
+    assert expanded == 3
+
+    detail = client.get(f"/api/v1/places/{place['id']}?fields=title&expand=amenities").json
+    assert set(detail) == {'title', 'amenities'}
+
+
+@pytest.mark.parametrize('url', [
+    '/api/v1/places/?fields=password',
+    '/api/v1/places/search?expand=owner',
+    '/api/v1/reviews/?fields=id,secret',
+])
+def test_unknown_fields_or_expand_rejected(client, url):
+    assert client.get(url).status_code == 400
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=abc', 'limit=1000', 'cursor=not-a-cursor'])
+def test_places_invalid_pagination(client, query):
+    response = client.get(f'/api/v1/places/?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_search_filters_price_box_amenity_and_rating(client):
+    owner = facade.create_user({
+        'first_name': 'Owner', 'last_name': 'Test',
+        'email': 'search-owner@example.com', 'password': 'password123'
+    })
+    reviewer = facade.create_user({
+        'first_name': 'Reviewer', 'last_name': 'Test',
+        'email': 'search-reviewer@example.com', 'password': 'password123'
+    })
+    pool = facade.create_amenity({'name': 'Pool'})
+    rows = [
+        ('Riyadh cheap', 40, 24.7, 46.7, True, 5),
+        ('Riyadh pricey', 400, 24.7, 46.7, True, 2),
+        ('Riyadh no pool', 45, 24.7, 46.7, False, 5),
+        ('Cairo cheap', 30, 30.0, 31.2, True, 4),
+    ]
+    for title, price, lat, lon, has_pool, rating in rows:
+        place = facade.create_place({
+            'title': title, 'price': price, 'latitude': lat,
+            'longitude': lon, 'owner_id': owner.id
+        })
+        if has_pool:
+            place.add_amenity(pool)
+        facade.create_review({
+            'text': 'Ok', 'rating': rating,
+            'place_id': place.id, 'user_id': reviewer.id
+        })
+
+    box = 'min_lat=24.4&min_lon=46.4&max_lat=25.0&max_lon=47.0'
+    response = client.get(f'/api/v1/places/search?{box}&max_price=100'
+                          f'&amenities={pool.id}&min_rating=4')
+    assert response.status_code == 200
+    assert [p['title'] for p in response.json] == ['Riyadh cheap']
+
+    response = client.get('/api/v1/places/search?sort=price_asc')
+    assert [p['price'] for p in response.json] == [30, 40, 45, 400]
+
+    response = client.get('/api/v1/places/search?sort=rating&limit=2')
+    assert [p['title'] for p in response.json][0] in ('Riyadh cheap', 'Riyadh no pool')
+    assert len(response.json) == 2
+
+
+@pytest.mark.parametrize('query', [
+    'min_price=abc', 'sort=random', 'min_lat=1', 'min_rating=9',
+    'min_price=10&max_price=5'
+])
+def test_search_rejects_invalid_parameters(client, query):
+    response = client.get(f'/api/v1/places/search?{query}')
+    assert response.status_code == 400
+
+
+def test_nearby_returns_places_within_radius_sorted_by_distance(client):
+    owner = facade.create_user({
+        'first_name': 'Owner', 'last_name': 'Test',
+        'email': 'nearby-owner@example.com', 'password': 'password123'
+    })
+    points = [
+        ('Kingdom Centre', 24.7114, 46.6744),
+        ('Diriyah', 24.7336, 46.5756),
+        ('Jeddah Corniche', 21.5433, 39.1728),
+        ('Fiji east', -17.0, 179.99),
+        ('Fiji west', -17.0, -179.99),
+    ]
+    for title, lat, lon in points:
+        facade.create_place({
+            'title': title, 'price': 100, 'latitude': lat,
+            'longitude': lon, 'owner_id': owner.id
+        })
+
+    response = client.get('/api/v1/places/nearby?lat=24.7136&lon=46.6753&radius_km=15')
+    assert response.status_code == 200
+    assert [p['title'] for p in response.json] == ['Kingdom Centre', 'Diriyah']
+    assert response.json[0]['distance_km'] < response.json[1]['distance_km']
+
+    # Radius large enough to fall back to a bounding-box scan
+    response = client.get('/api/v1/places/nearby?lat=24.7136&lon=46.6753&radius_km=1000')
+    assert [p['title'] for p in response.json] == ['Kingdom Centre', 'Diriyah', 'Jeddah Corniche']
+
+    # Search circle crossing the antimeridian
+    response = client.get('/api/v1/places/nearby?lat=-17.0&lon=180&radius_km=5')
+    assert sorted(p['title'] for p in response.json) == ['Fiji east', 'Fiji west']
+
+
+def test_nearby_follows_coordinate_updates(client):
+    owner = facade.create_user({
+        'first_name': 'Owner', 'last_name': 'Test',
+        'email': 'moving-owner@example.com', 'password': 'password123'
+    })
+    place = facade.create_place({
+        'title': 'Moving', 'price': 100, 'latitude': 21.5,
+        'longitude': 39.2, 'owner_id': owner.id
+    })
+    facade.update_place(place.id, {'latitude': 24.7, 'longitude': 46.7})
+
+    response = client.get('/api/v1/places/nearby?lat=24.7&lon=46.7&radius_km=1')
+    assert [p['title'] for p in response.json] == ['Moving']
+
+
+@pytest.mark.parametrize('query', ['lat=1&lon=1', 'lat=95&lon=1&radius_km=5', 'lat=1&lon=1&radius_km=-2'])
+def test_nearby_rejects_invalid_parameters(client, query):
+    response = client.get(f'/api/v1/places/nearby?{query}')
+    assert response.status_code == 400
+
+
+def test_rating_aggregates_follow_review_writes(app, client):
+    owner = facade.create_user({
+        'first_name': 'Owner', 'last_name': 'Test',
+        'email': 'rating-owner@example.com', 'password': 'password123'
+    })
+    reviewers = [facade.create_user({
+        'first_name': 'Reviewer', 'last_name': str(i),
+        'email': f'rating-reviewer{i}@example.com', 'password': 'password123'
+    }) for i in range(2)]
+    place = facade.create_place({
+        'title': 'Rated', 'price': 100, 'latitude': 24.7,
+        'longitude': 46.7, 'owner_id': owner.id
+    })
+    first = facade.create_review({
+        'text': 'Good', 'rating': 4, 'place_id': place.id, 'user_id': reviewers[0].id
+    })
+    facade.create_review({
+        'text': 'Great', 'rating': 5, 'place_id': place.id, 'user_id': reviewers[1].id
+    })
+    assert (place.review_count, place.rating_sum, place.avg_rating) == (2, 9, 4.5)
+
+    facade.update_review(first.id, {'rating': 2})
+    assert (place.review_count, place.rating_sum) == (2, 7)
+
+    facade.delete_review(first.id)
+    assert (place.review_count, place.rating_sum, place.avg_rating) == (1, 5, 5.0)
+
+    place.review_count, place.rating_sum = 0, 0
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=['rebuild-ratings'])
+    assert result.exit_code == 0
+    db.session.refresh(place)
+    assert (place.review_count, place.rating_sum) == (1, 5)
+
+    response = client.get(f'/api/v1/places/{place.id}')
+    assert response.json['avg_rating'] == 5.0
+    assert response.json['review_count'] == 1
+
+
+def test_attach_and_detach_amenities_in_constant_statements(client):
+    from conftest import auth_header
+    owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Test',
+                                'email': 'owner@example.com', 'password': 'password123'})
+    place = facade.create_place({'title': 'Flat', 'price': 80, 'latitude': 24.7,
+                                 'longitude': 46.6, 'owner_id': owner.id})
+    amenities = [facade.create_amenity({'name': f'Amenity {i}'}) for i in range(50)]
+    url = f'/api/v1/places/{place.id}/amenities'
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    response = client.post(url, json=[{'id': 'nope'}, {'id': amenities[0].id}, {'id': 'gone'}])
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Amenities not found: gone, nope'}
+
+    client.post(url, json=[{'id': amenities[0].id}])
+    payload = [{'id': a.id} for a in amenities]
+    event.listen(db.engine, 'before_cursor_execute', before_execute)
+    try:
+        response = client.post(url, json=payload)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_execute)
+    assert response.status_code == 200
+    # Place lookup, one IN query for the amenities, one INSERT ... SELECT
+    # and the response cache version bump at commit
+    assert len(statements) == 4
+    detail = client.get(f'/api/v1/places/{place.id}?expand=amenities').get_json()
+    assert len(detail['amenities']) == 50
+
+    removed = [{'id': a.id} for a in amenities[:40]] + [{'id': 'nope'}]
+    assert client.delete(url, json=removed).status_code == 401
+    stranger = facade.create_user({'first_name': 'Other', 'last_name': 'Test',
+                                   'email': 'other@example.com', 'password': 'password123'})
+    assert client.delete(url, json=removed, headers=auth_header(stranger)).status_code == 403
+    response = client.delete(url, json=removed, headers=auth_header(owner))
+    assert response.status_code == 200
+    detail = client.get(f'/api/v1/places/{place.id}?expand=amenities').get_json()
+    assert {a['id'] for a in detail['amenities']} == {p['id'] for p in payload[40:]}
+
+
+@pytest.mark.parametrize('payload', [[], {'id': 'x'}, ['x'], [{'id': 'x'}, 1]])
+def test_attach_amenities_rejects_malformed_payload(client, payload):
+    owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Test',
+                                'email': 'owner@example.com', 'password': 'password123'})
+    place = facade.create_place({'title': 'Flat', 'price': 80, 'latitude': 24.7,
+                                 'longitude': 46.6, 'owner_id': owner.id})
+    response = client.post(f'/api/v1/places/{place.id}/amenities', json=payload)
+    assert response.status_code == 400
@@ -0,0 +1,73 @@
+import uuid
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from app import db, password_hasher, response_cache
+from app.services.facade import facade
+
+
+def seed(count, start=0):
+    """
+    Users, amenities and places numbered start..count-1; user i reviews
+    the first place and place i, so every listing grows with count
+    """
+    now = datetime.utcnow()
+    password = password_hasher.hash('password123')
+    facade.user_repo.bulk_insert([{
+        'id': str(uuid.uuid4()), 'first_name': 'User', 'last_name': str(i),
+        'email': f'user{i}@example.com', 'password': password, 'is_admin': False,
+        'created_at': now, 'updated_at': now
+    } for i in range(start, count)])
+    db.session.commit()
+    users = sorted(facade.get_all_users(), key=lambda u: int(u.last_name))
+    facade.bulk_create_amenities({'name': f'Amenity {i}'} for i in range(start, count))
+    amenity_ids = [a.id for a in facade.get_all_amenities()]
+    facade.bulk_create_places(({
+        'title': f'Place {i}', 'price': 50 + i, 'latitude': 24.7, 'longitude': 46.6,
+        'amenities': amenity_ids[i % len(amenity_ids):][:2]
+    } for i in range(start, count)), default_owner_id=users[0].id)
+    places = sorted(facade.get_all_places(), key=lambda p: int(p.title.split()[1]))
+    facade.bulk_create_reviews(({
+        'text': 'Nice', 'rating': 1 + i % 5, 'place_id': place.id, 'user_id': users[i].id
+    } for i in range(start, count) for place in {places[0], places[i]}))
+    return places[0].id
+
+
+def statements_for(client, url):
+    """(response JSON, statements run) for one GET, with the body fully streamed"""
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    response_cache.clear()
+    db.session.expire_all()
+    event.listen(db.engine, 'before_cursor_execute', before_execute)
+    try:
+        with client.get(url) as response:
+            assert response.status_code == 200
+            data = response.get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_execute)
+    return data, len(statements)
+
+
+def size(data):
+    return len(data['places']) if isinstance(data, dict) else len(data)
+
+
+@pytest.mark.parametrize('url, rows_at_10, rows_at_1000', [
+    ('/api/v1/places/?limit=100&expand=amenities,reviews', 10, 100),
+    ('/api/v1/reviews/', 19, 1999),
+    ('/api/v1/places/{place_id}/reviews', 10, 1000),
+    ('/api/v1/amenities/', 10, 1000),
+    ('/api/v1/users/', 10, 1000),
+])
+def test_listing_query_count_is_constant(client, n_plus_one, url, rows_at_10, rows_at_1000):
+    place_id = seed(10)
+    small, small_count = statements_for(client, url.format(place_id=place_id))
+    seed(1000, start=10)
+    large, large_count = statements_for(client, url.format(place_id=place_id))
+
+    assert (size(small), size(large)) == (rows_at_10, rows_at_1000)
+    assert small_count == large_count
@@ -0,0 +1,96 @@
+import sqlite3
+import pytest
+from app import create_app, db
+from app.services.facade import facade
+from config import TestingConfig, engine_options, replica_binds
+from conftest import auth_header
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    """App on a primary SQLite file with a second file as its read replica"""
+    primary = tmp_path / 'primary.db'
+    replica = tmp_path / 'replica.db'
+
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{primary}'
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+        SQLALCHEMY_BINDS = replica_binds(f'sqlite:///{replica}')
+
+    app = create_app(Config)
+
+    def sync_replica():
+        """Stand-in for replication: copy the primary over the replica"""
+        with app.app_context():
+            db.engines['replica'].dispose()
+        source, target = sqlite3.connect(primary), sqlite3.connect(replica)
+        source.backup(target)
+        source.close()
+        target.close()
+
+    app.sync_replica = sync_replica
+    sync_replica()
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def amenity_names():
+    return sorted(a.name for a in facade.get_all_amenities())
+
+
+def test_reads_use_replica_but_see_own_writes(replica_app):
+    with replica_app.app_context():
+        facade.create_amenity({'name': 'Wi-Fi'})
+        # Same session: it wrote, so it reads from the primary
+        assert amenity_names() == ['Wi-Fi']
+
+    with replica_app.app_context():
+        # Fresh session: reads go to the replica, which has not caught up
+        assert amenity_names() == []
+
+    replica_app.sync_replica()
+    with replica_app.app_context():
+        assert amenity_names() == ['Wi-Fi']
+
+
+def test_unit_of_work_reads_from_primary(replica_app):
+    with replica_app.app_context():
+        amenity_id = facade.create_amenity({'name': 'Pool'}).id
+
+    with replica_app.app_context():
+        assert facade.get_amenity(amenity_id) is None
+        # The write path looks the amenity up inside its unit of work
+        assert facade.update_amenity(amenity_id, {'name': 'Heated pool'}).name == 'Heated pool'
+
+    replica_app.sync_replica()
+    with replica_app.app_context():
+        assert facade.get_amenity(amenity_id).name == 'Heated pool'
+
+
+def test_public_gets_are_served_by_replica(replica_app):
+    client = replica_app.test_client()
+    with replica_app.app_context():
+        admin = facade.create_user({
+            'first_name': 'Admin', 'last_name': 'Test', 'email': 'replica@example.com',
+            'password': 'password123', 'is_admin': True
+        })
+        headers = auth_header(admin)
+
+    response = client.post('/api/v1/amenities/', json={'name': 'Sauna'}, headers=headers)
+    assert response.status_code == 201
+    assert client.get('/api/v1/amenities/').json == []
+
+    replica_app.sync_replica()
+    assert [a['name'] for a in client.get('/api/v1/amenities/').json] == ['Sauna']
+
+
+def test_login_reads_the_primary(replica_app):
+    with replica_app.app_context():
+        facade.create_user({'first_name': 'New', 'last_name': 'User', 'email': 'new@example.com',
+                            'password': 'password123'})
+
+    # The replica has not seen the account yet
+    with replica_app.app_context():
+        assert facade.authenticate_user('new@example.com', 'password123')
@@ -0,0 +1,49 @@
+import pytest
+from app.persistence.repository import InMemoryRepository
+
+
+class Item:
+    def __init__(self, id, email, group):
+        self.id = id
+        self.email = email
+        self.group = group
+
+
+def test_indexed_lookups_follow_add_update_delete():
+    repo = InMemoryRepository(unique_indexes=('email',), indexes=('group',))
+    a = Item('a', 'a@example.com', 'x')
+    b = Item('b', 'b@example.com', 'x')
+    repo.add(a)
+    repo.add(b)
+
+    assert repo.get_by_attribute('email', 'b@example.com') is b
+    assert {i.id for i in repo.get_all_by_attribute('group', 'x')} == {'a', 'b'}
+
+    repo.update('a', {'email': 'new@example.com', 'group': 'y'})
+    assert repo.get_by_attribute('email', 'a@example.com') is None
+    assert repo.get_by_attribute('email', 'new@example.com') is a
+    assert repo.get_all_by_attribute('group', 'x') == [b]
+
+    repo.delete('b')
+    assert repo.get_by_attribute('email', 'b@example.com') is None
+    assert repo.get_all_by_attribute('group', 'x') == []
+
+
+def test_unique_index_rejects_duplicates_without_side_effects():
+    repo = InMemoryRepository(unique_indexes=('email',))
+    repo.add(Item('a', 'a@example.com', None))
+    repo.add(Item('b', 'b@example.com', None))
+
+    with pytest.raises(ValueError):
+        repo.add(Item('c', 'a@example.com', None))
+    with pytest.raises(ValueError):
+        repo.update('b', {'email': 'a@example.com'})
+    assert repo.get('c') is None
+    assert repo.get_by_attribute('email', 'b@example.com').id == 'b'
+
+
+def test_unindexed_attribute_falls_back_to_scan():
+    repo = InMemoryRepository()
+    repo.add(Item('a', 'a@example.com', 'x'))
+    assert repo.get_by_attribute('group', 'x').id == 'a'
+    assert repo.get_by_attribute('group', 'missing') is None
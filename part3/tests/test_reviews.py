@@ -0,0 +1,86 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.services.facade import facade
+from conftest import auth_header
+
+
+def make_place(reviewers):
+    owner = facade.create_user({
+        'first_name': 'Owner', 'last_name': 'Test',
+        'email': 'review-owner@example.com', 'password': 'password123'
+    })
+    place = facade.create_place({
+        'title': 'Reviewed', 'price': 100, 'latitude': 24.7,
+        'longitude': 46.7, 'owner_id': owner.id
+    })
+    users = [facade.create_user({
+        'first_name': 'Reviewer', 'last_name': str(i),
+        'email': f'reviewer{i}@example.com', 'password': 'password123'
+    }) for i in range(reviewers)]
+    return place, users
+
+
+def post_review(client, place, user):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    headers = auth_header(user)
+    event.listen(db.engine, 'before_cursor_execute', before_execute)
+    try:
+        db.session.expire_all()
+        response = client.post('/api/v1/reviews/', headers=headers, json={
+            'text': 'Lovely', 'rating': 5, 'place_id': place.id
+        })
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_execute)
+    return response, len(statements)
+
+
+def test_duplicate_review_is_rejected(client):
+    place, (user,) = make_place(1)
+    response, _ = post_review(client, place, user)
+    assert response.status_code == 201
+
+    response, _ = post_review(client, place, user)
+    assert response.status_code == 400
+    assert response.json['error'] == 'You have already reviewed this place'
+    assert place.review_count == 1
+
+
+def test_posting_review_cost_does_not_grow_with_existing_reviews(client):
+    place, users = make_place(12)
+    _, first = post_review(client, place, users[0])
+    for user in users[1:-1]:
+        post_review(client, place, user)
+    response, last = post_review(client, place, users[-1])
+    assert response.status_code == 201
+    assert first == last
+
+
+def test_create_review_commits_once_and_rolls_back_on_error(app):
+    place, (user, other) = make_place(2)
+    commits = []
+
+    def after_commit(session):
+        commits.append(session)
+
+    event.listen(Session, 'after_commit', after_commit)
+    try:
+        facade.create_review({
+            'text': 'Nice', 'rating': 4, 'place_id': place.id, 'user_id': user.id
+        })
+        assert len(commits) == 1
+
+        try:
+            facade.create_review({
+                'text': 'Nice', 'rating': 9, 'place_id': place.id, 'user_id': other.id
+            })
+        except ValueError:
+            pass
+        assert len(commits) == 1
+    finally:
+        event.remove(Session, 'after_commit', after_commit)
+    assert place.review_count == 1
@@ -0,0 +1,100 @@
+from collections import Counter
+import pytest
+from app import db, password_hasher
+from app.persistence.repository import InMemoryRepository
+from app.services.facade import HBnBFacade, facade
+from app.synthetic import email_for, generate
+
+
+def rows_by_kind(batches):
+    rows = {}
+    for kind, batch in batches:
+        rows.setdefault(kind, []).extend(batch)
+    return rows
+
+
+def test_same_seed_same_rows():
+    first = list(generate(7, 30, 60, 200, 10, 'hash', chunk_size=25))
+    assert first == list(generate(7, 30, 60, 200, 10, 'hash', chunk_size=25))
+    assert first != list(generate(8, 30, 60, 200, 10, 'hash', chunk_size=25))
+
+
+def test_generated_rows_are_consistent():
+    rows = rows_by_kind(generate(1, 500, 200, 1000, 20, 'hash', chunk_size=40))
+    assert [len(rows[kind]) for kind in ('users', 'amenities', 'places')] == [500, 20, 200]
+    assert all(len(batch) <= 40 for _, batch in generate(1, 500, 200, 1000, 20, 'hash',
+                                                         chunk_size=40))
+    assert {user['password'] for user in rows['users']} == {'hash'}
+    assert [u['is_admin'] for u in rows['users']].count(True) == 1
+
+    reviews = rows['reviews']
+    assert 900 <= len(reviews) <= 1100
+    assert len({(r['user_id'], r['place_id']) for r in reviews}) == len(reviews)
+    per_place = Counter(r['place_id'] for r in reviews)
+    for place in rows['places']:
+        ratings = [r['rating'] for r in reviews if r['place_id'] == place['id']]
+        assert (place['review_count'], place['rating_sum']) == (len(ratings), sum(ratings))
+    # Zipf: the most reviewed place has far more than the median one
+    counts = sorted(per_place.values(), reverse=True)
+    assert counts[0] > 10 * counts[len(counts) // 2]
+    # Clustered: most places share a cell with another place
+    cells = Counter(place['geo_cell'] for place in rows['places'])
+    assert sum(n for n in cells.values() if n > 1) > len(rows['places']) // 2
+
+
+def test_reviews_per_place_capped_by_users():
+    rows = rows_by_kind(generate(1, 3, 10, 500, 0, 'hash'))
+    assert max(Counter(r['place_id'] for r in rows['reviews']).values()) == 3
+    with pytest.raises(ValueError):
+        list(generate(1, 0, 10, 0, 0, 'hash'))
+
+
+def test_load_into_database(app):
+    password = password_hasher.hash('secret')
+    counts = facade.load_generated(generate(3, 20, 40, 100, 8, password, chunk_size=15))
+
+    assert len(facade.get_all_users()) == counts['users'] == 20
+    assert len(facade.get_all_places()) == counts['places'] == 40
+    assert len(facade.get_all_reviews()) == counts['reviews']
+    assert facade.authenticate_user(email_for(0, 3), 'secret').is_admin
+    # The generated aggregates match a rebuild from the reviews table
+    before = {p.id: (p.review_count, p.rating_sum) for p in facade.get_all_places()}
+    facade.rebuild_rating_aggregates()
+    db.session.expire_all()
+    assert {p.id: (p.review_count, p.rating_sum) for p in facade.get_all_places()} == before
+
+
+def test_load_rejects_unknown_kinds(app):
+    users = next(generate(3, 2, 0, 0, 0, 'hash'))
+    with pytest.raises(ValueError, match="'place'"):
+        facade.load_generated([users, ('place', [{'id': 'p1', 'title': 'Typo'}])])
+    # Batches before the bad one are in; nothing went to another table
+    assert len(facade.get_all_users()) == 2
+    assert facade.get_all_places() == []
+
+
+def test_load_into_memory(app):
+    memory = HBnBFacade()
+    memory.user_repo = InMemoryRepository(unique_indexes=('email',))
+    memory.amenity_repo = InMemoryRepository()
+    memory.place_repo = InMemoryRepository()
+    memory.review_repo = InMemoryRepository(indexes=('place_id',))
+    counts = memory.load_generated(generate(3, 20, 40, 100, 8, 'hash'))
+
+    assert memory.get_user_by_email(email_for(5, 3)).last_name
+    assert len(memory.review_repo.get_all()) == counts['reviews']
+    assert sum(len(p.amenities) for p in memory.place_repo.get_all()) == counts['place_amenity']
+    assert not db.session.new
+
+
+def test_seed_data_command(app):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['seed-data', '--users', '10', '--places', '30',
+                                 '--reviews', '50', '--amenities', '5', '--seed', '4'])
+    assert result.exit_code == 0, result.output
+    assert 'Inserted 10 users, 5 amenities, 30 places' in result.output
+    assert facade.get_user_by_email(email_for(9, 4))
+
+    again = runner.invoke(args=['seed-data', '--users', '10', '--seed', '4'])
+    assert again.exit_code != 0
+    assert 'already loaded' in again.output
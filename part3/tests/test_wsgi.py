@@ -0,0 +1,92 @@
+import os
+import pytest
+from sqlalchemy import text
+from app import create_app, db, password_hasher, reset_after_fork
+from app.commands import seed_admin
+from app.services.facade import facade
+from config import TestingConfig, engine_options
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """App on a SQLite file with a connection pool, like production"""
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'hbnb.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+        ADMIN_EMAIL = 'Root@Example.com'
+        ADMIN_PASSWORD = 'root-password'
+    app = create_app(Config)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_seed_admin_creates_once(file_app):
+    assert seed_admin(file_app) == ('root@example.com', True)
+    assert seed_admin(file_app) == ('root@example.com', False)
+    admin = facade.authenticate_user('root@example.com', 'root-password')
+    assert admin.is_admin
+
+
+def test_seed_admin_skipped_without_credentials(app):
+    assert seed_admin(app) == (None, False)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_worker_opens_its_own_connections(file_app):
+    with db.engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+    parent_pool = db.engine.pool
+    assert parent_pool.checkedin() == 1
+    password_hasher.hash('warm the pool')
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            reset_after_fork(file_app)
+            with file_app.app_context():
+                fresh = db.engine.pool is not parent_pool and db.engine.pool.checkedin() == 0
+                count = db.session.execute(text('SELECT count(*) FROM users')).scalar()
+            hashed = password_hasher.verify(password_hasher.hash('secret'), 'secret')
+            os.write(write_fd, f'{fresh} {count} {hashed}'.encode())
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    _, status = os.waitpid(pid, 0)
+    result = os.read(read_fd, 100).decode()
+    os.close(read_fd)
+
+    assert status == 0
+    assert result == 'True 0 True'
+    # The parent's pooled connection was left alone by the child
+    with db.engine.connect() as conn:
+        assert conn.execute(text('SELECT 1')).scalar() == 1
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_write_in_one_worker_invalidates_the_others_cache(file_app, monkeypatch):
+    from app import response_cache
+
+    # As once version_ttl has passed since this process read the versions
+    monkeypatch.setattr(response_cache, 'version_ttl', 0)
+    amenity = facade.create_amenity({'name': 'Wi-Fi'})
+    client = file_app.test_client()
+    etag = client.get('/api/v1/amenities/').headers['ETag']
+    db.session.remove()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            reset_after_fork(file_app)
+            with file_app.app_context():
+                facade.update_amenity(amenity.id, {'name': 'Fast Wi-Fi'})
+        finally:
+            os._exit(0)
+    _, status = os.waitpid(pid, 0)
+    assert status == 0
+
+    response = client.get('/api/v1/amenities/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json[0]['name'] == 'Fast Wi-Fi'
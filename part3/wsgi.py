@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Production WSGI entry point
+
+    gunicorn -c gunicorn.conf.py
+
+APP_CONFIG picks the config class (production by default, which
+requires SECRET_KEY and DATABASE_URL). With preload_app, as configured
+in gunicorn.conf.py, this module is imported once in the gunicorn
+master: create_app(), its migrations and schema check run there, and
+workers are forked from the warm process.
+"""
+import os
+from app import create_app
+from config import config
+
+app = create_app(config[os.environ.get('APP_CONFIG', 'production')])
@@ -96,14 +96,42 @@ function logout() {
 // ==================== Places ====================
 let allPlaces = [];
 
-async function fetchPlaces(country = '') {
+// Bounding boxes [min_lat, min_lon, max_lat, max_lon] for the city filter
+const CITY_BOUNDS = {
+    'Riyadh': [24.4, 46.4, 25.0, 47.0],
+    'Jeddah': [21.3, 39.0, 21.8, 39.3],
+    'Dammam': [26.3, 49.9, 26.5, 50.2],
+    'Dubai': [24.9, 54.9, 25.4, 55.6],
+    'Abu Dhabi': [24.2, 54.2, 24.6, 54.7],
+    'Kuwait City': [29.2, 47.8, 29.45, 48.1],
+    'Manama': [26.15, 50.5, 26.25, 50.65],
+    'Cairo': [29.9, 31.1, 30.2, 31.5]
+};
+
+// Build the server-side search query from the filter dropdowns
+function buildSearchParams() {
+    const params = new URLSearchParams({ limit: '100' });
+
+    const countryFilter = document.getElementById('country-filter');
+    const bounds = countryFilter ? CITY_BOUNDS[countryFilter.value] : null;
+    if (bounds) {
+        ['min_lat', 'min_lon', 'max_lat', 'max_lon'].forEach((name, i) => {
+            params.set(name, bounds[i]);
+        });
+    }
+
+    const priceFilter = document.getElementById('price-filter');
+    if (priceFilter && priceFilter.value !== 'all') {
+        params.set('max_price', priceFilter.value);
+    }
+
+    return params;
+}
+
+async function fetchPlaces() {
     try {
         const token = getCookie('token');
-        let url = `${API_BASE_URL}/places/`;
-
-        if (country) {
-            url += `?country=${encodeURIComponent(country)}`;
-        }
+        const url = `${API_BASE_URL}/places/search?${buildSearchParams()}`;
 
         const headers = {};
         if (token) {
@@ -230,26 +258,7 @@ async function deletePlace(placeId) {
 }
 
 function filterByPrice() {
-    const priceFilter = document.getElementById('price-filter');
-    if (!priceFilter) return;
-
-    const selectedPrice = priceFilter.value;
-    const placeCards = document.querySelectorAll('.place-card');
-
-    placeCards.forEach(card => {
-        const price = parseFloat(card.getAttribute('data-price'));
-        
-        if (selectedPrice === 'all') {
-            card.style.display = 'block';
-        } else {
-            const maxPrice = parseFloat(selectedPrice);
-            if (price <= maxPrice) {
-                card.style.display = 'block';
-            } else {
-                card.style.display = 'none';
-            }
-        }
-    });
+    fetchPlaces();
 }
 // ==================== Place Details ====================
 
@@ -261,7 +270,7 @@ async function fetchPlaceDetails(placeId) {
             headers['Authorization'] = `Bearer ${token}`;
         }
 
-        const response = await fetch(`${API_BASE_URL}/places/${placeId}`, { headers });
+        const response = await fetch(`${API_BASE_URL}/places/${placeId}?expand=reviews,amenities`, { headers });
 
         if (response.ok) {
             const place = await response.json();
@@ -398,8 +407,7 @@ async function addReview(event) {
 // ==================== Filters ====================
 
 function filterByCountry() {
-    const country = document.getElementById('country-filter').value;
-    fetchPlaces(country);
+    fetchPlaces();
 }
 
 // ==================== Page Initialization ====================